@@ -1,12 +1,15 @@
 """
 Smart Handwritten Text Extractor - Main Application
-FastAPI web server for image text extraction (NO PDF - Images only!)
+FastAPI web server for image and PDF text extraction
 """
 from fastapi import FastAPI, File, UploadFile, HTTPException, Form
-from fastapi.responses import HTMLResponse, FileResponse, JSONResponse
+from fastapi.responses import HTMLResponse, FileResponse, JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi import Request
+import asyncio
+import io
+import json
 import os
 import shutil
 import uuid
@@ -17,10 +20,23 @@ import logging
 from PIL import Image
 
 # Import our utility modules
-from utils.preprocess import ImagePreprocessor
-from utils.ocr_engine import OCREngine
-from utils.postprocess import TextPostprocessor, create_output_file
+from utils.preprocess import ImagePreprocessor, iter_image_frames
+from utils.ocr_engine import OCREngine, OCRResult, list_engines
+from utils.ocr_layout import OCRLayout
+from utils.postprocess import TextPostprocessor, get_correction_cache, shutdown_postprocess_pools
+from utils.output_writers import OutputPage, write_outputs
+from utils.pdf_to_image import PDFToImageConverter, parse_page_range
+from utils.form_template import get_template_registry
+from utils.region_cache import get_region_cache
+from utils.lexicon import get_lexicon, list_subjects
+from utils.ocr_workers import configure_process_threads, get_worker_pool, shutdown_worker_pools
 from utils.answer_evaluator import AnswerEvaluator
+from utils.archive import StreamingZip, parse_byte_range
+from utils.fileio import configure_fsync, write_stream_async
+from utils.jobs import (
+    ID_PATTERN, list_batch_jobs, list_stored_jobs, load_manifest, load_raw_ocr, raw_ocr_digest,
+    raw_page, save_manifest, save_raw_ocr, stage_fingerprints, stale_stages
+)
 
 # Import configuration
 import config
@@ -48,6 +64,18 @@ templates = Jinja2Templates(directory="templates")
 # Global processing status storage (in production, use Redis or database)
 processing_status = {}
 
+# Limit OCR threading before any engine is loaded
+configure_process_threads()
+configure_fsync(config.IO_CONFIG.get("fsync", "none"))
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Release cached OCR engines and stop OCR and postprocessing worker processes"""
+    close_ocr_engines()
+    shutdown_worker_pools()
+    shutdown_postprocess_pools()
+
 
 @app.get("/", response_class=HTMLResponse)
 async def home(request: Request):
@@ -59,17 +87,17 @@ async def home(request: Request):
     })
 
 
-@app.post("/upload")
-async def upload_file(file: UploadFile = File(...), ocr_engine: str = Form(default=config.OCR_ENGINE)):
+async def save_upload(file: UploadFile, template: str = "", batch_id: str = "") -> tuple:
     """
-    Upload and process an image file
+    Validate an upload, store it in a new job folder and register the job
     
     Args:
-        file: Image file upload (JPG, PNG, etc.)
-        ocr_engine: OCR engine to use ('trocr', 'easyocr', 'google_vision')
+        file: Uploaded file
+        template: Optional template name that must be registered
+        batch_id: Optional batch (e.g. class or exam) the job belongs to
         
     Returns:
-        JSON response with processing status
+        Tuple of (job_id, saved file path, output folder)
     """
     # Check file extension
     file_ext = os.path.splitext(file.filename)[1].lower()
@@ -79,15 +107,11 @@ async def upload_file(file: UploadFile = File(...), ocr_engine: str = Form(defau
             detail=f"Invalid file type. Allowed: {', '.join(config.ALLOWED_EXTENSIONS)}"
         )
     
-    # Check file size
-    file_content = await file.read()
-    file_size = len(file_content)
+    if template and await asyncio.to_thread(get_template_registry().get, template) is None:
+        raise HTTPException(status_code=404, detail=f"Template not found: {template}")
     
-    if file_size > config.MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=400,
-            detail=f"File size exceeds maximum limit of {config.MAX_FILE_SIZE / (1024*1024):.0f} MB"
-        )
+    if batch_id and not ID_PATTERN.match(batch_id):
+        raise HTTPException(status_code=400, detail="Invalid batch id (use letters, digits, '_' and '-')")
     
     # Generate unique ID for this processing job
     job_id = str(uuid.uuid4())
@@ -95,13 +119,25 @@ async def upload_file(file: UploadFile = File(...), ocr_engine: str = Form(defau
     # Create job-specific folders
     job_folder = os.path.join(config.UPLOAD_FOLDER, job_id)
     output_folder = os.path.join(config.OUTPUT_FOLDER, job_id)
-    os.makedirs(job_folder, exist_ok=True)
-    os.makedirs(output_folder, exist_ok=True)
+    await asyncio.to_thread(os.makedirs, job_folder, exist_ok=True)
+    await asyncio.to_thread(os.makedirs, output_folder, exist_ok=True)
     
-    # Save uploaded file
+    # Save uploaded file in chunks, checking the size as it arrives
     image_path = os.path.join(job_folder, file.filename)
-    with open(image_path, "wb") as f:
-        f.write(file_content)
+    try:
+        await write_stream_async(
+            image_path,
+            file.read,
+            max_size=config.MAX_FILE_SIZE,
+            chunk_size=config.IO_CONFIG.get("upload_chunk_size", 1024 * 1024)
+        )
+    except ValueError:
+        await asyncio.to_thread(shutil.rmtree, job_folder, ignore_errors=True)
+        await asyncio.to_thread(shutil.rmtree, output_folder, ignore_errors=True)
+        raise HTTPException(
+            status_code=400,
+            detail=f"File size exceeds maximum limit of {config.MAX_FILE_SIZE / (1024*1024):.0f} MB"
+        )
     
     logger.info(f"Image uploaded: {file.filename} (Job ID: {job_id})")
     
@@ -109,19 +145,69 @@ async def upload_file(file: UploadFile = File(...), ocr_engine: str = Form(defau
     processing_status[job_id] = {
         "status": "processing",
         "filename": file.filename,
+        "batch_id": batch_id,
         "progress": 0,
         "message": "Starting processing...",
         "start_time": datetime.now().isoformat()
     }
     
+    return job_id, image_path, output_folder
+
+
+@app.post("/upload")
+async def upload_file(
+    file: UploadFile = File(...),
+    ocr_engine: str = Form(default=config.OCR_ENGINE),
+    template: str = Form(default=""),
+    pages: str = Form(default=""),
+    subject: str = Form(default=""),
+    batch_id: str = Form(default="")
+):
+    """
+    Upload and process an image or PDF file
+    
+    Args:
+        file: Image or PDF file upload (JPG, PNG, PDF, etc.)
+        ocr_engine: OCR engine to use ('easyocr', 'easyocr_cpu', 'google_vision', 'tesseract', 'auto')
+        template: Optional registered answer-sheet template to subtract
+        pages: Optional PDF page selection, e.g. "1-3,7" (all pages if empty)
+        subject: Optional subject whose lexicon guides recognition and correction
+        batch_id: Optional batch id (letters, digits, '_', '-') for exporting jobs together
+        
+    Returns:
+        JSON response with processing status
+    """
+    job_id, image_path, output_folder = await save_upload(file, template, batch_id)
+    
+    is_pdf = image_path.lower().endswith(".pdf")
+    if is_pdf:
+        try:
+            page_info = await asyncio.to_thread(admit_pdf, job_id, image_path, pages)
+        except HTTPException:
+            await cleanup_job(job_id)
+            raise
+    
     # Process in background (in production, use background tasks or Celery)
     try:
-        result = await process_image(
-            image_path=image_path,
-            job_id=job_id,
-            output_folder=output_folder,
-            ocr_engine=ocr_engine
-        )
+        if is_pdf:
+            result = await process_pdf(
+                pdf_path=image_path,
+                job_id=job_id,
+                output_folder=output_folder,
+                ocr_engine=ocr_engine,
+                template=template,
+                page_info=page_info,
+                subject=subject
+            )
+        else:
+            result = await process_image(
+                image_path=image_path,
+                job_id=job_id,
+                output_folder=output_folder,
+                ocr_engine=ocr_engine,
+                template=template,
+                subject=subject
+            )
         
         processing_status[job_id].update({
             "status": "completed",
@@ -129,6 +215,7 @@ async def upload_file(file: UploadFile = File(...), ocr_engine: str = Form(defau
             "message": "Processing completed successfully",
             "result": result
         })
+        await asyncio.to_thread(record_job, job_id, output_folder, ocr_engine, template, subject, result)
         
     except Exception as e:
         logger.error(f"Processing failed for job {job_id}: {str(e)}")
@@ -144,15 +231,181 @@ async def upload_file(file: UploadFile = File(...), ocr_engine: str = Form(defau
     })
 
 
-async def process_image(image_path: str, job_id: str, output_folder: str, ocr_engine: str):
+@app.post("/upload/stream")
+async def upload_file_stream(
+    file: UploadFile = File(...),
+    ocr_engine: str = Form(default=config.OCR_ENGINE),
+    template: str = Form(default=""),
+    subject: str = Form(default=""),
+    batch_id: str = Form(default="")
+):
+    """
+    Upload an image and stream recognized text regions as Server-Sent Events
+    
+    Events: 'job' (job id), 'region' (box, text, confidence) as each
+    recognizer batch finishes, then 'done' with the final result, or 'error'.
+    The job is stored like a regular upload, so /result and /download work
+    once the stream has finished.
+    
+    Args:
+        file: Image file upload (JPG, PNG, etc.)
+        ocr_engine: OCR engine to use
+        template: Optional registered answer-sheet template to subtract
+        subject: Optional subject whose lexicon guides recognition and correction
+        batch_id: Optional batch id for exporting jobs together
+        
+    Returns:
+        text/event-stream response
+    """
+    if file.filename.lower().endswith(".pdf"):
+        raise HTTPException(status_code=400, detail="Streaming supports images only; upload PDFs to /upload")
+    
+    job_id, image_path, output_folder = await save_upload(file, template, batch_id)
+    
+    # A sync generator is iterated in the threadpool, so OCR does not block the event loop
+    return StreamingResponse(
+        stream_regions(image_path, job_id, output_folder, ocr_engine, template, subject),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def sse_event(event: str, data: dict) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def stream_regions(
+    image_path: str,
+    job_id: str,
+    output_folder: str,
+    ocr_engine: str,
+    template: str = "",
+    subject: str = ""
+):
+    """
+    Run the pipeline on an image, yielding SSE messages as regions are recognized
+    
+    This is a plain generator on purpose: StreamingResponse iterates it in a
+    worker thread, so its image loading, template subtraction and OCR never
+    block the event loop.
+    
+    Args:
+        image_path: Path to image file
+        job_id: Unique job identifier
+        output_folder: Folder to save outputs
+        ocr_engine: OCR engine to use
+        template: Optional answer-sheet template whose printed content is removed
+        subject: Optional subject whose lexicon guides recognition and correction
+        
+    Yields:
+        SSE-formatted strings
+    """
+    start_time = time.time()
+    yield sse_event("job", {"job_id": job_id})
+    
+    try:
+        processing_status[job_id]["message"] = "Preprocessing image..."
+        processing_status[job_id]["progress"] = 30
+        
+        image = Image.open(image_path)
+        preprocessor = ImagePreprocessor(config.PREPROCESS_CONFIG)
+        processed_image = preprocessor.preprocess(image)
+        
+        template_info = None
+        if template:
+            processed_image, template_info = get_template_registry().subtract(processed_image, template)
+        
+        content, (offset_x, offset_y) = page_content(preprocessor, processed_image)
+        
+        processing_status[job_id]["message"] = "Extracting text with OCR..."
+        processing_status[job_id]["progress"] = 50
+        
+        boxes, texts, confidences = [], [], []
+        first_region_time = None
+        
+        if content is not None:
+            ocr = get_ocr_engine(ocr_engine, subject)
+            
+            for region in ocr.iter_regions(content):
+                x0, y0, x1, y1 = region["box"]
+                region["box"] = [x0 + offset_x, y0 + offset_y, x1 + offset_x, y1 + offset_y]
+                
+                if first_region_time is None:
+                    first_region_time = time.time() - start_time
+                
+                boxes.append(region["box"])
+                texts.append(region["text"])
+                confidences.append(region["confidence"])
+                yield sse_event("region", region)
+        
+        # Reading order over all regions gives the same text as the batch path
+        layout = OCRLayout(boxes, texts, confidences) if boxes else OCRLayout.empty()
+        confidence = layout.mean_confidence()
+        
+        raw_text = layout.to_text()
+        ocr_result = OCRResult(raw_text, confidence, layout=layout)
+        page = raw_page(1, ocr_result, size=processed_image.size)
+        save_raw_ocr(output_folder, [page])
+        
+        postprocessor = build_postprocessor(subject)
+        final_text = postprocessor.process(raw_text, confidence, layout.word_confidences())
+        output_files = save_outputs([output_page(page, final_text, ocr_result)], output_folder)
+        
+        result = {
+            "text": final_text,
+            "confidence": confidence,
+            "processing_time": time.time() - start_time,
+            "time_to_first_region": first_region_time,
+            "ocr_engine": ocr_engine,
+            "ocr_metadata": {"num_detections": len(layout), "blank_page": content is None},
+            "spell_check": dict(postprocessor.stats),
+            "template": template_info,
+            "subject": subject,
+            "output_files": output_files
+        }
+        
+        processing_status[job_id].update({
+            "status": "completed",
+            "progress": 100,
+            "message": "Processing completed successfully",
+            "result": result
+        })
+        record_job(job_id, output_folder, ocr_engine, template, subject, result)
+        yield sse_event("done", result)
+        
+    except Exception as e:
+        logger.error(f"Streaming processing failed for job {job_id}: {str(e)}")
+        processing_status[job_id].update({
+            "status": "failed",
+            "message": f"Processing failed: {str(e)}"
+        })
+        yield sse_event("error", {"job_id": job_id, "message": str(e)})
+
+
+async def process_image(
+    image_path: str,
+    job_id: str,
+    output_folder: str,
+    ocr_engine: str,
+    template: str = "",
+    subject: str = ""
+):
     """
     Process an image file through the complete pipeline
     
+    Multi-frame files (multi-page TIFF) are read one frame at a time; frames
+    are preprocessed as they are decoded, OCR'd together in windows of
+    OCR_PAGE_BATCH frames and then released, and the frame texts are
+    combined at the end.
+    
     Args:
         image_path: Path to image file
         job_id: Unique job identifier
         output_folder: Folder to save outputs
         ocr_engine: OCR engine to use
+        template: Optional answer-sheet template whose printed content is removed
+        subject: Optional subject whose lexicon guides recognition and correction
         
     Returns:
         Processing results dictionary
@@ -165,83 +418,901 @@ async def process_image(image_path: str, job_id: str, output_folder: str, ocr_en
     processing_status[job_id]["message"] = "Loading image..."
     processing_status[job_id]["progress"] = 10
     
-    # Step 1: Load image
+    # Step 1: Open the image (frames are decoded lazily)
     try:
-        image = Image.open(image_path)
-        logger.info(f"Loaded image: {image.size} pixels, mode: {image.mode}")
+        frame_count = await asyncio.to_thread(count_image_frames, image_path)
     except Exception as e:
         raise Exception(f"Failed to load image: {str(e)}")
     
-    # Update status
-    processing_status[job_id]["message"] = "Preprocessing image..."
-    processing_status[job_id]["progress"] = 30
+    if frame_count > 1:
+        processing_status[job_id].update({"total_pages": frame_count, "pages_done": 0})
     
-    # Step 2: Preprocess image
     preprocessor = ImagePreprocessor(config.PREPROCESS_CONFIG)
-    processed_image = preprocessor.preprocess(image)
-    logger.info("Image preprocessing completed")
+    postprocessor = build_postprocessor(subject)
+    ocr = build_page_recognizer(ocr_engine, subject) if frame_count > 1 else get_ocr_engine(ocr_engine, subject)
     
-    # Update status
-    processing_status[job_id]["message"] = "Extracting text with OCR..."
-    processing_status[job_id]["progress"] = 50
+    ocr_results = []
+    frame_results = []
+    raw_pages = []
+    template_info = None
     
-    # Step 3: OCR
-    ocr_config = {
-        'easyocr': {
-            'languages': config.EASYOCR_LANGUAGES,
-            'gpu': config.EASYOCR_GPU
-        },
-        'google_vision': {
-            'credentials_path': config.GOOGLE_CREDENTIALS_PATH
-        }
-    }
+    # Frames waiting for OCR: recognized together, a window at a time
+    window = []
+    window_size = max(1, config.OCR_PAGE_BATCH)
+    
+    def flush_window():
+        results = recognize_pages(ocr, preprocessor, [frame_image for _, frame_image in window])
+        
+        for (frame_number, frame_image), result in zip(window, results):
+            logger.info(f"OCR completed (frame {frame_number}/{frame_count}) - Confidence: {result.confidence:.2f}")
+            
+            if "region_cache" in result.metadata:
+                cache_stats = result.metadata["region_cache"]
+                logger.info(
+                    f"Region cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+                    f"~{cache_stats['saved_time']:.2f}s recognizer time saved"
+                )
+            
+            raw_pages.append(raw_page(frame_number, result, size=frame_image.size))
+            ocr_results.append(result)
+            frame_results.append({
+                "page": frame_number,
+                "confidence": result.confidence,
+                "ocr_metadata": result_metadata(result)
+            })
+        
+        window.clear()
+        if frame_count > 1:
+            processing_status[job_id]["pages_done"] = len(frame_results)
+    
+    # Each frame is read and decoded in a worker thread
+    frames = iter_image_frames(image_path)
+    while (frame := await asyncio.to_thread(next, frames, None)) is not None:
+        frame_number, image = frame
+        frame_label = f" (frame {frame_number}/{frame_count})" if frame_count > 1 else ""
+        
+        # Update status
+        processing_status[job_id]["message"] = f"Preprocessing image{frame_label}..."
+        processing_status[job_id]["progress"] = 30 + int(50 * (frame_number - 1) / frame_count)
+        
+        # Step 2: Preprocess image
+        processed_image = preprocessor.preprocess(image)
+        image.close()
+        logger.info(f"Image preprocessing completed{frame_label}")
+        
+        # Remove printed form content so only handwriting is OCR'd
+        if template:
+            processed_image, template_info = get_template_registry().subtract(processed_image, template)
+            logger.info(f"Template subtraction: {template_info}")
+        
+        # Step 3: OCR, batched across the frames in the window
+        window.append((frame_number, processed_image))
+        if len(window) >= window_size:
+            processing_status[job_id]["message"] = f"Extracting text with OCR{frame_label}..."
+            flush_window()
     
-    ocr = OCREngine(ocr_engine, **ocr_config.get(ocr_engine, {}))
+    if window:
+        processing_status[job_id]["message"] = "Extracting text with OCR..."
+        flush_window()
     
-    # Process single image
-    result = ocr.recognize_text(processed_image)
-    logger.info(f"OCR completed - Confidence: {result.confidence:.2f}")
-    processing_status[job_id]["progress"] = 80
+    # Keep the raw OCR output so later stages can be re-run without OCR
+    await asyncio.to_thread(save_raw_ocr, output_folder, raw_pages)
     
-    # Update status
+    # Step 4: Postprocess all frames as one batch (spell-correct only words the OCR was unsure about)
     processing_status[job_id]["message"] = "Postprocessing text..."
-    processing_status[job_id]["progress"] = 85
-    
-    # Step 4: Postprocess
-    postprocessor = TextPostprocessor(config.POSTPROCESS_CONFIG)
-    final_text = postprocessor.process(result.text, result.confidence)
+    frame_texts = postprocess_pages(postprocessor, ocr_results, frame_results)
+    for frame, text in zip(frame_results, frame_texts):
+        frame["text"] = text
     
     # Update status
     processing_status[job_id]["message"] = "Saving outputs..."
     processing_status[job_id]["progress"] = 95
     
     # Step 5: Save outputs
-    output_base = os.path.join(output_folder, "extracted_text")
-    
-    # Save as TXT
-    create_output_file(final_text, output_base, format="txt")
-    
-    # Save as DOCX
-    try:
-        create_output_file(final_text, output_base, format="docx")
-    except Exception as e:
-        logger.warning(f"Could not create DOCX: {str(e)}")
+    final_text = postprocessor.combine_texts(frame_texts)
+    output_files = await asyncio.to_thread(
+        save_outputs,
+        [output_page(page, text, result) for page, text, result in zip(raw_pages, frame_texts, ocr_results)],
+        output_folder
+    )
     
     # Calculate metrics
     processing_time = time.time() - start_time
     
     logger.info(f"Processing completed in {processing_time:.2f}s (Job: {job_id})")
     
+    if frame_count == 1:
+        return {
+            "text": final_text,
+            "confidence": frame_results[0]["confidence"],
+            "processing_time": processing_time,
+            "ocr_engine": ocr_engine,
+            "ocr_metadata": frame_results[0]["ocr_metadata"],
+            "spell_check": frame_results[0]["spell_check"],
+            "template": template_info,
+            "subject": subject,
+            "output_files": output_files
+        }
+    
+    # Average over frames that had text
+    confidences = [frame["confidence"] for frame in frame_results if not frame["ocr_metadata"].get("blank_page")]
+    
     return {
         "text": final_text,
-        "confidence": result.confidence,
+        "confidence": sum(confidences) / len(confidences) if confidences else 0.0,
         "processing_time": processing_time,
         "ocr_engine": ocr_engine,
-        "output_files": {
-            "txt": f"{output_base}.txt",
-            "docx": f"{output_base}.docx"
+        "spell_check": sum_stats(frame["spell_check"] for frame in frame_results),
+        "pages": frame_results,
+        "template": template_info,
+        "subject": subject,
+        "output_files": output_files
+    }
+
+
+def count_image_frames(image_path: str) -> int:
+    """Open an image file (without decoding it) and return its number of frames"""
+    with Image.open(image_path) as image:
+        frame_count = getattr(image, "n_frames", 1)
+        logger.info(f"Loaded image: {image.size} pixels, mode: {image.mode}, frames: {frame_count}")
+    return frame_count
+
+
+def decode_image(data: bytes) -> Image.Image:
+    """Fully decode an image held in memory (raises on corrupt data)"""
+    image = Image.open(io.BytesIO(data))
+    image.load()
+    return image
+
+
+def admit_pdf(job_id: str, pdf_path: str, pages: str = "") -> list:
+    """
+    Size a PDF job from its structure and reject it if it is too large
+    
+    Args:
+        job_id: Job identifier (its status gets the page totals)
+        pdf_path: Path to the uploaded PDF
+        pages: Optional page selection, e.g. "1-3,7"
+        
+    Returns:
+        Page metadata (see PDFToImageConverter.get_page_info) for the selected pages
+    """
+    converter = PDFToImageConverter(dpi=config.PDF_CONFIG.get("dpi", 300))
+    
+    try:
+        page_info = converter.get_page_info(pdf_path)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Unreadable PDF: {str(e)}")
+    
+    try:
+        selected = set(parse_page_range(pages, len(page_info)))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    page_info = [info for info in page_info if info["page"] in selected]
+    
+    if not page_info:
+        raise HTTPException(status_code=400, detail="No pages selected")
+    
+    max_pages = config.PDF_CONFIG.get("max_pages", 0)
+    if max_pages and len(page_info) > max_pages:
+        raise HTTPException(
+            status_code=413,
+            detail=f"PDF has {len(page_info)} pages selected; the limit is {max_pages}"
+        )
+    
+    # Each page in flight is held as a full RGB bitmap, so oversized pages are rejected up front
+    max_page_pixels = config.PDF_CONFIG.get("max_page_pixels", 0)
+    largest = max(page_info, key=lambda info: info["render_pixels"] or 0)
+    if max_page_pixels and (largest["render_pixels"] or 0) > max_page_pixels:
+        raise HTTPException(
+            status_code=413,
+            detail=(
+                f"PDF page {largest['page']} would render to {largest['render_pixels']} pixels "
+                f"at {converter.dpi} DPI; the limit is {max_page_pixels}"
+            )
+        )
+    
+    processing_status[job_id].update({
+        "total_pages": len(page_info),
+        "pages_done": 0
+    })
+    logger.info(f"PDF admitted: {len(page_info)} pages (Job: {job_id})")
+    
+    return page_info
+
+
+async def process_pdf(
+    pdf_path: str,
+    job_id: str,
+    output_folder: str,
+    ocr_engine: str,
+    template: str = "",
+    page_info: list = None,
+    subject: str = ""
+):
+    """
+    Process a PDF page by page through the complete pipeline
+    
+    Pages are rendered one at a time (the next page renders while the
+    current ones are OCR'd) and recognized in windows of OCR_PAGE_BATCH
+    pages, then released, so memory stays bounded by a few pages regardless
+    of document length.
+    
+    Args:
+        pdf_path: Path to PDF file
+        job_id: Unique job identifier
+        output_folder: Folder to save outputs
+        ocr_engine: OCR engine to use
+        template: Optional answer-sheet template whose printed content is removed
+        page_info: Metadata of the pages to process (default: all pages)
+        subject: Optional subject whose lexicon guides recognition and correction
+        
+    Returns:
+        Processing results dictionary
+    """
+    start_time = time.time()
+    
+    logger.info(f"Starting PDF processing (Job: {job_id})")
+    
+    converter = PDFToImageConverter(
+        dpi=config.PDF_CONFIG.get("dpi", 300),
+        use_text_layer=config.PDF_CONFIG.get("use_text_layer", True),
+        extract_images=config.PDF_CONFIG.get("extract_images", True),
+        min_text_chars=config.PDF_CONFIG.get("min_text_chars", 20),
+        min_text_density=config.PDF_CONFIG.get("min_text_density", 4.0)
+    )
+    if page_info is None:
+        page_info = converter.get_page_info(pdf_path)
+    
+    info_by_page = {info["page"]: info for info in page_info}
+    page_numbers = [info["page"] for info in page_info]
+    
+    preprocessor = ImagePreprocessor(config.PREPROCESS_CONFIG)
+    postprocessor = build_postprocessor(subject)
+    ocr = None
+    
+    page_texts = []
+    page_results = []
+    ocr_results = []
+    ocr_indexes = []
+    raw_pages = []
+    template_info = None
+    
+    # Pages waiting for OCR: (index in page_results, image), recognized a window at a time
+    window = []
+    window_size = max(1, config.OCR_PAGE_BATCH)
+    
+    def flush_window():
+        results = recognize_pages(ocr, preprocessor, [page_image for _, page_image in window])
+        
+        for (index, page_image), result in zip(window, results):
+            page_result = page_results[index]
+            logger.info(
+                f"Page {page_result['page']} OCR completed ({page_result['source']}) - Confidence: {result.confidence:.2f}"
+            )
+            
+            raw_pages[index] = raw_page(page_result["page"], result, size=page_image.size, size_pt=page_result["size_pt"])
+            ocr_indexes.append(index)
+            ocr_results.append(result)
+            page_result.update({"confidence": result.confidence, "ocr_metadata": result_metadata(result)})
+        
+        window.clear()
+    
+    pdf_pages = converter.iter_pages(
+        pdf_path,
+        page_numbers,
+        prefetch=config.PDF_CONFIG.get("prefetch_pages", 1)
+    )
+    
+    # Pages are rendered (or waited for) in a worker thread
+    while (page := await asyncio.to_thread(next, pdf_pages, None)) is not None:
+        index = len(page_results)
+        processing_status[job_id].update({
+            "message": f"Processing page {page.number} ({index + 1}/{len(page_numbers)})...",
+            "progress": 10 + int(80 * index / len(page_numbers)),
+            "pages_done": index
+        })
+        
+        info = info_by_page[page.number]
+        page_result = {
+            "page": page.number,
+            "source": page.metadata.get("source", "rendered"),
+            "size_pt": [info["width_pt"], info["height_pt"]],
+            "rotation": info["rotation"],
+            "image_dpi": info["image_dpi"]
         }
+        
+        # Digital text needs neither OCR nor spelling correction
+        if page.text is not None:
+            logger.info(f"Page {page.number}: using embedded text layer")
+            page_texts.append(page.text)
+            page_results.append({**page_result, "confidence": 1.0, "ocr_metadata": {}})
+            raw_pages.append(raw_page(page.number, text=page.text, size_pt=page_result["size_pt"]))
+            continue
+        
+        processed_image = preprocessor.preprocess(page.image)
+        page.release()
+        
+        if template:
+            processed_image, template_info = await asyncio.to_thread(
+                get_template_registry().subtract, processed_image, template
+            )
+        
+        # Loaded lazily: PDFs with a text layer on every page never need a model
+        if ocr is None:
+            ocr = (build_page_recognizer(ocr_engine, subject) if len(page_numbers) > 1
+                   else get_ocr_engine(ocr_engine, subject))
+        
+        # Placeholders keep page order; filled in when the window is recognized
+        window.append((len(page_results), processed_image))
+        page_texts.append(None)
+        page_results.append(page_result)
+        raw_pages.append(None)
+        
+        if len(window) >= window_size:
+            flush_window()
+    
+    if window:
+        flush_window()
+    
+    processing_status[job_id]["pages_done"] = len(page_numbers)
+    await asyncio.to_thread(save_raw_ocr, output_folder, raw_pages)
+    
+    # Postprocess the OCR'd pages as one batch (parallel if configured)
+    processing_status[job_id]["message"] = "Postprocessing text..."
+    ocr_texts = postprocess_pages(postprocessor, ocr_results, [page_results[index] for index in ocr_indexes])
+    for index, text in zip(ocr_indexes, ocr_texts):
+        page_texts[index] = text
+    for page_result, text in zip(page_results, page_texts):
+        page_result["text"] = text
+    
+    processing_status[job_id]["message"] = "Saving outputs..."
+    processing_status[job_id]["progress"] = 95
+    
+    final_text = postprocessor.combine_texts(page_texts)
+    page_ocr_results = dict(zip(ocr_indexes, ocr_results))
+    output_files = await asyncio.to_thread(
+        save_outputs,
+        [output_page(page, text, page_ocr_results.get(index)) for index, (page, text) in enumerate(zip(raw_pages, page_texts))],
+        output_folder
+    )
+    
+    # Average over pages that had text
+    confidences = [page["confidence"] for page in page_results if not page["ocr_metadata"].get("blank_page")]
+    confidence = sum(confidences) / len(confidences) if confidences else 0.0
+    
+    processing_time = time.time() - start_time
+    logger.info(f"PDF processing completed in {processing_time:.2f}s, {len(page_results)} pages (Job: {job_id})")
+    
+    return {
+        "text": final_text,
+        "confidence": confidence,
+        "processing_time": processing_time,
+        "ocr_engine": ocr_engine,
+        "spell_check": sum_stats(page["spell_check"] for page in page_results if "spell_check" in page),
+        "pages": page_results,
+        "template": template_info,
+        "subject": subject,
+        "output_files": output_files
+    }
+
+
+def build_postprocessor(subject: str = "", postprocess_config: dict = None) -> TextPostprocessor:
+    """Create a postprocessor sharing the correction memo, with the subject lexicon if enabled"""
+    lexicon = get_lexicon(subject) if config.LEXICON_CONFIG.get("correction", True) else None
+    return TextPostprocessor(
+        postprocess_config or config.POSTPROCESS_CONFIG,
+        correction_cache=get_correction_cache(),
+        lexicon=lexicon
+    )
+
+
+def postprocess_pages(postprocessor: TextPostprocessor, results: list, page_results: list) -> list:
+    """
+    Clean the OCR results of a multi-page job as one batch
+    
+    With POSTPROCESS_CONFIG["workers"] > 1 the pages are spread over a
+    process pool. Each page's spell check counters (and error, if its
+    postprocessing failed) are added to its entry in page_results.
+    
+    Args:
+        postprocessor: Job postprocessor
+        results: OCR results in page order
+        page_results: Per-page result dictionaries, aligned with results
+        
+    Returns:
+        Cleaned texts in page order
+    """
+    texts = postprocessor.process_batch(
+        [result.text for result in results],
+        [result.confidence for result in results],
+        [result.layout.word_confidences() if result.layout is not None else None for result in results]
+    )
+    
+    for index, page_result in enumerate(page_results):
+        page_result["spell_check"] = postprocessor.batch_stats[index]
+        if index in postprocessor.batch_errors:
+            page_result["postprocess_error"] = postprocessor.batch_errors[index]
+        else:
+            page_result.pop("postprocess_error", None)
+    
+    return texts
+
+
+def sum_stats(stats) -> dict:
+    """Add up counter dictionaries (e.g. per-page spell check stats)"""
+    total = {}
+    for item in stats:
+        for key, value in item.items():
+            total[key] = total.get(key, 0) + value
+    return total
+
+
+def result_metadata(result: OCRResult) -> dict:
+    """OCR metadata worth returning to the client"""
+    return {
+        key: value for key, value in result.metadata.items()
+        if key in ("num_detections", "cascade", "blank_page", "content_box", "region_cache", "routing")
+    }
+
+
+def output_page(record: dict, text: str, result: OCRResult = None) -> OutputPage:
+    """
+    Output page for a raw page record (see utils.jobs.raw_page)
+    
+    Args:
+        record: Raw page record
+        text: Postprocessed page text
+        result: The page's OCR result (default: the one rebuilt by load_raw_ocr, if any)
+        
+    Returns:
+        OutputPage
+    """
+    if result is None:
+        result = record.get("result")
+    
+    return OutputPage(
+        record["page"],
+        text,
+        layout=result.layout if result is not None else None,
+        size=record.get("size"),
+        size_pt=record.get("size_pt"),
+        confidence=result.confidence if result is not None else 1.0
+    )
+
+
+def save_outputs(pages: list, output_folder: str) -> dict:
+    """
+    Write the job's outputs in every configured format (one pass over the pages)
+    
+    Args:
+        pages: OutputPage per page, in order
+        output_folder: Job output folder
+        
+    Returns:
+        Dictionary of format -> file path
+    """
+    return write_outputs(pages, os.path.join(output_folder, "extracted_text"), config.OUTPUT_FORMATS)
+
+
+def job_stage_fingerprints(manifest: dict) -> dict:
+    """Fingerprints of a job's stages for the configuration recorded in its manifest"""
+    return stage_fingerprints({
+        "ocr": manifest["raw_ocr"],
+        "postprocess": [
+            manifest["postprocess_config"],
+            config.LEXICON_CONFIG.get("correction", True),
+            manifest["subject"]
+        ],
+        "outputs": config.OUTPUT_FORMATS,
+        "evaluation": manifest.get("evaluation_params"),
+    })
+
+
+def record_job(job_id: str, output_folder: str, ocr_engine: str, template: str, subject: str, result: dict):
+    """
+    Store the manifest of a finished job so its later stages can be re-run from the raw OCR output
+    
+    Args:
+        job_id: Job identifier
+        output_folder: Job output folder (holds the raw OCR output)
+        ocr_engine: OCR engine used
+        template: Template subtracted, if any
+        subject: Subject of the job
+        result: Processing results dictionary
+    """
+    digest = raw_ocr_digest(output_folder)
+    if digest is None:
+        return
+    
+    manifest = {
+        "job_id": job_id,
+        "filename": processing_status[job_id]["filename"],
+        "batch_id": processing_status[job_id].get("batch_id", ""),
+        "ocr_engine": ocr_engine,
+        "template": template,
+        "subject": subject,
+        "raw_ocr": digest,
+        "postprocess_config": config.POSTPROCESS_CONFIG,
+        "evaluation_params": None,
+        "evaluation": None,
+        "result": result
     }
+    manifest["stages"] = job_stage_fingerprints(manifest)
+    
+    try:
+        save_manifest(output_folder, manifest)
+    except Exception as e:
+        logger.warning(f"Could not save job manifest for {job_id}: {str(e)}")
+
+
+def record_evaluation(job_id: str, params: dict, evaluation: dict):
+    """Add an evaluation and the parameters it ran with to the job manifest"""
+    output_folder = os.path.join(config.OUTPUT_FOLDER, job_id)
+    manifest = load_manifest(output_folder)
+    if manifest is None:
+        return
+    
+    manifest["evaluation_params"] = params
+    manifest["evaluation"] = evaluation
+    manifest["stages"]["evaluation"] = job_stage_fingerprints(manifest)["evaluation"]
+    save_manifest(output_folder, manifest)
+
+
+def run_evaluation(extracted_text: str, params: dict) -> dict:
+    """
+    Evaluate extracted text with the parameters of an earlier /evaluate call
+    
+    Args:
+        extracted_text: Postprocessed text
+        params: Recorded evaluation parameters
+        
+    Returns:
+        Evaluation results (success False if the evaluator is unavailable)
+    """
+    evaluator = AnswerEvaluator(api_key=config.GEMINI_API_KEY)
+    if not evaluator.enabled:
+        return {"success": False, "error": "Answer evaluation is not available"}
+    
+    if params["type"] == "reference":
+        return evaluator.evaluate_with_reference(
+            extracted_text=extracted_text,
+            reference_image_path=params["reference_path"],
+            subject=params["subject"],
+            total_marks=params["total_marks"]
+        )
+    
+    return evaluator.evaluate_answers(
+        extracted_text=extracted_text,
+        answer_key=params["answer_key"] or None,
+        subject=params["subject"],
+        total_marks=params["total_marks"]
+    )
+
+
+def reprocess_jobs(job_ids: list, overrides: dict) -> list:
+    """
+    Re-run the stale stages after OCR for stored jobs
+    
+    Each job's stages are fingerprinted against the current configuration
+    (plus overrides); only stages whose fingerprint changed are re-run.
+    The OCR'd pages of all jobs that need postprocessing go through one
+    batch per subject, so they share the postprocessing pool.
+    
+    Args:
+        job_ids: Jobs to re-run
+        overrides: POSTPROCESS_CONFIG overrides
+        
+    Returns:
+        One summary per job (stages re-run, or error)
+    """
+    start_time = time.time()
+    postprocess_config = {**config.POSTPROCESS_CONFIG, **overrides}
+    
+    summaries = {}
+    jobs = []
+    for job_id in job_ids:
+        if not ID_PATTERN.match(job_id):
+            summaries[job_id] = {"job_id": job_id, "error": "Invalid job id"}
+            continue
+        
+        output_folder = os.path.join(config.OUTPUT_FOLDER, job_id)
+        manifest = load_manifest(output_folder)
+        
+        if manifest is None:
+            summaries[job_id] = {"job_id": job_id, "error": "No stored OCR output for this job"}
+            continue
+        if processing_status.get(job_id, {}).get("status") == "processing":
+            summaries[job_id] = {"job_id": job_id, "error": "Job is still processing"}
+            continue
+        
+        recorded = manifest["stages"]
+        manifest["raw_ocr"] = raw_ocr_digest(output_folder)
+        manifest["postprocess_config"] = postprocess_config
+        current = job_stage_fingerprints(manifest)
+        stale = stale_stages(recorded, current)
+        
+        if "ocr" in stale:
+            summaries[job_id] = {"job_id": job_id, "error": "Raw OCR output changed or is missing; upload again"}
+            continue
+        
+        manifest["stages"] = current
+        jobs.append((job_id, output_folder, manifest, stale))
+        summaries[job_id] = {"job_id": job_id, "rerun": stale}
+    
+    # Postprocess: one batch per subject across all stale jobs
+    by_subject = {}
+    for job in jobs:
+        if "postprocess" in job[3]:
+            by_subject.setdefault(job[2]["subject"], []).append(job)
+    
+    for subject, subject_jobs in by_subject.items():
+        postprocessor = build_postprocessor(subject, postprocess_config)
+        
+        batch = []
+        for job_id, output_folder, manifest, stale in subject_jobs:
+            pages = load_raw_ocr(output_folder)
+            entries = manifest["result"].get("pages") or [manifest["result"]]
+            batch.append((manifest, pages, [(entry, page) for entry, page in zip(entries, pages) if page["postprocess"]]))
+        
+        results = [page["result"] for _, _, ocr_pages in batch for _, page in ocr_pages]
+        entries = [entry for _, _, ocr_pages in batch for entry, _ in ocr_pages]
+        texts = iter(postprocess_pages(postprocessor, results, entries))
+        
+        for manifest, pages, ocr_pages in batch:
+            page_texts = [next(texts) if page["postprocess"] else page["text"] for page in pages]
+            result = manifest["result"]
+            result["text"] = postprocessor.combine_texts(page_texts)
+            result["spell_check"] = sum_stats(entry["spell_check"] for entry, _ in ocr_pages)
+            for entry, text in zip(result.get("pages") or [], page_texts):
+                entry["text"] = text
+    
+    for job_id, output_folder, manifest, stale in jobs:
+        result = manifest["result"]
+        
+        if "outputs" in stale:
+            result["output_files"] = save_outputs(stored_output_pages(output_folder, result), output_folder)
+        
+        # Only evaluations that were requested before are repeated
+        if "evaluation" in stale and manifest.get("evaluation_params"):
+            evaluation = run_evaluation(result["text"], manifest["evaluation_params"])
+            if evaluation.get("success", False):
+                manifest["evaluation"] = evaluation
+            else:
+                # Keep the fingerprint stale so the next re-process retries
+                manifest["stages"]["evaluation"] = None
+                summaries[job_id]["evaluation_error"] = evaluation.get("error", "Evaluation failed")
+        
+        if stale:
+            result["reprocessed_at"] = datetime.now().isoformat()
+            save_manifest(output_folder, manifest)
+        elif job_id in processing_status:
+            continue
+        
+        # Jobs from before a restart become visible to /status and /result again
+        status = processing_status.setdefault(job_id, {
+            "filename": manifest["filename"],
+            "batch_id": manifest.get("batch_id", ""),
+            "start_time": datetime.now().isoformat()
+        })
+        status.update({
+            "status": "completed",
+            "progress": 100,
+            "message": "Reprocessed from stored OCR output",
+            "result": result
+        })
+        if manifest.get("evaluation"):
+            status["evaluation"] = manifest["evaluation"]
+    
+    logger.info(f"Reprocessed {len(jobs)} jobs in {time.time() - start_time:.2f}s")
+    
+    return [summaries[job_id] for job_id in job_ids]
+
+
+def stored_output_pages(output_folder: str, result: dict) -> list:
+    """
+    Output pages of a stored job, from its raw OCR records and final page texts
+    
+    Args:
+        output_folder: Job output folder
+        result: Job result (with per-page texts under "pages" for multi-page jobs)
+        
+    Returns:
+        OutputPage per page, in order
+    """
+    pages = load_raw_ocr(output_folder)
+    entries = result.get("pages") or [result]
+    
+    # Jobs stored before per-page texts were kept get a single text-only page
+    if len(entries) != len(pages) or any("text" not in entry for entry in entries):
+        return [OutputPage(1, result["text"])]
+    
+    return [output_page(page, entry["text"]) for page, entry in zip(pages, entries)]
+
+
+def ocr_engine_kwargs(ocr_engine: str, subject: str = "", for_workers: bool = False) -> dict:
+    """
+    Engine parameters from config, including the recognition cascade
+    
+    Args:
+        ocr_engine: Registered engine name
+        subject: Optional subject whose lexicon biases recognition (where supported)
+        for_workers: Make the parameters picklable for OCR worker processes
+            (each worker then attaches its own region cache)
+        
+    Returns:
+        Keyword arguments for OCREngine
+    """
+    lexicon = get_lexicon(subject) if config.LEXICON_CONFIG.get("recognizer_biasing", False) else None
+    region_cache = {'use_region_cache': True} if for_workers else {'region_cache': get_region_cache()}
+    
+    ocr_config = {
+        'easyocr': {
+            'languages': config.EASYOCR_LANGUAGES,
+            'gpu': config.EASYOCR_GPU,
+            'batch_size': config.EASYOCR_BATCH_SIZE,
+            'lexicon': lexicon,
+            **region_cache
+        },
+        'easyocr_cpu': {
+            'languages': config.EASYOCR_LANGUAGES,
+            'batch_size': config.EASYOCR_BATCH_SIZE,
+            'lexicon': lexicon,
+            **region_cache,
+            **config.EASYOCR_CPU_CONFIG
+        },
+        'google_vision': {
+            'credentials_path': config.GOOGLE_CREDENTIALS_PATH,
+            **config.GOOGLE_VISION_CONFIG
+        },
+        'tesseract': {**config.TESSERACT_CONFIG, 'lexicon': lexicon}
+    }
+    ocr_config['auto'] = {**config.OCR_ROUTER_CONFIG, 'engine_kwargs': dict(ocr_config)}
+    
+    cascade_config = dict(config.OCR_CASCADE_CONFIG)
+    cascade_config["escalate_kwargs"] = ocr_config.get(cascade_config.get("escalate_engine"), {})
+    
+    return {'cascade': cascade_config, **ocr_config.get(ocr_engine, {})}
+
+
+def build_ocr_engine(ocr_engine: str, subject: str = "") -> OCREngine:
+    """
+    Create an OCR engine with the settings from config
+    
+    Args:
+        ocr_engine: Registered engine name
+        subject: Optional subject whose lexicon biases recognition (where supported)
+        
+    Returns:
+        OCREngine instance
+    """
+    return OCREngine(ocr_engine, **ocr_engine_kwargs(ocr_engine, subject))
+
+
+# Engines shared by all jobs, keyed by engine and subject lexicon: loading a
+# model (or opening an API channel) per job is slow and leaks resources
+_ocr_engines = {}
+
+
+def ocr_engine_key(ocr_engine: str, subject: str = "") -> str:
+    """Identity of an engine configuration: the engine name and the lexicon it is biased with"""
+    lexicon = get_lexicon(subject) if config.LEXICON_CONFIG.get("recognizer_biasing", False) else None
+    return f"{ocr_engine}:{lexicon.name if lexicon else ''}"
+
+
+def get_ocr_engine(ocr_engine: str, subject: str = "") -> OCREngine:
+    """
+    Get the process-wide OCR engine for an engine name and subject (created once, then shared)
+    
+    Args:
+        ocr_engine: Registered engine name
+        subject: Optional subject whose lexicon biases recognition (where supported)
+        
+    Returns:
+        OCREngine instance
+    """
+    key = ocr_engine_key(ocr_engine, subject)
+    if key not in _ocr_engines:
+        _ocr_engines[key] = build_ocr_engine(ocr_engine, subject)
+    return _ocr_engines[key]
+
+
+def close_ocr_engines():
+    """Release all cached OCR engines (application shutdown)"""
+    for engine in _ocr_engines.values():
+        engine.close()
+    _ocr_engines.clear()
+
+
+def build_page_recognizer(ocr_engine: str, subject: str = ""):
+    """
+    Get the recognizer for the pages of a multi-page job
+    
+    With config.OCR_WORKER_CONFIG["workers"] > 1 pages are spread over the
+    OCR worker pool for this engine and subject; otherwise they are
+    recognized in-process.
+    
+    Args:
+        ocr_engine: Registered engine name
+        subject: Optional subject whose lexicon biases recognition (where supported)
+        
+    Returns:
+        OCRWorkerPool or OCREngine (both provide recognize_batch)
+    """
+    if config.OCR_WORKER_CONFIG.get("workers", 1) > 1:
+        return get_worker_pool(
+            ocr_engine,
+            ocr_engine_kwargs(ocr_engine, subject, for_workers=True),
+            key=ocr_engine_key(ocr_engine, subject)
+        )
+    
+    return get_ocr_engine(ocr_engine, subject)
+
+
+def page_content(preprocessor: ImagePreprocessor, image: Image.Image) -> tuple:
+    """
+    Select the part of a preprocessed page that should be OCR'd
+    
+    Args:
+        preprocessor: Preprocessor providing the layout pass
+        image: Preprocessed PIL Image
+        
+    Returns:
+        Tuple of (image to OCR or None for a skipped blank page, (offset_x, offset_y))
+    """
+    if not (config.PREPROCESS_CONFIG.get("skip_blank_pages", True) or
+            config.PREPROCESS_CONFIG.get("crop_to_content", True)):
+        return image, (0, 0)
+    
+    content, offset = preprocessor.crop_to_content(image)
+    
+    if content is None:
+        if config.PREPROCESS_CONFIG.get("skip_blank_pages", True):
+            return None, (0, 0)
+        return image, (0, 0)
+    
+    if not config.PREPROCESS_CONFIG.get("crop_to_content", True):
+        return image, (0, 0)
+    
+    return content, offset
+
+
+def recognize_pages(ocr, preprocessor: ImagePreprocessor, images: list) -> list:
+    """
+    Run OCR on the content of several preprocessed pages as one batch
+    
+    Blank pages are skipped entirely and other pages are cropped to their
+    ink-bearing regions; the crops go through OCREngine.recognize_batch
+    together (EasyOCR batches text regions across pages, Google Vision
+    sends batch requests). Word boxes are mapped back to page coordinates.
+    
+    Args:
+        ocr: OCR engine or OCR worker pool
+        preprocessor: Preprocessor providing the layout pass
+        images: Preprocessed PIL Images
+        
+    Returns:
+        OCRResult per page, in order
+    """
+    contents = [page_content(preprocessor, image) for image in images]
+    crops = [content for content, _ in contents if content is not None]
+    recognized = iter(ocr.recognize_batch(crops) if crops else [])
+    
+    results = []
+    for content, (offset_x, offset_y) in contents:
+        if content is None:
+            logger.info("Skipping OCR on blank page")
+            results.append(OCRResult(text="", confidence=0.0, metadata={"blank_page": True}))
+            continue
+        
+        result = next(recognized)
+        if result.layout is not None:
+            result.layout.translate(offset_x, offset_y)
+        result.metadata["content_box"] = [offset_x, offset_y, offset_x + content.width, offset_y + content.height]
+        results.append(result)
+    
+    return results
 
 
 @app.get("/status/{job_id}")
@@ -268,7 +1339,7 @@ async def download_file(job_id: str, format: str):
     
     Args:
         job_id: Job identifier
-        format: File format ('txt' or 'docx')
+        format: File format (one of config.OUTPUT_FORMATS)
         
     Returns:
         File download
@@ -278,7 +1349,7 @@ async def download_file(job_id: str, format: str):
     
     file_path = os.path.join(config.OUTPUT_FOLDER, job_id, f"extracted_text.{format}")
     
-    if not os.path.exists(file_path):
+    if not await asyncio.to_thread(os.path.exists, file_path):
         raise HTTPException(status_code=404, detail="File not found")
     
     return FileResponse(
@@ -288,6 +1359,121 @@ async def download_file(job_id: str, format: str):
     )
 
 
+def export_files(job_ids: list, formats: list) -> list:
+    """
+    Archive members for the outputs of finished jobs
+    
+    Each job gets a folder named after its upload (plus the start of its
+    id, so equal filenames stay apart); formats a job lacks are skipped.
+    
+    Args:
+        job_ids: Jobs to export, in archive order
+        formats: Output formats to include
+        
+    Returns:
+        (member name, path) pairs
+    """
+    files = []
+    for job_id in job_ids:
+        output_folder = os.path.join(config.OUTPUT_FOLDER, job_id)
+        status = processing_status.get(job_id)
+        
+        if status is not None and status["status"] == "processing":
+            raise HTTPException(status_code=409, detail=f"Job is still processing: {job_id}")
+        
+        if status is not None:
+            filename = status["filename"]
+        else:
+            manifest = load_manifest(output_folder) if ID_PATTERN.match(job_id) else None
+            if manifest is None:
+                raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+            filename = manifest["filename"]
+        
+        stem = Path(filename.replace("\\", "/")).stem
+        folder = f"{stem}_{job_id[:8]}"
+        for format in formats:
+            path = os.path.join(output_folder, f"extracted_text.{format}")
+            if os.path.exists(path):
+                files.append((f"{folder}/extracted_text.{format}", path))
+    
+    return files
+
+
+@app.get("/export")
+async def export_outputs(request: Request, job_ids: str = "", batch_id: str = "", formats: str = ""):
+    """
+    Download the outputs of many jobs (e.g. a whole class) as one ZIP archive
+    
+    The archive is streamed as it is read from the job folders, never staged
+    on disk. Range requests are honoured (with If-Range against the ETag),
+    so interrupted downloads resume where they stopped.
+    
+    Args:
+        request: Incoming request (Range / If-Range headers)
+        job_ids: Comma-separated job ids
+        batch_id: Export every stored job uploaded with this batch id
+        formats: Comma-separated formats (default EXPORT_CONFIG["formats"])
+        
+    Returns:
+        application/zip response (206 for a range)
+    """
+    ids = parse_job_ids(job_ids)
+    if batch_id:
+        if not ID_PATTERN.match(batch_id):
+            raise HTTPException(status_code=400, detail="Invalid batch id")
+        batch_jobs = await asyncio.to_thread(list_batch_jobs, config.OUTPUT_FOLDER, batch_id)
+        if not batch_jobs:
+            raise HTTPException(status_code=404, detail=f"No stored jobs in batch: {batch_id}")
+        ids = list(dict.fromkeys(ids + batch_jobs))
+    
+    if not ids:
+        raise HTTPException(status_code=400, detail="Give job_ids or a batch_id")
+    
+    formats = [format.strip() for format in formats.split(",") if format.strip()] or config.EXPORT_CONFIG["formats"]
+    invalid = [format for format in formats if format not in config.OUTPUT_FORMATS]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Invalid format {invalid[0]}. Choose from {config.OUTPUT_FORMATS}")
+    
+    files = await asyncio.to_thread(export_files, ids, formats)
+    if not files:
+        raise HTTPException(status_code=404, detail="No output files to export")
+    
+    try:
+        archive = await asyncio.to_thread(StreamingZip, files)
+    except ValueError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": archive.etag,
+        "Content-Disposition": f'attachment; filename="{batch_id or "outputs"}.zip"'
+    }
+    
+    # A stale If-Range validator means the archive changed: send all of it
+    byte_range = None
+    if request.headers.get("if-range", archive.etag) == archive.etag:
+        try:
+            byte_range = parse_byte_range(request.headers.get("range"), archive.size)
+        except ValueError:
+            raise HTTPException(
+                status_code=416,
+                detail="Requested range not satisfiable",
+                headers={"Content-Range": f"bytes */{archive.size}"}
+            )
+    
+    logger.info(f"Exporting {len(files)} files from {len(ids)} jobs ({archive.size} bytes)")
+    
+    # A sync generator is iterated in the threadpool, so file reads do not block the event loop
+    if byte_range is None:
+        headers["Content-Length"] = str(archive.size)
+        return StreamingResponse(archive.iter_range(), media_type="application/zip", headers=headers)
+    
+    start, end = byte_range
+    headers["Content-Length"] = str(end - start)
+    headers["Content-Range"] = f"bytes {start}-{end - 1}/{archive.size}"
+    return StreamingResponse(archive.iter_range(start, end), status_code=206, media_type="application/zip", headers=headers)
+
+
 @app.get("/result/{job_id}")
 async def get_result(job_id: str):
     """
@@ -321,15 +1507,9 @@ async def cleanup_job(job_id: str):
     Returns:
         Success message
     """
-    # Remove upload folder
-    upload_folder = os.path.join(config.UPLOAD_FOLDER, job_id)
-    if os.path.exists(upload_folder):
-        shutil.rmtree(upload_folder)
-    
-    # Remove output folder
-    output_folder = os.path.join(config.OUTPUT_FOLDER, job_id)
-    if os.path.exists(output_folder):
-        shutil.rmtree(output_folder)
+    # Remove upload and output folders
+    await asyncio.to_thread(shutil.rmtree, os.path.join(config.UPLOAD_FOLDER, job_id), ignore_errors=True)
+    await asyncio.to_thread(shutil.rmtree, os.path.join(config.OUTPUT_FOLDER, job_id), ignore_errors=True)
     
     # Remove from status
     if job_id in processing_status:
@@ -340,6 +1520,216 @@ async def cleanup_job(job_id: str):
     return JSONResponse({"message": "Job cleaned up successfully"})
 
 
+def parse_job_ids(job_ids: str) -> list:
+    """Split a comma-separated list of job ids, dropping blanks and duplicates"""
+    return list(dict.fromkeys(job_id.strip() for job_id in job_ids.split(",") if job_id.strip()))
+
+
+# POSTPROCESS_CONFIG keys a client may override: key -> (type, allowed values or (min, max)).
+# Paths, regexes and pool sizes stay server-side.
+POSTPROCESS_OVERRIDES = {
+    "remove_extra_spaces": (bool, None),
+    "spell_check": (bool, None),
+    "spell_engine": (str, ("symspell", "textblob")),
+    "min_confidence": (float, (0.0, 1.0)),
+    "spell_confidence_threshold": (float, (0.0, 1.0)),
+    "spell_max_edit_distance": (int, (1, 2)),
+}
+
+
+def parse_postprocess_overrides(postprocess: str) -> dict:
+    """
+    Parse and validate a JSON object of POSTPROCESS_CONFIG overrides from a form field
+    
+    Only the keys in POSTPROCESS_OVERRIDES are accepted, with values of the
+    right type inside their allowed set or range.
+    
+    Raises:
+        HTTPException: 400 for malformed JSON, unknown keys or invalid values
+    """
+    if not postprocess:
+        return {}
+    
+    try:
+        overrides = json.loads(postprocess)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid postprocess overrides: {str(e)}")
+    
+    if not isinstance(overrides, dict):
+        raise HTTPException(status_code=400, detail="Postprocess overrides must be a JSON object")
+    
+    for key, value in overrides.items():
+        if key not in POSTPROCESS_OVERRIDES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Postprocess setting '{key}' cannot be overridden. Allowed: {', '.join(POSTPROCESS_OVERRIDES)}"
+            )
+        
+        kind, allowed = POSTPROCESS_OVERRIDES[key]
+        if kind is bool:
+            valid = isinstance(value, bool)
+        elif kind is str:
+            valid = isinstance(value, str) and value in allowed
+        else:
+            # JSON numbers; booleans are ints in Python but not valid here
+            numeric = (int, float) if kind is float else (int,)
+            valid = isinstance(value, numeric) and not isinstance(value, bool) and allowed[0] <= value <= allowed[1]
+        
+        if not valid:
+            expected = kind.__name__ if allowed is None else (
+                f"one of {', '.join(allowed)}" if kind is str else f"{kind.__name__} in [{allowed[0]}, {allowed[1]}]"
+            )
+            raise HTTPException(status_code=400, detail=f"Invalid value for '{key}': expected {expected}")
+    
+    return overrides
+
+
+@app.post("/reprocess/{job_id}")
+async def reprocess_job(job_id: str, postprocess: str = Form(default="")):
+    """
+    Re-run postprocessing, outputs and evaluation of a job from its stored OCR output
+    
+    Only stages whose configuration (or upstream output) changed since they
+    last ran are recomputed; OCR is never repeated.
+    
+    Args:
+        job_id: Job identifier
+        postprocess: Optional JSON object of POSTPROCESS_CONFIG overrides,
+            e.g. {"spell_check": false}
+            
+    Returns:
+        Stages re-run and the updated result
+    """
+    overrides = parse_postprocess_overrides(postprocess)
+    summary = (await asyncio.to_thread(reprocess_jobs, [job_id], overrides))[0]
+    
+    if "error" in summary:
+        status_code = 409 if job_id in processing_status and processing_status[job_id]["status"] == "processing" else 404
+        raise HTTPException(status_code=status_code, detail=summary["error"])
+    
+    return JSONResponse({**summary, "result": processing_status[job_id]["result"]})
+
+
+@app.post("/reprocess")
+async def reprocess_batch(job_ids: str = Form(default=""), postprocess: str = Form(default="")):
+    """
+    Re-run the stages after OCR for many jobs (e.g. a whole class) from their stored OCR output
+    
+    Args:
+        job_ids: Comma-separated job ids (all stored jobs if empty)
+        postprocess: Optional JSON object of POSTPROCESS_CONFIG overrides
+        
+    Returns:
+        Per-job summary of the stages re-run
+    """
+    overrides = parse_postprocess_overrides(postprocess)
+    
+    ids = parse_job_ids(job_ids)
+    invalid = [job_id for job_id in ids if not ID_PATTERN.match(job_id)]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Invalid job id: {invalid[0]}")
+    
+    if not ids:
+        ids = await asyncio.to_thread(list_stored_jobs, config.OUTPUT_FOLDER)
+    
+    start_time = time.time()
+    summaries = await asyncio.to_thread(reprocess_jobs, ids, overrides)
+    
+    return JSONResponse({
+        "jobs": summaries,
+        "reprocessed": sum(1 for summary in summaries if summary.get("rerun")),
+        "processing_time": time.time() - start_time
+    })
+
+
+@app.post("/templates")
+async def register_template(name: str = Form(...), file: UploadFile = File(...)):
+    """
+    Register a blank answer-sheet form as a template
+    
+    Args:
+        name: Template name (letters, digits, '_' and '-')
+        file: Blank form image
+        
+    Returns:
+        Template summary
+    """
+    file_ext = os.path.splitext(file.filename)[1].lower()
+    if file_ext not in config.ALLOWED_EXTENSIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid file type. Allowed: {', '.join(config.ALLOWED_EXTENSIONS)}"
+        )
+    
+    data = await file.read()
+    try:
+        image = await asyncio.to_thread(decode_image, data)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Failed to load image: {str(e)}")
+    
+    # Preprocess exactly like uploaded pages so masks line up
+    preprocessor = ImagePreprocessor(config.PREPROCESS_CONFIG)
+    processed_image = await asyncio.to_thread(preprocessor.preprocess, image)
+    
+    try:
+        registered = await asyncio.to_thread(get_template_registry().register, name, processed_image)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return JSONResponse({
+        "name": registered.name,
+        "size": list(registered.size),
+        "features": len(registered.keypoints)
+    })
+
+
+@app.get("/templates")
+async def list_templates():
+    """List registered answer-sheet templates"""
+    return JSONResponse({"templates": await asyncio.to_thread(get_template_registry().list_templates)})
+
+
+@app.delete("/templates/{name}")
+async def delete_template(name: str):
+    """
+    Remove a registered template
+    
+    Args:
+        name: Template name
+        
+    Returns:
+        Success message
+    """
+    if not await asyncio.to_thread(get_template_registry().remove, name):
+        raise HTTPException(status_code=404, detail="Template not found")
+    
+    return JSONResponse({"message": f"Template '{name}' removed"})
+
+
+@app.get("/engines")
+async def get_engines():
+    """List registered OCR engines and their capabilities"""
+    return JSONResponse({"default": config.OCR_ENGINE, "engines": list_engines()})
+
+
+@app.get("/lexicons")
+async def get_lexicons():
+    """List subjects with a vocabulary lexicon"""
+    return JSONResponse({"subjects": list_subjects()})
+
+
+@app.get("/metrics")
+async def get_metrics():
+    """Hit rates and sizes of the process-wide caches"""
+    region_cache = get_region_cache()
+    correction_cache = get_correction_cache()
+    
+    return JSONResponse({
+        "region_cache": region_cache.stats() if region_cache is not None else None,
+        "correction_cache": correction_cache.stats() if correction_cache is not None else None
+    })
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -390,7 +1780,8 @@ async def evaluate_answers(
         )
     
     # Perform evaluation
-    evaluation = evaluator.evaluate_answers(
+    evaluation = await asyncio.to_thread(
+        evaluator.evaluate_answers,
         extracted_text=extracted_text,
         answer_key=answer_key if answer_key else None,
         subject=subject,
@@ -405,6 +1796,12 @@ async def evaluate_answers(
     
     # Store evaluation in processing status
     processing_status[job_id]["evaluation"] = evaluation
+    await asyncio.to_thread(record_evaluation, job_id, {
+        "type": "answer_key",
+        "answer_key": answer_key,
+        "subject": subject,
+        "total_marks": total_marks
+    }, evaluation)
     
     return JSONResponse(evaluation)
 
@@ -438,10 +1835,13 @@ async def evaluate_with_reference(
     
     # Save reference file temporarily
     reference_path = os.path.join(config.UPLOAD_FOLDER, job_id, "reference_" + reference_file.filename)
-    reference_content = await reference_file.read()
-    
-    with open(reference_path, "wb") as f:
-        f.write(reference_content)
+    try:
+        await write_stream_async(reference_path, reference_file.read, max_size=config.MAX_FILE_SIZE)
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail=f"File size exceeds maximum limit of {config.MAX_FILE_SIZE / (1024*1024):.0f} MB"
+        )
     
     # Get extracted text
     extracted_text = status["result"]["text"]
@@ -456,7 +1856,8 @@ async def evaluate_with_reference(
         )
     
     # Perform evaluation with reference image
-    evaluation = evaluator.evaluate_with_reference(
+    evaluation = await asyncio.to_thread(
+        evaluator.evaluate_with_reference,
         extracted_text=extracted_text,
         reference_image_path=reference_path,
         subject=subject,
@@ -471,6 +1872,12 @@ async def evaluate_with_reference(
     
     # Store evaluation in processing status
     processing_status[job_id]["evaluation"] = evaluation
+    await asyncio.to_thread(record_evaluation, job_id, {
+        "type": "reference",
+        "reference_path": reference_path,
+        "subject": subject,
+        "total_marks": total_marks
+    }, evaluation)
     
     return JSONResponse(evaluation)
 
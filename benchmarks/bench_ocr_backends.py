@@ -0,0 +1,101 @@
+"""
+OCR Backend Benchmark
+Compares stock EasyOCR with the CPU-optimized backends (int8, ONNX Runtime)
+
+Stock EasyOCR runs in two modes: "stock-fp32" (quantize=False, the
+baseline) and "stock-int8" (EasyOCR's default, which already applies
+dynamic int8 quantization on CPU). The optimized backends start from
+fp32 models.
+
+Usage:
+    python benchmarks/bench_ocr_backends.py page1.png page2.jpg --threads 4
+"""
+import argparse
+import difflib
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+from utils.ocr_engine import OCREngine
+from utils.preprocess import ImagePreprocessor
+import config
+
+
+def run_backend(engine: OCREngine, images: list, repeats: int) -> tuple:
+    """
+    Time an engine over all images
+    
+    Returns:
+        Tuple of (seconds per page, list of texts from the last run)
+    """
+    # Warm up (first call allocates buffers / builds kernels)
+    engine.recognize_text(images[0])
+    
+    start_time = time.time()
+    for _ in range(repeats):
+        texts = [engine.recognize_text(image).text for image in images]
+    elapsed = time.time() - start_time
+    
+    return elapsed / (repeats * len(images)), texts
+
+
+def similarity(reference: list, candidate: list) -> float:
+    """Mean character-level similarity between two lists of page texts"""
+    ratios = [difflib.SequenceMatcher(None, a, b).ratio() for a, b in zip(reference, candidate)]
+    return sum(ratios) / len(ratios) if ratios else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark EasyOCR CPU backends")
+    parser.add_argument("images", nargs="+", help="Page images to recognize")
+    parser.add_argument("--threads", type=int, default=0, help="Intra-op threads (0 = default)")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed runs per backend")
+    parser.add_argument(
+        "--backends",
+        default="stock-fp32,stock-int8,int8,onnx",
+        help="Comma-separated backends (the first is the speedup baseline)"
+    )
+    args = parser.parse_args()
+    
+    preprocessor = ImagePreprocessor(config.PREPROCESS_CONFIG)
+    images = [preprocessor.preprocess(Image.open(path)) for path in args.images]
+    
+    # Disable the region cache so every backend does the full recognizer work
+    common = {"languages": config.EASYOCR_LANGUAGES, "batch_size": config.EASYOCR_BATCH_SIZE}
+    
+    reference = None
+    rows = []
+    
+    for backend in args.backends.split(","):
+        if backend in ("stock-fp32", "stock-int8"):
+            from utils.model_optimization import set_intra_op_threads
+            set_intra_op_threads(args.threads)
+            engine = OCREngine("easyocr", gpu=False, quantize=backend == "stock-int8", **common)
+        else:
+            engine = OCREngine(
+                "easyocr_cpu",
+                backend=backend,
+                intra_op_threads=args.threads,
+                model_dir=config.EASYOCR_CPU_CONFIG["model_dir"],
+                **common
+            )
+        
+        seconds, texts = run_backend(engine, images, args.repeats)
+        
+        if reference is None:
+            reference = texts
+        
+        rows.append((backend, seconds, similarity(reference, texts)))
+    
+    baseline = rows[0][1]
+    print(f"{'backend':<12} {'s/page':>8} {'speedup':>8} {'text sim':>9}")
+    for backend, seconds, sim in rows:
+        print(f"{backend:<12} {seconds:>8.3f} {baseline / seconds:>7.2f}x {sim:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Spell Correction Benchmark
+Compares the symspell index with TextBlob's correct() for speed and correction quality
+
+Misspellings are generated from dictionary words with random single and
+double edits (deletion, insertion, substitution, transposition), so the
+intended word is known for every token.
+
+Usage:
+    python benchmarks/bench_spell_correction.py --words 2000 --seed 7
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.spell_index import SpellIndex, ensure_dictionary, read_dictionary
+import config
+
+
+def misspell(word: str, edits: int, rng: random.Random) -> str:
+    """Apply random character edits to a word"""
+    for _ in range(edits):
+        i = rng.randrange(len(word))
+        kind = rng.choice(("delete", "insert", "substitute", "transpose"))
+        
+        if kind == "delete" and len(word) > 3:
+            word = word[:i] + word[i + 1:]
+        elif kind == "insert":
+            word = word[:i] + rng.choice(string.ascii_lowercase) + word[i:]
+        elif kind == "transpose" and i < len(word) - 1:
+            word = word[:i] + word[i + 1] + word[i] + word[i + 2:]
+        else:
+            word = word[:i] + rng.choice(string.ascii_lowercase) + word[i + 1:]
+    
+    return word
+
+
+def make_sample(words: list, size: int, rng: random.Random) -> tuple:
+    """
+    Draw frequency-weighted words and misspell about half of them
+    
+    Returns:
+        Tuple of (input tokens, expected tokens)
+    """
+    vocabulary = [word for word, count in words if len(word) >= 4]
+    weights = [count for word, count in words if len(word) >= 4]
+    expected = rng.choices(vocabulary, weights=weights, k=size)
+    
+    tokens = []
+    for word in expected:
+        roll = rng.random()
+        if roll < 0.5:
+            tokens.append(word)
+        elif roll < 0.85:
+            tokens.append(misspell(word, 1, rng))
+        else:
+            tokens.append(misspell(word, 2, rng))
+    
+    return tokens, expected
+
+
+def score(corrected: list, tokens: list, expected: list) -> dict:
+    """Accuracy overall, on misspelled tokens, and how often correct words were broken"""
+    wrong_in = [i for i, (t, e) in enumerate(zip(tokens, expected)) if t != e]
+    right_in = [i for i, (t, e) in enumerate(zip(tokens, expected)) if t == e]
+    
+    return {
+        "accuracy": sum(c == e for c, e in zip(corrected, expected)) / len(expected),
+        "fixed": sum(corrected[i] == expected[i] for i in wrong_in) / max(len(wrong_in), 1),
+        "broken": sum(corrected[i] != expected[i] for i in right_in) / max(len(right_in), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark spell correction engines")
+    parser.add_argument("--words", type=int, default=2000, help="Tokens in the sample text")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed")
+    parser.add_argument(
+        "--dictionary",
+        default=config.POSTPROCESS_CONFIG.get("spell_dictionary", "static/models/spelling_en.txt"),
+        help="Dictionary file (\"word count\" lines)"
+    )
+    parser.add_argument("--skip-textblob", action="store_true", help="Only run the symspell index")
+    args = parser.parse_args()
+    
+    rng = random.Random(args.seed)
+    path = ensure_dictionary(args.dictionary)
+    tokens, expected = make_sample(list(read_dictionary(path)), args.words, rng)
+    text = " ".join(tokens)
+    
+    rows = []
+    
+    start_time = time.time()
+    index = SpellIndex.load(path, config.POSTPROCESS_CONFIG.get("spell_max_edit_distance", 2))
+    build_time = time.time() - start_time
+    
+    start_time = time.time()
+    corrected = index.correct(text).split()
+    rows.append(("symspell", build_time, time.time() - start_time, score(corrected, tokens, expected)))
+    
+    if not args.skip_textblob:
+        from textblob import TextBlob
+        
+        start_time = time.time()
+        corrected = str(TextBlob(text).correct()).split()
+        rows.append(("textblob", 0.0, time.time() - start_time, score(corrected, tokens, expected)))
+    
+    misspelled = sum(t != e for t, e in zip(tokens, expected))
+    print(f"{args.words} tokens, {misspelled} misspelled")
+    print(f"{'engine':<10} {'build s':>8} {'correct s':>10} {'tok/s':>9} {'accuracy':>9} {'fixed':>7} {'broken':>7}")
+    
+    for name, build_seconds, seconds, result in rows:
+        print(
+            f"{name:<10} {build_seconds:>8.2f} {seconds:>10.3f} {args.words / max(seconds, 1e-9):>9.0f} "
+            f"{result['accuracy']:>9.3f} {result['fixed']:>7.3f} {result['broken']:>7.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
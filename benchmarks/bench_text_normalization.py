@@ -0,0 +1,99 @@
+"""
+Text Normalization Benchmark
+Compares the compiled single-pass normalizer with the former chain of re.sub passes
+
+The sample text is OCR-like: words, stray zeros and l's, tildes, backticks,
+symbols that get stripped, and irregular spaces, tabs and blank lines. Both
+implementations must produce identical output; the benchmark fails otherwise.
+
+Usage:
+    python benchmarks/bench_text_normalization.py --size 5000000 --repeat 3
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.normalize import TextNormalizer
+
+PIECES = [
+    "the", "cell", "membrane", "0", "l", "Energy", "x~y", "`quote`", "100", "l0l",
+    "(a)", "[b]", "{c}", "e=mc2", "50%", "a&b", "“smart”", "‘single’", "©", "•", "→",
+    "café", "naïve", "α", "über",
+]
+GAPS = [" ", " ", " ", "  ", "   ", "\t", " \t ", "\n", " \n", "\n\n", " \n \n\n  ", "\r\n", " "]
+
+
+def legacy_normalize(text: str) -> str:
+    """The former _remove_extra_spaces followed by _fix_common_errors"""
+    text = re.sub(r' +', ' ', text)
+    text = '\n'.join(line.strip() for line in text.split('\n'))
+    text = re.sub(r'\n\n+', '\n\n', text)
+    text = text.strip()
+    
+    replacements = {
+        r'\b0\b': 'O',
+        r'\bl\b': 'I',
+        r'~': '-',
+        r'[''`]': "'",
+        r'["""]': '"',
+    }
+    for pattern, replacement in replacements.items():
+        text = re.sub(pattern, replacement, text)
+    
+    return re.sub(r'[^\w\s\.,;:!?\-\'"()\[\]{}/@#$%&*+=]', '', text)
+
+
+def make_text(size: int, rng: random.Random) -> str:
+    """Random OCR-like text of about size characters"""
+    parts = []
+    length = 0
+    while length < size:
+        piece = rng.choice(PIECES) + rng.choice(GAPS)
+        parts.append(piece)
+        length += len(piece)
+    return "".join(parts)
+
+
+def timed(function, text: str, repeat: int) -> tuple:
+    """Best wall time over repeat runs, and the output"""
+    best = None
+    for _ in range(repeat):
+        start_time = time.time()
+        output = function(text)
+        seconds = time.time() - start_time
+        best = seconds if best is None else min(best, seconds)
+    return best, output
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark text normalization")
+    parser.add_argument("--size", type=int, default=5_000_000, help="Characters in the sample text")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per implementation (best is reported)")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed")
+    args = parser.parse_args()
+    
+    text = make_text(args.size, random.Random(args.seed))
+    normalizer = TextNormalizer()
+    
+    legacy_seconds, expected = timed(legacy_normalize, text, args.repeat)
+    compiled_seconds, output = timed(normalizer.normalize, text, args.repeat)
+    
+    if output != expected:
+        position = next((i for i, (a, b) in enumerate(zip(output, expected)) if a != b), min(len(output), len(expected)))
+        print(f"Output differs at character {position}: {output[position:position + 40]!r} != {expected[position:position + 40]!r}")
+        sys.exit(1)
+    
+    megabytes = len(text) / 1e6
+    print(f"{len(text)} characters, outputs identical")
+    print(f"{'implementation':<16} {'seconds':>8} {'MB/s':>8}")
+    print(f"{'re.sub chain':<16} {legacy_seconds:>8.3f} {megabytes / max(legacy_seconds, 1e-9):>8.1f}")
+    print(f"{'compiled':<16} {compiled_seconds:>8.3f} {megabytes / max(compiled_seconds, 1e-9):>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
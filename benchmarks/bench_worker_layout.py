@@ -0,0 +1,74 @@
+"""
+OCR Worker Layout Benchmark
+Finds the fastest "workers x threads" layout for OCR on this machine
+
+Usage:
+    python benchmarks/bench_worker_layout.py page1.png page2.png --pages 32 --pin
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+from utils.ocr_workers import OCRWorkerPool, available_cores, parse_layout
+from utils.preprocess import ImagePreprocessor
+import config
+
+
+def candidate_layouts(cores: int) -> list:
+    """Layouts whose workers x threads fits the core count"""
+    layouts = []
+    workers = 1
+    while workers <= cores:
+        layouts.append((workers, max(1, cores // workers)))
+        workers *= 2
+    return layouts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark OCR worker layouts")
+    parser.add_argument("images", nargs="+", help="Sample page images")
+    parser.add_argument("--engine", default=config.OCR_ENGINE, help="OCR engine")
+    parser.add_argument("--pages", type=int, default=16, help="Pages per measurement")
+    parser.add_argument("--layouts", default="", help="Comma-separated layouts, e.g. '1x8,2x4,4x2'")
+    parser.add_argument("--pin", action="store_true", help="Pin workers to core sets")
+    args = parser.parse_args()
+    
+    preprocessor = ImagePreprocessor(config.PREPROCESS_CONFIG)
+    samples = [preprocessor.preprocess(Image.open(path)) for path in args.images]
+    pages = [samples[i % len(samples)] for i in range(args.pages)]
+    
+    if args.layouts:
+        layouts = [parse_layout(layout) for layout in args.layouts.split(",")]
+    else:
+        layouts = candidate_layouts(len(available_cores()))
+    
+    engine_kwargs = {
+        "languages": config.EASYOCR_LANGUAGES,
+        "batch_size": config.EASYOCR_BATCH_SIZE,
+    }
+    
+    results = []
+    for workers, threads in layouts:
+        with OCRWorkerPool(args.engine, engine_kwargs, workers, threads, args.pin) as pool:
+            # Warm up every worker (model loading is not part of throughput)
+            pool.recognize_batch(pages[:workers])
+            
+            start_time = time.time()
+            pool.recognize_batch(pages)
+            elapsed = time.time() - start_time
+        
+        pages_per_second = len(pages) / elapsed
+        results.append((f"{workers}x{threads}", pages_per_second))
+        print(f"{workers}x{threads}: {pages_per_second:.2f} pages/s")
+    
+    best_layout, best_rate = max(results, key=lambda item: item[1])
+    print(f"\nBest layout on {len(available_cores())} cores: {best_layout} ({best_rate:.2f} pages/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,7 +16,27 @@ PORT = 8000
 UPLOAD_FOLDER = "static/uploads"
 OUTPUT_FOLDER = "static/outputs"
 MAX_FILE_SIZE = 50 * 1024 * 1024  # 50 MB
-ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".tiff", ".tif", ".webp"}  # Image formats only
+ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".tiff", ".tif", ".webp", ".pdf"}
+
+# File I/O on the request path (runs off the event loop)
+IO_CONFIG = {
+    "fsync": "none",                  # "none" (OS decides), "files" (fsync before each atomic rename), "full" (also fsync the folder)
+    "upload_chunk_size": 1024 * 1024, # Bytes per chunk when saving uploads
+}
+
+# PDF ingestion (pages are rendered and OCR'd one at a time; needs Poppler)
+PDF_CONFIG = {
+    "dpi": 300,
+    "prefetch_pages": 1,  # Pages rendered ahead while the current page is OCR'd
+    "max_pages": 200,     # Reject uploads selecting more pages (0 = no limit)
+    "max_page_pixels": 80000000,  # Reject pages larger than this when rendered at dpi (~A1 at 300 DPI; 0 = no limit)
+    "use_text_layer": True,   # Return an existing text layer directly, skipping OCR
+    "extract_images": True,   # Use a page's single embedded scan at native resolution
+    "min_text_chars": 20,     # Fewest letters/digits for a text layer to count as usable
+    "min_text_density": 4.0,  # Fewest letters/digits per square inch (~370 on a Letter page); sparser pages are OCR'd
+}
+
+TEMPLATE_FOLDER = "static/templates"  # Registered blank answer-sheet forms
 
 # Image preprocessing settings
 PREPROCESS_CONFIG = {
@@ -27,18 +47,101 @@ PREPROCESS_CONFIG = {
     "median_blur_kernel": 3,
     "clahe_clip_limit": 2.0,
     "clahe_grid_size": (8, 8),
+    "skip_blank_pages": True,  # Skip OCR on pages without ink
+    "crop_to_content": True,   # OCR only the ink-bearing part of the page
+    "blank_ink_ratio": 0.0002, # Pages with less ink (fraction of pixels, ~ one word at 300 DPI) are blank
+    "blank_min_contrast": 40,  # Pages whose ink is less than this many grey levels darker than the paper are blank
+    "content_margin": 16,      # Pixels kept around content regions
+    "min_region_area": 150,    # Ignore smaller ink blobs (pixels)
+}
+
+# Answer-sheet template subtraction (align page to a blank form, mask printed content)
+TEMPLATE_CONFIG = {
+    "orb_features": 5000,     # Keypoints detected per image
+    "match_ratio": 0.75,      # Lowe's ratio test threshold
+    "min_matches": 15,        # Minimum good matches to trust the alignment
+    "ransac_threshold": 5.0,  # Homography reprojection error (pixels)
+    "mask_dilation": 3,       # Grow printed-content mask to cover scan jitter
 }
 
 # OCR Engine settings
-# Options: 'easyocr', 'google_vision'
+# Options: 'easyocr', 'easyocr_cpu', 'google_vision', 'tesseract', 'auto'
 OCR_ENGINE = "easyocr"  # Default engine
 
 # EasyOCR settings
 EASYOCR_LANGUAGES = ['en']
 EASYOCR_GPU = False  # Set to True if GPU is available
+EASYOCR_BATCH_SIZE = 16  # Text regions per recognizer forward pass
+OCR_PAGE_BATCH = 4  # Pages of a multi-page job recognized together (peak memory grows with it)
+
+# CPU-optimized EasyOCR ('easyocr_cpu' engine)
+EASYOCR_CPU_CONFIG = {
+    # 'onnx': detector and recognizer on ONNX Runtime (needs onnxruntime; falls back to 'int8').
+    # 'int8': dynamic quantization of the recognizer only - the same as stock EasyOCR on CPU,
+    # kept as the fallback and benchmark reference. Compare on your host with
+    # benchmarks/bench_ocr_backends.py before switching.
+    "backend": "onnx",
+    "intra_op_threads": 0,      # Threads per operator (0 = library default)
+    "model_dir": "static/models",  # Exported ONNX graphs
+}
+
+# Region cache: recognized text regions keyed by a perceptual hash of the crop,
+# so repeated printed fragments (question numbers, headers, stamps) skip the recognizer
+REGION_CACHE_CONFIG = {
+    "enabled": True,
+    "max_entries": 50000,  # Regions kept in memory (LRU)
+    "db_path": "static/cache/regions.sqlite3",  # Persistent tier ("" for memory only)
+    "hash_size": (32, 8),  # Perceptual hash grid (width, height)
+}
+
+# Two-pass OCR cascade: read the page at low resolution first, then re-run
+# only regions below confidence_threshold at full resolution (or on
+# escalate_engine, e.g. 'google_vision', when set)
+OCR_CASCADE_CONFIG = {
+    "enabled": False,
+    "low_res_scale": 0.5,
+    "confidence_threshold": 0.6,
+    "region_padding": 4,  # Pixels added around escalated regions
+    "min_coverage": 0.1,  # First passes whose regions cover less of the page are redone at full resolution
+    "escalate_engine": "",
+}
+
+# Tesseract settings (fast engine for printed or very clean text)
+TESSERACT_CONFIG = {
+    "lang": "eng",
+    "psm": 3,  # Page segmentation mode (3 = fully automatic)
+}
+
+# Auto-router ('auto' engine): printed pages/regions go to the fast engine,
+# handwriting to the deep-learning engine
+OCR_ROUTER_CONFIG = {
+    "printed_engine": "tesseract",
+    "handwriting_engine": "easyocr",
+    "per_region": False,    # Route each content region instead of whole pages
+    "max_height_cv": 0.35,  # Glyph height variation allowed for printed text
+    "max_stroke_cv": 0.45,  # Stroke width variation allowed for printed text
+}
+
+# OCR worker layout ("workers x threads"): torch/OpenCV threads are limited per
+# worker so several readers on one host do not oversubscribe the cores.
+# Use benchmarks/bench_worker_layout.py to find the best layout for a machine.
+OCR_WORKER_CONFIG = {
+    "workers": 1,             # OCR worker processes sharing the pages of multi-page jobs (1 = in-process)
+    "threads_per_worker": 0,  # Intra-op threads per worker (0 = cores / workers)
+    "pin_cores": False,       # Pin each worker to its own core set (Linux)
+}
 
 # Google Vision API settings (optional)
 GOOGLE_CREDENTIALS_PATH = os.getenv("GOOGLE_APPLICATION_CREDENTIALS", "")
+GOOGLE_VISION_CONFIG = {
+    "encoding": "png",        # 'png' (lossless) or 'jpeg' (smaller uploads)
+    "jpeg_quality": 90,
+    "pages_per_request": 8,   # Pages per batch_annotate_images call (max 16)
+    "concurrency": 4,         # Batch requests in flight
+    "timeout": 60.0,          # Seconds per request
+    "api_endpoint": os.getenv("GOOGLE_VISION_ENDPOINT", ""),  # e.g. "localhost:8090" for a stand-in server
+    "insecure": False,        # Plain-text gRPC channel (local stand-in servers only)
+}
 
 # Gemini API settings (for answer evaluation)
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")  # Set your Gemini API key here
@@ -49,12 +152,42 @@ POSTPROCESS_CONFIG = {
     "remove_extra_spaces": True,
     "spell_check": True,
     "min_confidence": 0.5,  # Minimum confidence threshold
+    "spell_engine": "symspell",  # 'symspell' (indexed, fast) or 'textblob'
+    "spell_dictionary": "static/models/spelling_en.txt",  # "word count" lines; seeded from TextBlob if missing
+    "spell_max_edit_distance": 2,
+    "spell_confidence_threshold": 0.8,  # Only words read with lower OCR confidence are corrected
+    "workers": 1,              # Processes for multi-page postprocessing (1 = in-process, 0 = one per core)
+    "parallel_min_texts": 4,   # Smaller batches stay in-process
+    # Overrides of the utils/normalize.py defaults: char_map, word_map, regex_rules, strip_pattern
+    "normalization": {},
+}
+
+# Per-subject vocabularies (data/lexicons/<subject>.txt), selected by the upload's subject
+LEXICON_CONFIG = {
+    "folder": "data/lexicons",
+    # Word beam search over the lexicon (EasyOCR) / user words (Tesseract). Off by default:
+    # EasyOCR's word beam search is far slower than greedy decoding; enable it only where
+    # measured accuracy gains on your sheets justify the latency
+    "recognizer_biasing": False,
+    "correction": True,          # Prefer and protect domain words during spell correction
+}
+
+# Process-wide memo of word corrections, shared by all jobs
+CORRECTION_CACHE_CONFIG = {
+    "enabled": True,
+    "max_entries": 100000,  # Corrections kept in memory (LRU)
+    "db_path": "static/cache/corrections.sqlite3",  # Persistent tier ("" for memory only)
 }
 
 # Output settings
-OUTPUT_FORMATS = ["txt", "docx"]
+OUTPUT_FORMATS = ["txt", "docx", "json", "hocr", "pdf"]
 DEFAULT_OUTPUT_FORMAT = "txt"
 
+# Bulk export (/export) of many jobs' outputs as one streamed ZIP
+EXPORT_CONFIG = {
+    "formats": ["txt", "docx"],  # Default formats included per job
+}
+
 # Logging settings
 LOG_PROCESSING_TIME = True
 LOG_CONFIDENCE_SCORES = True
@@ -62,3 +195,4 @@ LOG_CONFIDENCE_SCORES = True
 # Create required directories
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 os.makedirs(OUTPUT_FOLDER, exist_ok=True)
+os.makedirs(TEMPLATE_FOLDER, exist_ok=True)
@@ -0,0 +1,116 @@
+"""
+Tests for the streamed ZIP export and HTTP byte ranges
+"""
+import io
+import os
+import zipfile
+
+import pytest
+
+from utils.archive import StreamingZip, parse_byte_range
+
+
+@pytest.fixture
+def files(tmp_path):
+    """Three job outputs of different sizes, one of them empty"""
+    contents = {
+        "essay_1a2b3c4d/extracted_text.txt": b"The cell membrane controls what enters the cell.\n" * 200,
+        "essay_1a2b3c4d/extracted_text.json": os.urandom(70000),
+        "report_5e6f7a8b/extracted_text.txt": b"",
+    }
+    pairs = []
+    for index, (name, data) in enumerate(contents.items()):
+        path = tmp_path / f"file_{index}"
+        path.write_bytes(data)
+        pairs.append((name, str(path)))
+    return pairs, contents
+
+
+def full_stream(archive):
+    return b"".join(archive)
+
+
+def test_full_stream_is_a_valid_zip(files):
+    pairs, contents = files
+    archive = StreamingZip(pairs)
+    data = full_stream(archive)
+    
+    assert len(data) == archive.size
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        assert zf.testzip() is None
+        assert zf.namelist() == list(contents)
+        for name, expected in contents.items():
+            assert zf.read(name) == expected
+
+
+def test_empty_archive_is_valid():
+    archive = StreamingZip([])
+    data = full_stream(archive)
+    
+    assert len(data) == archive.size
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        assert zf.namelist() == []
+
+
+def test_byte_ranges_match_slices_of_the_full_stream(files):
+    pairs, _ = files
+    archive = StreamingZip(pairs)
+    data = full_stream(archive)
+    
+    # Range edges inside headers, inside file data, at member boundaries and in the central directory
+    edges = sorted({0, 1, 29, 30, 100, archive.entries[1].offset, archive.entries[1].data_offset,
+                    archive.entries[2].offset, archive.central_offset, archive.size - 22, archive.size - 1,
+                    archive.size} | set(range(0, archive.size, 9973)))
+    for start in edges:
+        for end in edges:
+            if start < end:
+                assert b"".join(archive.iter_range(start, end)) == data[start:end], (start, end)
+
+
+def test_range_past_the_end_is_clamped(files):
+    pairs, _ = files
+    archive = StreamingZip(pairs)
+    data = full_stream(archive)
+    
+    assert b"".join(archive.iter_range(archive.size - 10, archive.size + 1000)) == data[-10:]
+
+
+def test_etag_changes_when_a_member_changes(files):
+    pairs, _ = files
+    etag = StreamingZip(pairs).etag
+    assert StreamingZip(pairs).etag == etag
+    
+    with open(pairs[2][1], "wb") as f:
+        f.write(b"now written")
+    assert StreamingZip(pairs).etag != etag
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-99", (0, 100)),
+    ("bytes=100-", (100, 1000)),
+    ("bytes=-500", (500, 1000)),
+    ("bytes=-5000", (0, 1000)),
+    ("bytes=990-5000", (990, 1000)),
+    ("bytes=999-999", (999, 1000)),
+    (" ", None),
+    ("", None),
+    (None, None),
+    ("items=0-10", None),
+    ("bytes=0-10,20-30", None),
+    ("bytes=a-b", None),
+    ("bytes=-", None),
+])
+def test_parse_byte_range(header, expected):
+    assert parse_byte_range(header, 1000) == expected
+
+
+@pytest.mark.parametrize("header", [
+    "bytes=1000-",
+    "bytes=2000-3000",
+    "bytes=500-100",
+    "bytes=-0",
+])
+def test_unsatisfiable_ranges_raise(header):
+    # /export answers these with 416
+    with pytest.raises(ValueError):
+        parse_byte_range(header, 1000)
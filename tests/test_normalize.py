@@ -0,0 +1,80 @@
+"""
+Regression tests: the compiled TextNormalizer against the original rule-by-rule cleanup
+"""
+import re
+
+import pytest
+
+from utils.normalize import TextNormalizer, get_normalizer
+
+
+def reference_normalize(text: str, remove_extra_spaces: bool = True) -> str:
+    """The cleanup TextPostprocessor ran before the rules were compiled, one re.sub() per rule"""
+    if remove_extra_spaces:
+        text = re.sub(r' +', ' ', text)
+        text = '\n'.join(line.strip() for line in text.split('\n'))
+        text = re.sub(r'\n\n+', '\n\n', text)
+        text = text.strip()
+    
+    replacements = {
+        r'\b0\b': 'O',
+        r'\bl\b': 'I',
+        r'~': '-',
+        r'[`]': "'",
+    }
+    for pattern, replacement in replacements.items():
+        text = re.sub(pattern, replacement, text)
+    
+    return re.sub(r'[^\w\s\.,;:!?\-\'"()\[\]{}/@#$%&*+=]', '', text)
+
+
+CORPUS = [
+    "",
+    " ",
+    "\n\n\n",
+    "The cell membrane controls what enters the cell.",
+    "  Leading and trailing spaces  ",
+    "Too    many     spaces   between words",
+    "Line one  \n   line two\n\n\n\n\nline three after blanks",
+    "l think 0 is the answer",
+    "l l l 0 0 0",
+    "l's 0's hello0 0hello l0l",
+    "10 apples, 0.5 litres and l.",
+    "Temperature ~ 37 degrees, range 20~30",
+    "It`s a `quoted` word",
+    "Symbols ¶ § © ® ™ • are dropped",
+    "Mixed € 5 and £ 10 prices",
+    "Unicode words: café, naïve, Straße, l'été",
+    "Greek α β γ and math ∑ ∫ √ signs",
+    "Tabs\tstay\tas\ttabs",
+    "Windows\r\nline endings\r\n",
+    "Emoji 😀 between words 🎉",
+    "Q1. (a) Define osmosis. [2 marks]\nAns: movement of water ~ across a membrane",
+    "email@example.com #tag 50% a+b=c a*b & c/d",
+    "Spaces before ¶ a removed symbol ¶ end",
+    "  \n  \n  only whitespace lines  \n  \n  ",
+    "'single' \"double\" (paren) [bracket] {brace}",
+    "0\nl\n0 l\n~`",
+]
+
+
+@pytest.mark.parametrize("text", CORPUS)
+def test_default_rules_match_reference(text):
+    assert TextNormalizer().normalize(text) == reference_normalize(text)
+
+
+@pytest.mark.parametrize("text", CORPUS)
+def test_without_whitespace_cleanup_matches_reference(text):
+    normalizer = TextNormalizer(collapse_whitespace=False)
+    assert normalizer.normalize(text) == reference_normalize(text, remove_extra_spaces=False)
+
+
+def test_from_config_uses_defaults():
+    normalizer = get_normalizer({"remove_extra_spaces": True, "normalization": {}})
+    for text in CORPUS:
+        assert normalizer.normalize(text) == reference_normalize(text)
+
+
+def test_regex_rules_apply_in_order_with_literal_replacements():
+    normalizer = TextNormalizer(regex_rules=[(r"\bteh\b", "the"), (r"\d+(?:st|nd|rd|th)", "N")])
+    assert normalizer.normalize("teh 1st and 22nd of teh month") == "the N and N of the month"
@@ -0,0 +1,100 @@
+"""
+Tests for choosing between a PDF page's text layer and its scan
+"""
+import pytest
+
+pytest.importorskip("pypdf")
+
+from utils.pdf_to_image import PDFToImageConverter
+
+LETTER_PT = (612, 792)
+
+HEADER = "Name: ____________  Roll No: ______  Biology Mid-Term Answer Sheet"
+ESSAY = "The cell membrane controls what enters and leaves the cell. " * 12
+
+
+def write_pdf(path, lines=(), scan_size=None):
+    """Letter-size one-page PDF with text lines and optionally a full-page grayscale scan behind them"""
+    width, height = LETTER_PT
+    content = []
+    resources = ["/Font << /F1 3 0 R >>"]
+    objects = {3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"}
+    
+    if scan_size is not None:
+        scan_width, scan_height = scan_size
+        pixels = bytes([235]) * (scan_width * scan_height)
+        objects[5] = (
+            f"<< /Type /XObject /Subtype /Image /Width {scan_width} /Height {scan_height} "
+            f"/ColorSpace /DeviceGray /BitsPerComponent 8 /Length {len(pixels)} >>\nstream\n"
+        ).encode("ascii") + pixels + b"\nendstream"
+        resources.append("/XObject << /Im1 5 0 R >>")
+        content.append(f"q {width} 0 0 {height} 0 0 cm /Im1 Do Q")
+    
+    for index, line in enumerate(lines):
+        content.append(f"BT /F1 9 Tf 36 {height - 40 - 12 * index} Td ({line}) Tj ET")
+    
+    stream = "\n".join(content).encode("latin-1")
+    objects[1] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[2] = b"<< /Type /Pages /Kids [6 0 R] /Count 1 >>"
+    objects[4] = f"<< /Length {len(stream)} >>\nstream\n".encode("ascii") + stream + b"\nendstream"
+    objects[6] = (
+        f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {width} {height}] "
+        f"/Resources << {' '.join(resources)} >> /Contents 4 0 R >>"
+    ).encode("ascii")
+    
+    data = b"%PDF-1.4\n"
+    offsets = {}
+    for object_id in sorted(objects):
+        offsets[object_id] = len(data)
+        data += f"{object_id} 0 obj\n".encode("ascii") + objects[object_id] + b"\nendobj\n"
+    
+    count = max(objects) + 1
+    xref = len(data)
+    data += f"xref\n0 {count}\n0000000000 65535 f \n".encode("ascii")
+    for object_id in range(1, count):
+        data += f"{offsets.get(object_id, 0):010d} 00000 {'n' if object_id in offsets else 'f'} \n".encode("ascii")
+    data += f"trailer\n<< /Size {count} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("ascii")
+    
+    path.write_bytes(data)
+    return str(path)
+
+
+def load_only_page(pdf_path):
+    converter = PDFToImageConverter(use_text_layer=True, extract_images=True)
+    return next(converter.iter_pages(pdf_path, prefetch=0))
+
+
+def test_scan_with_printed_header_is_ocrd(tmp_path):
+    pdf_path = write_pdf(tmp_path / "scan.pdf", [HEADER], scan_size=(170, 220))
+    
+    page = load_only_page(pdf_path)
+    
+    assert page.text is None
+    assert page.metadata["source"] == "embedded_image"
+    assert page.image.size == (170, 220)
+
+
+def test_scan_with_dense_text_layer_is_still_ocrd(tmp_path):
+    lines = [ESSAY[i:i + 100] for i in range(0, len(ESSAY), 100)]
+    pdf_path = write_pdf(tmp_path / "searchable_scan.pdf", lines, scan_size=(170, 220))
+    
+    assert load_only_page(pdf_path).text is None
+
+
+def test_digital_page_uses_text_layer(tmp_path):
+    lines = [ESSAY[i:i + 100] for i in range(0, len(ESSAY), 100)]
+    pdf_path = write_pdf(tmp_path / "digital.pdf", lines)
+    
+    page = load_only_page(pdf_path)
+    
+    assert page.metadata["source"] == "text_layer"
+    assert "cell membrane" in page.text
+
+
+def test_sparse_text_layer_is_not_usable(tmp_path):
+    from pypdf import PdfReader
+    
+    pdf_path = write_pdf(tmp_path / "header_only.pdf", [HEADER])
+    page = PdfReader(pdf_path).pages[0]
+    
+    assert PDFToImageConverter()._usable_text(page) is None
@@ -0,0 +1,55 @@
+"""
+Tests for the blank-page and content-region layout pass
+"""
+import pytest
+
+np = pytest.importorskip("numpy")
+cv2 = pytest.importorskip("cv2")
+Image = pytest.importorskip("PIL.Image")
+
+from utils.preprocess import ImagePreprocessor
+
+import config
+
+A4_300_DPI = (3508, 2480)
+
+
+def make_page(lines: int = 0, ruled: bool = False, seed: int = 0) -> Image.Image:
+    """Off-white A4 page with paper noise, optional ruling and a few written lines"""
+    rng = np.random.default_rng(seed)
+    page = rng.normal(235, 4, A4_300_DPI).clip(0, 255).astype(np.uint8)
+    
+    if ruled:
+        for y in range(300, A4_300_DPI[0] - 200, 100):
+            cv2.line(page, (150, y), (A4_300_DPI[1] - 150, y), 190, 2)
+    
+    for i in range(lines):
+        cv2.putText(page, "the cell membrane", (250, 400 + 100 * i), cv2.FONT_HERSHEY_SCRIPT_SIMPLEX, 2.0, 40, 4)
+    
+    return Image.fromarray(page)
+
+
+@pytest.fixture
+def preprocessor():
+    return ImagePreprocessor(config.PREPROCESS_CONFIG)
+
+
+@pytest.mark.parametrize("lines", [1, 3, 5, 8])
+def test_sparse_text_page_is_not_blank(preprocessor, lines):
+    regions = preprocessor.find_content_regions(make_page(lines))
+    assert regions
+    
+    content, _ = preprocessor.crop_to_content(make_page(lines))
+    assert content is not None
+
+
+def test_noise_only_page_is_blank(preprocessor):
+    assert preprocessor.find_content_regions(make_page()) == []
+
+
+def test_ruled_unwritten_page_is_blank(preprocessor):
+    assert preprocessor.find_content_regions(make_page(ruled=True)) == []
+
+
+def test_ruled_page_with_one_line_is_not_blank(preprocessor):
+    assert preprocessor.find_content_regions(make_page(1, ruled=True))
@@ -0,0 +1,113 @@
+"""
+Tests for the symmetric-delete spell index and its edit distance
+"""
+import pytest
+
+from utils.spell_index import SpellIndex, damerau_distance
+
+WORDS = {
+    "the": 1000,
+    "thaw": 5,
+    "cell": 300,
+    "call": 200,
+    "membrane": 80,
+    "understanding": 40,
+    "photosynthesis": 20,
+    "a": 900,
+    "an": 700,
+}
+
+
+@pytest.fixture
+def index():
+    index = SpellIndex(max_edit_distance=2, prefix_length=7)
+    for word, count in WORDS.items():
+        index.add_word(word, count)
+    return index
+
+
+@pytest.mark.parametrize("a, b, distance", [
+    ("cell", "cell", 0),
+    ("cell", "cel", 1),
+    ("cell", "cells", 1),
+    ("cell", "call", 1),
+    ("ab", "ba", 1),
+    ("membrane", "mebmrane", 1),
+    ("abcd", "badc", 2),
+    ("", "", 0),
+    ("", "ab", 2),
+    ("a", "", 1),
+])
+def test_damerau_distance(a, b, distance):
+    assert damerau_distance(a, b, 2) == distance
+    assert damerau_distance(b, a, 2) == distance
+
+
+def test_damerau_distance_is_restricted_to_optimal_string_alignment():
+    # A transposed pair cannot be edited again: "ca" -> "abc" takes 3 edits, not 2
+    assert damerau_distance("ca", "abc", 3) == 3
+
+
+@pytest.mark.parametrize("a, b, max_distance", [
+    ("kitten", "sitting", 2),
+    ("", "abc", 2),
+    ("abcdef", "ab", 3),
+    ("cell", "dog", 1),
+])
+def test_damerau_distance_gives_up_past_max_distance(a, b, max_distance):
+    assert damerau_distance(a, b, max_distance) == max_distance + 1
+
+
+def test_known_word_is_returned_as_is(index):
+    assert index.lookup("Cell") == ("cell", 0, 300)
+
+
+def test_lookup_corrects_transposition(index):
+    assert index.lookup("teh") == ("the", 1, 1000)
+    assert index.lookup("mebmrane") == ("membrane", 1, 80)
+
+
+def test_lookup_prefers_closest_then_most_frequent(index):
+    # "thw" is one edit from both "the" and "thaw"
+    assert index.lookup("thw")[0] == "the"
+    # "cel" is one edit from "cell" only
+    assert index.lookup("cel") == ("cell", 1, 300)
+
+
+def test_lookup_respects_max_distance(index):
+    assert index.lookup("membrxxx") is None
+    assert index.lookup("membrne", max_distance=0) is None
+    assert index.lookup("membrne", max_distance=5) == ("membrane", 1, 80)
+
+
+def test_errors_past_the_prefix_are_found(index):
+    # Only the first 7 characters are indexed; the rest is checked by distance
+    assert index.lookup("understandign") == ("understanding", 1, 40)
+    assert index.lookup("photosynthesys") == ("photosynthesis", 1, 20)
+
+
+def test_errors_inside_the_prefix_are_found(index):
+    assert index.lookup("udnerstanding") == ("understanding", 1, 40)
+    assert index.lookup("fotosynthesis") == ("photosynthesis", 2, 20)
+
+
+def test_long_word_too_far_past_the_prefix_is_rejected(index):
+    # Same indexed prefix, but three edits in the tail
+    assert index.lookup("understandxyz") is None
+
+
+def test_empty_and_very_short_words(index):
+    assert index.lookup("") is None
+    assert index.lookup("a") == ("a", 0, 900)
+    assert index.correct_word("x") == "x"
+    assert index.correct_word("") == ""
+
+
+def test_correct_keeps_case_and_punctuation(index):
+    assert index.correct("Teh CELL membrnae, the callz.") == "The CELL membrane, the call."
+    assert index.correct_word("TEH") == "THE"
+
+
+def test_add_word_accumulates_counts(index):
+    index.add_word("Cell", 5)
+    assert index.lookup("cell") == ("cell", 0, 305)
@@ -0,0 +1,248 @@
+"""
+Streaming Archive Module
+ZIP archives of files on disk, produced on the fly for any byte range
+"""
+import hashlib
+import os
+import struct
+import time
+import zlib
+from typing import Iterator, List, Optional, Tuple
+import logging
+
+from utils.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1 << 20
+
+# Plain ZIP limits (no ZIP64 records are written)
+MAX_ARCHIVE_SIZE = 0xFFFFFFFF
+MAX_ARCHIVE_ENTRIES = 0xFFFF
+
+_LOCAL_HEADER = struct.Struct("<IHHHHHIIIHH")
+_CENTRAL_HEADER = struct.Struct("<IHHHHHHIIIHHHHHII")
+_END_RECORD = struct.Struct("<IHHHHIIH")
+
+_UTF8_NAMES = 0x0800
+_VERSION = 20
+_MADE_BY_UNIX = (3 << 8) | _VERSION
+_FILE_MODE = 0o100644 << 16
+
+# CRC-32 per (path, size, mtime): outputs are replaced atomically, so a
+# rewritten file never matches a stale entry
+_crc_cache = LRUCache(max_entries=10000)
+
+
+def _dos_datetime(timestamp: float) -> Tuple[int, int]:
+    """(time, date) fields in MS-DOS format, clamped to the representable range"""
+    t = time.localtime(max(timestamp, 315532800))
+    year = min(max(t.tm_year, 1980), 2107)
+    return (
+        (t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2),
+        ((year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday
+    )
+
+
+class ArchiveEntry:
+    """One stored member: a file on disk and its place in the archive"""
+    
+    __slots__ = ("name", "path", "size", "mtime_ns", "offset", "data_offset", "dos_time", "dos_date", "_crc")
+    
+    def __init__(self, name: str, path: str):
+        """
+        Initialize entry
+        
+        Args:
+            name: Member name inside the archive ('/'-separated)
+            path: File on disk
+        """
+        stat = os.stat(path)
+        self.name = name.encode("utf-8")
+        self.path = path
+        self.size = stat.st_size
+        self.mtime_ns = stat.st_mtime_ns
+        self.dos_time, self.dos_date = _dos_datetime(stat.st_mtime)
+        self.offset = 0
+        self.data_offset = 0
+        self._crc = None
+    
+    @property
+    def crc(self) -> int:
+        """CRC-32 of the file contents (read once, then cached)"""
+        if self._crc is None:
+            key = f"{self.path}:{self.size}:{self.mtime_ns}"
+            self._crc = _crc_cache.get(key)
+            
+            if self._crc is None:
+                crc = 0
+                for chunk in self.read(0, self.size):
+                    crc = zlib.crc32(chunk, crc)
+                self._crc = crc
+                _crc_cache.put(key, crc)
+        
+        return self._crc
+    
+    def read(self, start: int, end: int) -> Iterator[bytes]:
+        """
+        Read part of the file
+        
+        Args:
+            start: First byte (inclusive)
+            end: Last byte (exclusive)
+            
+        Yields:
+            Chunks of at most CHUNK_SIZE bytes
+        """
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            remaining = end - start
+            while remaining > 0:
+                chunk = f.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    raise IOError(f"{self.path} shrank while being archived")
+                remaining -= len(chunk)
+                yield chunk
+    
+    def local_header(self) -> bytes:
+        """Local file header followed by the member name"""
+        return _LOCAL_HEADER.pack(
+            0x04034B50, _VERSION, _UTF8_NAMES, 0, self.dos_time, self.dos_date,
+            self.crc, self.size, self.size, len(self.name), 0
+        ) + self.name
+    
+    def central_header(self) -> bytes:
+        """Central directory record followed by the member name"""
+        return _CENTRAL_HEADER.pack(
+            0x02014B50, _MADE_BY_UNIX, _VERSION, _UTF8_NAMES, 0, self.dos_time, self.dos_date,
+            self.crc, self.size, self.size, len(self.name), 0, 0, 0, 0, _FILE_MODE, self.offset
+        ) + self.name
+
+
+class StreamingZip:
+    """
+    Uncompressed ZIP of files on disk, never assembled in memory or on disk
+    
+    Members are stored rather than deflated (the outputs are small and
+    DOCX/PDF are compressed already), so every header's offset and the
+    archive size follow from the file sizes alone. Any byte range can then
+    be produced directly: a resumed download costs only the bytes it asks
+    for. CRC-32s go in the local headers, computed on first use and cached
+    per file version.
+    """
+    
+    def __init__(self, files: List[Tuple[str, str]]):
+        """
+        Lay out the archive
+        
+        Args:
+            files: (member name, path) pairs in archive order
+            
+        Raises:
+            ValueError: If the archive would need ZIP64 (too large or too many members)
+        """
+        if len(files) > MAX_ARCHIVE_ENTRIES:
+            raise ValueError(f"Too many files for one archive ({len(files)} > {MAX_ARCHIVE_ENTRIES})")
+        
+        self.entries = [ArchiveEntry(name, path) for name, path in files]
+        
+        offset = 0
+        for entry in self.entries:
+            entry.offset = offset
+            entry.data_offset = offset + _LOCAL_HEADER.size + len(entry.name)
+            offset = entry.data_offset + entry.size
+        
+        self.central_offset = offset
+        self.central_size = sum(_CENTRAL_HEADER.size + len(entry.name) for entry in self.entries)
+        self.size = self.central_offset + self.central_size + _END_RECORD.size
+        
+        if self.central_offset > MAX_ARCHIVE_SIZE:
+            raise ValueError(f"Archive too large ({self.size} bytes)")
+    
+    @property
+    def etag(self) -> str:
+        """Validator that changes whenever any member changes"""
+        digest = hashlib.sha1()
+        for entry in self.entries:
+            digest.update(b"%s\0%d\0%d\0" % (entry.name, entry.size, entry.mtime_ns))
+        return f'"{digest.hexdigest()}"'
+    
+    def _central_directory(self) -> bytes:
+        """Central directory and end record"""
+        return b"".join(entry.central_header() for entry in self.entries) + _END_RECORD.pack(
+            0x06054B50, 0, 0, len(self.entries), len(self.entries), self.central_size, self.central_offset, 0
+        )
+    
+    def iter_range(self, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        """
+        Produce part of the archive
+        
+        Args:
+            start: First byte (inclusive)
+            end: Last byte (exclusive; default end of archive)
+            
+        Yields:
+            Archive bytes from start to end
+        """
+        end = self.size if end is None else min(end, self.size)
+        
+        for entry in self.entries:
+            if entry.data_offset + entry.size <= start:
+                continue
+            if entry.offset >= end:
+                return
+            
+            if start < entry.data_offset:
+                header = entry.local_header()
+                yield header[max(start - entry.offset, 0):end - entry.offset]
+            
+            data_start = max(start, entry.data_offset) - entry.data_offset
+            data_end = min(end, entry.data_offset + entry.size) - entry.data_offset
+            if data_start < data_end:
+                yield from entry.read(data_start, data_end)
+        
+        if end > self.central_offset:
+            yield self._central_directory()[max(start - self.central_offset, 0):end - self.central_offset]
+    
+    def __iter__(self) -> Iterator[bytes]:
+        return self.iter_range()
+
+
+def parse_byte_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range HTTP Range header
+    
+    Args:
+        header: Range header value, e.g. "bytes=100-", "bytes=0-99" or "bytes=-500"
+        size: Size of the full representation
+        
+    Returns:
+        (start, end exclusive), or None to send the whole representation
+        (no header, several ranges or a malformed one)
+        
+    Raises:
+        ValueError: If the range is not satisfiable
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    
+    first, _, last = header[len("bytes="):].strip().partition("-")
+    
+    try:
+        start = int(first) if first else None
+        last = int(last) if last else None
+    except ValueError:
+        return None
+    
+    if start is None:
+        if last is None:
+            return None
+        if last <= 0:
+            raise ValueError(f"Range {header} not satisfiable for {size} bytes")
+        return max(size - last, 0), size
+    
+    end = size if last is None else min(last + 1, size)
+    if start >= size or end <= start:
+        raise ValueError(f"Range {header} not satisfiable for {size} bytes")
+    
+    return start, end
@@ -0,0 +1,199 @@
+"""
+Cache Module
+Thread-safe LRU caches with an optional persistent SQLite tier
+"""
+from collections import OrderedDict
+from typing import Any
+import json
+import logging
+import os
+import sqlite3
+import threading
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Bounded in-memory LRU cache with hit/miss counters"""
+    
+    def __init__(self, max_entries: int = 10000):
+        """
+        Initialize cache
+        
+        Args:
+            max_entries: Maximum number of entries kept in memory
+        """
+        self.max_entries = max(1, max_entries)
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """Look up a key, marking it as most recently used"""
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def put(self, key: str, value: Any):
+        """Insert or update a key, evicting the least recently used entry if full"""
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+    
+    def put_many(self, items: list):
+        """Insert several (key, value) pairs"""
+        for key, value in items:
+            self.put(key, value)
+    
+    def clear(self):
+        """Drop all entries (counters are kept)"""
+        with self._lock:
+            self._data.clear()
+    
+    def __len__(self):
+        return len(self._data)
+    
+    def __contains__(self, key: str):
+        return key in self._data
+    
+    def stats(self) -> dict:
+        """Hit/miss counters and current size"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class PersistentLRUCache(LRUCache):
+    """LRU cache backed by a SQLite table so entries survive restarts"""
+    
+    def __init__(self, max_entries: int = 10000, db_path: str = None, table: str = "cache"):
+        """
+        Initialize cache
+        
+        Args:
+            max_entries: Maximum number of entries kept in memory
+            db_path: SQLite file for the persistent tier (memory only if None)
+            table: Table name inside the database
+        """
+        super().__init__(max_entries)
+        self.table = table
+        self.disk_hits = 0
+        self._db = None
+        self._db_lock = threading.Lock()
+        
+        if db_path:
+            self._open(db_path)
+    
+    def _open(self, db_path: str):
+        """Open (and create) the SQLite tier"""
+        try:
+            folder = os.path.dirname(db_path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+            )
+            self._db.commit()
+            logger.info(f"Opened persistent cache {db_path} ({self.table})")
+            
+        except Exception as e:
+            logger.warning(f"Persistent cache unavailable, using memory only: {str(e)}")
+            self._db = None
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """Look up a key in memory, then on disk"""
+        value = super().get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        
+        if self._db is None:
+            return default
+        
+        with self._db_lock:
+            row = self._db.execute(
+                f"SELECT value FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+        
+        if row is None:
+            return default
+        
+        value = json.loads(row[0])
+        super().put(key, value)
+        
+        # Count the disk hit as a hit rather than a miss
+        with self._lock:
+            self.misses -= 1
+            self.hits += 1
+            self.disk_hits += 1
+        
+        return value
+    
+    def put(self, key: str, value: Any):
+        """Insert into memory and write through to disk"""
+        super().put(key, value)
+        
+        if self._db is None:
+            return
+        
+        try:
+            with self._db_lock:
+                self._db.execute(
+                    f"INSERT OR REPLACE INTO {self.table} (key, value) VALUES (?, ?)",
+                    (key, json.dumps(value))
+                )
+                self._db.commit()
+        except Exception as e:
+            logger.warning(f"Failed to persist cache entry: {str(e)}")
+    
+    def put_many(self, items: list):
+        """Insert several (key, value) pairs with a single disk transaction"""
+        for key, value in items:
+            super().put(key, value)
+        
+        if self._db is None or not items:
+            return
+        
+        try:
+            with self._db_lock:
+                self._db.executemany(
+                    f"INSERT OR REPLACE INTO {self.table} (key, value) VALUES (?, ?)",
+                    [(key, json.dumps(value)) for key, value in items]
+                )
+                self._db.commit()
+        except Exception as e:
+            logger.warning(f"Failed to persist cache entries: {str(e)}")
+    
+    def stats(self) -> dict:
+        """Counters including disk-tier hits"""
+        stats = super().stats()
+        stats["disk_hits"] = self.disk_hits
+        stats["persistent"] = self._db is not None
+        return stats
+    
+    def close(self):
+        """Close the SQLite tier"""
+        if self._db is not None:
+            with self._db_lock:
+                self._db.close()
+            self._db = None
@@ -0,0 +1,82 @@
+"""
+Engine Router Module
+Cheap image features that tell printed text from handwriting, used to pick an OCR engine
+"""
+import cv2
+import numpy as np
+from PIL import Image
+from typing import Dict
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def text_style_features(image: Image.Image) -> Dict[str, float]:
+    """
+    Measure how uniform the glyphs in an image are
+    
+    Printed text has glyphs of near-constant height and stroke width, while
+    handwriting varies a lot in both. Both measures are coefficients of
+    variation (std / mean) over connected ink components.
+    
+    Args:
+        image: PIL Image (page or region)
+        
+    Returns:
+        Dictionary with height_cv, stroke_cv and component count
+    """
+    gray = np.array(image)
+    if len(gray.shape) == 3:
+        gray = cv2.cvtColor(gray, cv2.COLOR_RGB2GRAY)
+    
+    _, ink = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    
+    count, labels, stats, _ = cv2.connectedComponentsWithStats(ink, connectivity=8)
+    
+    # Keep glyph-sized components (drop speckle and long rules)
+    heights = stats[1:count, cv2.CC_STAT_HEIGHT].astype(np.float32)
+    widths = stats[1:count, cv2.CC_STAT_WIDTH].astype(np.float32)
+    areas = stats[1:count, cv2.CC_STAT_AREA]
+    keep = (areas >= 8) & (heights >= 4) & (widths < gray.shape[1] / 4)
+    
+    if keep.sum() < 5:
+        return {"height_cv": 0.0, "stroke_cv": 0.0, "components": int(keep.sum())}
+    
+    heights = heights[keep]
+    
+    # Stroke width from the distance transform along the ink skeleton
+    distance = cv2.distanceTransform(ink, cv2.DIST_L2, 3)
+    ridge = (distance > 0) & (distance >= cv2.dilate(distance, np.ones((3, 3), np.uint8)))
+    strokes = distance[ridge] * 2
+    
+    return {
+        "height_cv": float(heights.std() / max(heights.mean(), 1e-6)),
+        "stroke_cv": float(strokes.std() / max(strokes.mean(), 1e-6)) if strokes.size else 0.0,
+        "components": int(keep.sum()),
+    }
+
+
+def classify_text_style(image: Image.Image, config: dict = None) -> tuple:
+    """
+    Classify an image as printed or handwritten text
+    
+    Args:
+        image: PIL Image
+        config: Thresholds (max_height_cv, max_stroke_cv)
+        
+    Returns:
+        Tuple of ('printed' or 'handwriting', features dict)
+    """
+    config = config or {}
+    features = text_style_features(image)
+    
+    printed = (
+        features["components"] >= 5 and
+        features["height_cv"] <= config.get("max_height_cv", 0.35) and
+        features["stroke_cv"] <= config.get("max_stroke_cv", 0.45)
+    )
+    
+    style = "printed" if printed else "handwriting"
+    logger.debug(f"Classified as {style}: {features}")
+    
+    return style, features
@@ -0,0 +1,142 @@
+"""
+File I/O Module
+Atomic file writes with a configurable fsync policy, and non-blocking variants for request handlers
+"""
+import asyncio
+import os
+from typing import Awaitable, Callable
+import logging
+
+logger = logging.getLogger(__name__)
+
+# "none": leave flushing to the OS (fastest)
+# "files": fsync each file before it replaces the old one, so a crash
+#          never leaves an empty or partial file under the final name
+# "full": also fsync the folder, so the rename itself survives power loss
+FSYNC_POLICIES = ("none", "files", "full")
+
+_settings = {"fsync": "none"}
+
+
+def configure_fsync(policy: str):
+    """
+    Set the process-wide fsync policy
+    
+    Args:
+        policy: One of FSYNC_POLICIES
+    """
+    if policy not in FSYNC_POLICIES:
+        raise ValueError(f"Unknown fsync policy: {policy}. Choose from {FSYNC_POLICIES}")
+    
+    _settings["fsync"] = policy
+    logger.info(f"File fsync policy: {policy}")
+
+
+def _fsync_path(path: str, directory: bool = False):
+    """fsync a file (or folder) by path"""
+    if directory and os.name == "nt":
+        # Folders cannot be opened (or synced) on Windows
+        return
+    
+    fd = os.open(path, os.O_RDONLY if directory else os.O_RDWR)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def replace_file(tmp_path: str, path: str):
+    """
+    Move a completely written temporary file into place, syncing it per the fsync policy
+    
+    Args:
+        tmp_path: Closed temporary file
+        path: Final path
+    """
+    policy = _settings["fsync"]
+    
+    if policy != "none":
+        _fsync_path(tmp_path)
+    
+    os.replace(tmp_path, path)
+    
+    if policy == "full":
+        _fsync_path(os.path.dirname(os.path.abspath(path)), directory=True)
+
+
+async def write_stream_async(
+    path: str,
+    read: Callable[[int], Awaitable[bytes]],
+    max_size: int = None,
+    chunk_size: int = 1024 * 1024
+) -> int:
+    """
+    Atomically write a file from an async reader (e.g. UploadFile.read) without blocking the event loop
+    
+    Chunks are written through aiofiles when it is installed (a worker
+    thread otherwise) and the fsync and rename run in a worker thread, so
+    only one chunk is ever held in memory.
+    
+    Args:
+        path: Final path
+        read: Coroutine function returning up to n bytes (b"" at the end)
+        max_size: Abort once more than this many bytes arrive
+        chunk_size: Bytes per read
+        
+    Returns:
+        Number of bytes written
+        
+    Raises:
+        ValueError: If the data exceeds max_size (nothing is left on disk)
+    """
+    try:
+        import aiofiles
+    except ImportError:
+        aiofiles = None
+    
+    tmp_path = f"{path}.tmp"
+    
+    try:
+        if aiofiles is not None:
+            async with aiofiles.open(tmp_path, "wb") as f:
+                size = await _copy(read, f.write, max_size, chunk_size)
+        else:
+            f = await asyncio.to_thread(open, tmp_path, "wb")
+            try:
+                size = await _copy(read, lambda chunk: asyncio.to_thread(f.write, chunk), max_size, chunk_size)
+            finally:
+                await asyncio.to_thread(f.close)
+        
+        await asyncio.to_thread(replace_file, tmp_path, path)
+    except BaseException:
+        await asyncio.to_thread(_remove_quietly, tmp_path)
+        raise
+    
+    return size
+
+
+async def _copy(
+    read: Callable[[int], Awaitable[bytes]],
+    write: Callable[[bytes], Awaitable],
+    max_size: int,
+    chunk_size: int
+) -> int:
+    """Copy chunks from read to write, enforcing max_size; returns the bytes copied"""
+    size = 0
+    while True:
+        chunk = await read(chunk_size)
+        if not chunk:
+            return size
+        
+        size += len(chunk)
+        if max_size is not None and size > max_size:
+            raise ValueError(f"File exceeds {max_size} bytes")
+        await write(chunk)
+
+
+def _remove_quietly(path: str):
+    """Remove a file if it exists"""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
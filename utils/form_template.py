@@ -0,0 +1,282 @@
+"""
+Answer Sheet Template Module
+Registers blank printed forms and subtracts their printed content from filled pages
+"""
+import cv2
+import numpy as np
+from PIL import Image
+from typing import Dict, List, Optional, Tuple
+import logging
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_NAME_PATTERN = re.compile(r"^[A-Za-z0-9_\-]{1,64}$")
+
+
+class FormTemplate:
+    """A blank form with precomputed alignment features and printed-content mask"""
+    
+    def __init__(
+        self,
+        name: str,
+        size: Tuple[int, int],
+        keypoints: np.ndarray,
+        descriptors: np.ndarray,
+        mask: np.ndarray
+    ):
+        """
+        Initialize template
+        
+        Args:
+            name: Template name
+            size: (width, height) of the template image
+            keypoints: N x 2 float32 keypoint coordinates
+            descriptors: N x 32 uint8 ORB descriptors
+            mask: H x W uint8 mask of printed content (255 = printed)
+        """
+        self.name = name
+        self.size = size
+        self.keypoints = keypoints
+        self.descriptors = descriptors
+        self.mask = mask
+
+
+class TemplateRegistry:
+    """Stores blank answer-sheet templates and aligns uploaded pages to them"""
+    
+    def __init__(self, folder: str, config: dict = None):
+        """
+        Initialize template registry
+        
+        Args:
+            folder: Folder holding template images and cached features
+            config: Alignment settings
+        """
+        self.folder = folder
+        self.config = config or {
+            "orb_features": 5000,
+            "match_ratio": 0.75,
+            "min_matches": 15,
+            "ransac_threshold": 5.0,
+            "mask_dilation": 3,
+        }
+        self._templates: Dict[str, FormTemplate] = {}
+        self._orb = cv2.ORB_create(nfeatures=self.config.get("orb_features", 5000))
+        
+        os.makedirs(self.folder, exist_ok=True)
+    
+    def _paths(self, name: str) -> Tuple[str, str]:
+        """Image and feature-cache paths for a template"""
+        base = os.path.join(self.folder, name)
+        return f"{base}.png", f"{base}.npz"
+    
+    def _to_gray(self, image: Image.Image) -> np.ndarray:
+        """Convert a PIL image to a grayscale array"""
+        img_array = np.array(image)
+        if len(img_array.shape) == 3:
+            return cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
+        return img_array
+    
+    def _compute_features(self, gray: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Detect ORB keypoints and descriptors"""
+        keypoints, descriptors = self._orb.detectAndCompute(gray, None)
+        points = np.array([kp.pt for kp in keypoints], dtype=np.float32).reshape(-1, 2)
+        
+        if descriptors is None:
+            descriptors = np.zeros((0, 32), dtype=np.uint8)
+        
+        return points, descriptors
+    
+    def _build(self, name: str, gray: np.ndarray) -> FormTemplate:
+        """Compute features and printed-content mask for a blank form"""
+        keypoints, descriptors = self._compute_features(gray)
+        
+        _, mask = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+        dilation = self.config.get("mask_dilation", 3)
+        if dilation > 0:
+            mask = cv2.dilate(mask, np.ones((dilation, dilation), np.uint8))
+        
+        h, w = gray.shape[:2]
+        return FormTemplate(name, (w, h), keypoints, descriptors, mask)
+    
+    def register(self, name: str, image: Image.Image) -> FormTemplate:
+        """
+        Register a blank form image
+        
+        Args:
+            name: Template name (letters, digits, '_' and '-')
+            image: Blank form image, preprocessed like the pages it will match
+            
+        Returns:
+            The registered FormTemplate
+        """
+        if not TEMPLATE_NAME_PATTERN.match(name):
+            raise ValueError(f"Invalid template name: {name}")
+        
+        gray = self._to_gray(image)
+        template = self._build(name, gray)
+        
+        image_path, cache_path = self._paths(name)
+        Image.fromarray(gray).save(image_path)
+        self._save_cache(template, cache_path)
+        
+        self._templates[name] = template
+        logger.info(f"Registered template '{name}' with {len(template.keypoints)} features")
+        
+        return template
+    
+    def _save_cache(self, template: FormTemplate, cache_path: str):
+        """Persist precomputed features next to the template image"""
+        np.savez_compressed(
+            cache_path,
+            size=np.array(template.size, dtype=np.int32),
+            keypoints=template.keypoints,
+            descriptors=template.descriptors,
+            mask=np.packbits(template.mask > 0)
+        )
+    
+    def _load_cache(self, name: str, cache_path: str) -> FormTemplate:
+        """Load precomputed features from disk"""
+        with np.load(cache_path) as data:
+            w, h = (int(v) for v in data["size"])
+            mask = np.unpackbits(data["mask"])[:w * h].reshape(h, w) * 255
+            return FormTemplate(name, (w, h), data["keypoints"], data["descriptors"], mask.astype(np.uint8))
+    
+    def get(self, name: str) -> Optional[FormTemplate]:
+        """
+        Get a template, loading cached features from disk if needed
+        
+        Args:
+            name: Template name
+            
+        Returns:
+            FormTemplate or None if not registered
+        """
+        if name in self._templates:
+            return self._templates[name]
+        
+        if not TEMPLATE_NAME_PATTERN.match(name):
+            return None
+        
+        image_path, cache_path = self._paths(name)
+        
+        if os.path.exists(cache_path):
+            template = self._load_cache(name, cache_path)
+        elif os.path.exists(image_path):
+            template = self._build(name, self._to_gray(Image.open(image_path)))
+            self._save_cache(template, cache_path)
+        else:
+            return None
+        
+        self._templates[name] = template
+        return template
+    
+    def list_templates(self) -> List[str]:
+        """Names of all registered templates"""
+        return sorted(
+            os.path.splitext(f)[0] for f in os.listdir(self.folder) if f.endswith(".png")
+        )
+    
+    def remove(self, name: str) -> bool:
+        """
+        Remove a template and its cached features
+        
+        Returns:
+            True if the template existed
+        """
+        self._templates.pop(name, None)
+        
+        removed = False
+        for path in self._paths(name):
+            if TEMPLATE_NAME_PATTERN.match(name) and os.path.exists(path):
+                os.remove(path)
+                removed = True
+        
+        return removed
+    
+    def subtract(self, image: Image.Image, name: str) -> Tuple[Image.Image, dict]:
+        """
+        Align a page to a template and blank out the printed content
+        
+        Args:
+            image: Filled page (preprocessed like the template)
+            name: Template name
+            
+        Returns:
+            Tuple of (page in template coordinates with printed content removed,
+            alignment metadata). The page is returned unchanged if it cannot
+            be aligned.
+        """
+        template = self.get(name)
+        if template is None:
+            raise ValueError(f"Unknown template: {name}")
+        
+        gray = self._to_gray(image)
+        keypoints, descriptors = self._compute_features(gray)
+        
+        metadata = {"template": name, "aligned": False, "matches": 0, "inliers": 0}
+        
+        if len(descriptors) < 2 or len(template.descriptors) < 2:
+            logger.warning(f"Not enough features to align page to template '{name}'")
+            return image, metadata
+        
+        # Match page features to the template with Lowe's ratio test
+        matcher = cv2.BFMatcher(cv2.NORM_HAMMING)
+        ratio = self.config.get("match_ratio", 0.75)
+        
+        good = []
+        for pair in matcher.knnMatch(descriptors, template.descriptors, k=2):
+            if len(pair) == 2 and pair[0].distance < ratio * pair[1].distance:
+                good.append(pair[0])
+        
+        metadata["matches"] = len(good)
+        
+        if len(good) < self.config.get("min_matches", 15):
+            logger.warning(f"Only {len(good)} feature matches with template '{name}', skipping subtraction")
+            return image, metadata
+        
+        page_points = keypoints[[m.queryIdx for m in good]]
+        template_points = template.keypoints[[m.trainIdx for m in good]]
+        
+        homography, inliers = cv2.findHomography(
+            page_points,
+            template_points,
+            cv2.RANSAC,
+            self.config.get("ransac_threshold", 5.0)
+        )
+        
+        if homography is None:
+            logger.warning(f"Could not estimate alignment to template '{name}'")
+            return image, metadata
+        
+        metadata["inliers"] = int(inliers.sum())
+        
+        # Warp into template coordinates and paint printed content white
+        aligned = cv2.warpPerspective(gray, homography, template.size, borderValue=255)
+        aligned[template.mask > 0] = 255
+        
+        metadata["aligned"] = True
+        logger.debug(f"Aligned page to template '{name}' ({metadata['inliers']} inliers)")
+        
+        return Image.fromarray(aligned), metadata
+
+
+_registry: Optional[TemplateRegistry] = None
+
+
+def get_template_registry() -> TemplateRegistry:
+    """
+    Get the process-wide template registry
+    
+    Returns:
+        TemplateRegistry using config.TEMPLATE_FOLDER
+    """
+    global _registry
+    
+    if _registry is None:
+        import config
+        _registry = TemplateRegistry(config.TEMPLATE_FOLDER, config.TEMPLATE_CONFIG)
+    
+    return _registry
@@ -0,0 +1,229 @@
+"""
+Job Store Module
+Persists each job's raw OCR output and stage fingerprints so later stages can be re-run without OCR
+"""
+import hashlib
+import json
+import os
+import re
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+from utils.fileio import replace_file
+from utils.ocr_engine import OCRResult
+from utils.ocr_layout import OCRLayout
+
+logger = logging.getLogger(__name__)
+
+RAW_OCR_FILE = "raw_ocr.json"
+MANIFEST_FILE = "job.json"
+
+# Job and batch ids (safe as folder names)
+ID_PATTERN = re.compile(r"^[A-Za-z0-9_\-]{1,64}$")
+
+# Stage -> upstream stages, in pipeline order. A stage's fingerprint covers
+# its own inputs and its upstream fingerprints, so a change anywhere above
+# it makes it stale.
+STAGE_DEPENDENCIES = {
+    "ocr": (),
+    "postprocess": ("ocr",),
+    "outputs": ("postprocess",),
+    "evaluation": ("postprocess",),
+}
+
+
+def _json_default(value: Any):
+    """Encode NumPy scalars as numbers and anything else unknown as a string"""
+    return value.item() if hasattr(value, "item") else str(value)
+
+
+def fingerprint(*parts: Any) -> str:
+    """Stable hash of JSON-serializable values"""
+    data = json.dumps(parts, sort_keys=True, default=_json_default)
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+
+def stage_fingerprints(inputs: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Fingerprint every stage from its own inputs and its upstream stages
+    
+    Args:
+        inputs: Stage -> the configuration/data that stage depends on
+        
+    Returns:
+        Stage -> fingerprint
+    """
+    fingerprints = {}
+    for stage, upstream in STAGE_DEPENDENCIES.items():
+        fingerprints[stage] = fingerprint(stage, inputs.get(stage), [fingerprints[name] for name in upstream])
+    return fingerprints
+
+
+def stale_stages(recorded: Dict[str, str], current: Dict[str, str]) -> List[str]:
+    """
+    Stages whose recorded fingerprint no longer matches
+    
+    Args:
+        recorded: Fingerprints stored when the stages last ran
+        current: Fingerprints for the current configuration
+        
+    Returns:
+        Stale stage names in pipeline order
+    """
+    return [stage for stage in STAGE_DEPENDENCIES if recorded.get(stage) != current.get(stage)]
+
+
+def raw_page(
+    number: int,
+    result: OCRResult = None,
+    text: str = None,
+    size: Tuple[int, int] = None,
+    size_pt: Tuple[float, float] = None
+) -> dict:
+    """
+    Raw record of one page: an OCR result to be postprocessed, or final text (e.g. a PDF text layer)
+    
+    Args:
+        number: Page (or frame) number
+        result: OCR result of the page
+        text: Text used as-is instead of an OCR result
+        size: (width, height) in pixels of the image the layout refers to
+        size_pt: Physical page size in points, if known (PDF pages)
+        
+    Returns:
+        JSON-serializable page record
+    """
+    page = {"page": number, "size": list(size) if size else None, "size_pt": list(size_pt) if size_pt else None}
+    
+    if result is None:
+        return {**page, "postprocess": False, "text": text or ""}
+    
+    return {
+        **page,
+        "postprocess": True,
+        "text": result.text,
+        "confidence": float(result.confidence),
+        "layout": result.layout.to_dict() if result.layout is not None else None,
+    }
+
+
+def save_raw_ocr(output_folder: str, pages: List[dict]):
+    """
+    Write a job's raw page records
+    
+    Args:
+        output_folder: Job output folder
+        pages: Records from raw_page(), in page order
+    """
+    path = os.path.join(output_folder, RAW_OCR_FILE)
+    tmp_path = f"{path}.tmp"
+    
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"pages": pages}, f)
+    replace_file(tmp_path, path)
+    
+    logger.info(f"Raw OCR output saved: {path} ({len(pages)} pages)")
+
+
+def load_raw_ocr(output_folder: str) -> List[dict]:
+    """
+    Read a job's raw page records, rebuilding OCR results
+    
+    Args:
+        output_folder: Job output folder
+        
+    Returns:
+        Page records; those with postprocess=True carry an OCRResult under "result"
+    """
+    with open(os.path.join(output_folder, RAW_OCR_FILE), "r", encoding="utf-8") as f:
+        pages = json.load(f)["pages"]
+    
+    for page in pages:
+        if page["postprocess"]:
+            layout = OCRLayout.from_dict(page["layout"]) if page.get("layout") else None
+            page["result"] = OCRResult(page["text"], page.get("confidence", 0.0), layout=layout)
+    
+    return pages
+
+
+def raw_ocr_digest(output_folder: str) -> Optional[str]:
+    """Content hash of a job's raw OCR file (None if the job has none)"""
+    path = os.path.join(output_folder, RAW_OCR_FILE)
+    if not os.path.exists(path):
+        return None
+    
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def save_manifest(output_folder: str, manifest: dict):
+    """
+    Write a job manifest (job parameters, stage fingerprints, result, evaluation)
+    
+    Args:
+        output_folder: Job output folder
+        manifest: Manifest dictionary
+    """
+    path = os.path.join(output_folder, MANIFEST_FILE)
+    tmp_path = f"{path}.tmp"
+    
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, default=_json_default)
+    replace_file(tmp_path, path)
+
+
+def load_manifest(output_folder: str) -> Optional[dict]:
+    """
+    Read a job manifest
+    
+    Args:
+        output_folder: Job output folder
+        
+    Returns:
+        Manifest dictionary, or None if the job has none
+    """
+    path = os.path.join(output_folder, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return None
+    
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def list_stored_jobs(outputs_root: str) -> List[str]:
+    """
+    Job ids that have a manifest on disk
+    
+    Args:
+        outputs_root: Folder holding one output folder per job
+        
+    Returns:
+        Sorted job ids
+    """
+    if not os.path.isdir(outputs_root):
+        return []
+    
+    return sorted(
+        name for name in os.listdir(outputs_root)
+        if os.path.exists(os.path.join(outputs_root, name, MANIFEST_FILE))
+    )
+
+
+def list_batch_jobs(outputs_root: str, batch_id: str) -> List[str]:
+    """
+    Stored jobs uploaded under a batch id
+    
+    Args:
+        outputs_root: Folder holding one output folder per job
+        batch_id: Batch id given at upload
+        
+    Returns:
+        Sorted job ids
+    """
+    return [
+        job_id for job_id in list_stored_jobs(outputs_root)
+        if (load_manifest(os.path.join(outputs_root, job_id)) or {}).get("batch_id") == batch_id
+    ]
@@ -0,0 +1,152 @@
+"""
+Lexicon Module
+Per-subject vocabularies used to bias OCR decoding and spelling correction
+"""
+import os
+import re
+from typing import Dict, List, Optional
+import logging
+
+from utils.spell_index import SpellIndex, WORD_PATTERN, match_case
+
+logger = logging.getLogger(__name__)
+
+
+def subject_key(subject: str) -> str:
+    """Normalize a subject name to a lexicon file name ("Computer Science" -> "computer_science")"""
+    return re.sub(r"[^a-z0-9]+", "_", (subject or "").lower()).strip("_")
+
+
+class Lexicon:
+    """Domain vocabulary compiled into a set for membership and a symspell index for correction"""
+    
+    def __init__(self, name: str, terms: Dict[str, int], path: str = None, max_edit_distance: int = 2):
+        """
+        Initialize lexicon
+        
+        Args:
+            name: Subject key
+            terms: Term -> weight (terms may contain several words)
+            path: File the lexicon was loaded from
+            max_edit_distance: Largest correction distance towards a domain word
+        """
+        self.name = name
+        self.path = path
+        self.terms = dict(terms)
+        
+        self.index = SpellIndex(max_edit_distance=max_edit_distance)
+        for term, weight in self.terms.items():
+            for word in WORD_PATTERN.findall(term):
+                self.index.add_word(word, weight)
+    
+    @classmethod
+    def load(cls, path: str, name: str = None) -> "Lexicon":
+        """
+        Load a lexicon file: one term per line, optionally followed by a tab and a weight
+        
+        Args:
+            path: Lexicon file (lines starting with '#' are comments)
+            name: Subject key (defaults to the file name)
+            
+        Returns:
+            Lexicon
+        """
+        terms = {}
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                
+                term, _, weight = line.partition("\t")
+                try:
+                    terms[term.strip()] = int(weight) if weight.strip() else 1
+                except ValueError:
+                    terms[term.strip()] = 1
+        
+        name = name or os.path.splitext(os.path.basename(path))[0]
+        logger.info(f"Loaded lexicon '{name}' with {len(terms)} terms")
+        
+        return cls(name, terms, path)
+    
+    def __contains__(self, word: str) -> bool:
+        return word in self.index
+    
+    def __len__(self):
+        return len(self.index.words)
+    
+    def words(self) -> List[str]:
+        """Single words of all terms (lowercase), for recognizer dictionaries"""
+        return list(self.index.words)
+    
+    def correct_word(self, word: str) -> Optional[str]:
+        """
+        Closest domain word for a token
+        
+        Short words need a closer match (one edit per four characters) so
+        that ordinary words are not pulled towards domain terms.
+        
+        Args:
+            word: Token as it appears in the text
+            
+        Returns:
+            Domain word with the token's capitalization, or None if none is close enough
+        """
+        max_distance = min(self.index.max_edit_distance, len(word) // 4)
+        if max_distance < 1:
+            return None
+        
+        best = self.index.lookup(word, max_distance)
+        if best is None:
+            return None
+        
+        return match_case(best[0], word)
+
+
+def list_subjects(folder: str = None) -> List[str]:
+    """
+    List subjects that have a lexicon file
+    
+    Args:
+        folder: Lexicon folder (defaults to config.LEXICON_CONFIG["folder"])
+        
+    Returns:
+        Sorted subject keys
+    """
+    if folder is None:
+        import config
+        folder = config.LEXICON_CONFIG.get("folder", "data/lexicons")
+    
+    if not os.path.isdir(folder):
+        return []
+    
+    return sorted(
+        os.path.splitext(name)[0] for name in os.listdir(folder)
+        if name.endswith(".txt")
+    )
+
+
+_lexicons: Dict[str, Optional[Lexicon]] = {}
+
+
+def get_lexicon(subject: str) -> Optional[Lexicon]:
+    """
+    Get the process-wide lexicon for a subject (loaded once, then shared)
+    
+    Args:
+        subject: Subject name, e.g. "Biology"
+        
+    Returns:
+        Lexicon, or None if the subject has no lexicon file
+    """
+    import config
+    
+    key = subject_key(subject)
+    if not key:
+        return None
+    
+    if key not in _lexicons:
+        path = os.path.join(config.LEXICON_CONFIG.get("folder", "data/lexicons"), f"{key}.txt")
+        _lexicons[key] = Lexicon.load(path, key) if os.path.exists(path) else None
+    
+    return _lexicons[key]
@@ -0,0 +1,215 @@
+"""
+Model Optimization Module
+CPU inference helpers for EasyOCR models: dynamic int8 quantization and ONNX Runtime export
+"""
+import logging
+import os
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+
+def set_intra_op_threads(num_threads: int):
+    """
+    Limit the number of threads PyTorch uses inside a single operator
+    
+    Args:
+        num_threads: Thread count (0 leaves the library default)
+    """
+    if num_threads <= 0:
+        return
+    
+    import torch
+    
+    torch.set_num_threads(num_threads)
+    logger.info(f"PyTorch intra-op threads set to {num_threads}")
+
+
+def quantize_dynamic_int8(module):
+    """
+    Apply dynamic int8 quantization to the LSTM and Linear layers of a model
+    
+    Convolutions are left in fp32; dynamic quantization only covers layers
+    whose weights dominate the recognizer's matrix multiplications.
+    
+    Args:
+        module: torch.nn.Module
+        
+    Returns:
+        Quantized module
+    """
+    import torch
+    
+    return torch.quantization.quantize_dynamic(
+        module,
+        {torch.nn.LSTM, torch.nn.Linear},
+        dtype=torch.qint8
+    )
+
+
+def is_quantized(module) -> bool:
+    """Whether a model already contains dynamically quantized layers"""
+    return any(".quantized" in type(child).__module__ for child in module.modules())
+
+
+def create_onnx_session(model_path: str, intra_op_threads: int = 0):
+    """
+    Create an ONNX Runtime CPU session with explicit thread control
+    
+    Args:
+        model_path: Path to the .onnx file
+        intra_op_threads: Threads per operator (0 leaves the runtime default)
+        
+    Returns:
+        onnxruntime.InferenceSession
+    """
+    import onnxruntime as ort
+    
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+    options.inter_op_num_threads = 1
+    if intra_op_threads > 0:
+        options.intra_op_num_threads = intra_op_threads
+    
+    return ort.InferenceSession(model_path, sess_options=options, providers=["CPUExecutionProvider"])
+
+
+def export_onnx(
+    module,
+    dummy_inputs: tuple,
+    model_path: str,
+    input_names: list,
+    output_names: list,
+    dynamic_axes: Dict[str, Dict[int, str]]
+) -> str:
+    """
+    Export a PyTorch module to ONNX unless the file already exists
+    
+    Args:
+        module: torch.nn.Module in eval mode
+        dummy_inputs: Example inputs used for tracing
+        model_path: Output .onnx path
+        input_names: Graph input names
+        output_names: Graph output names
+        dynamic_axes: Dynamic dimensions per input/output
+        
+    Returns:
+        model_path
+    """
+    if os.path.exists(model_path):
+        return model_path
+    
+    import torch
+    
+    os.makedirs(os.path.dirname(model_path) or ".", exist_ok=True)
+    logger.info(f"Exporting ONNX model to {model_path}")
+    
+    tmp_path = f"{model_path}.tmp"
+    with torch.no_grad():
+        torch.onnx.export(
+            module,
+            dummy_inputs,
+            tmp_path,
+            input_names=input_names,
+            output_names=output_names,
+            dynamic_axes=dynamic_axes,
+            opset_version=17
+        )
+    os.replace(tmp_path, model_path)
+    
+    return model_path
+
+
+def _make_onnx_modules():
+    """Define the ONNX-backed torch modules (requires torch at call time)"""
+    import numpy as np
+    import torch
+    
+    class ONNXRecognizerModule(torch.nn.Module):
+        """Drop-in replacement for the EasyOCR recognizer running on ONNX Runtime"""
+        
+        def __init__(self, session):
+            super().__init__()
+            self.session = session
+            self.input_names = [i.name for i in session.get_inputs()]
+        
+        def forward(self, image, text=None):
+            feeds = {"image": image.cpu().numpy().astype(np.float32)}
+            if "text" in self.input_names and text is not None:
+                feeds["text"] = text.cpu().numpy()
+            preds = self.session.run(None, feeds)[0]
+            return torch.from_numpy(preds)
+    
+    class ONNXDetectorModule(torch.nn.Module):
+        """Drop-in replacement for the EasyOCR CRAFT detector running on ONNX Runtime"""
+        
+        def __init__(self, session):
+            super().__init__()
+            self.session = session
+        
+        def forward(self, x):
+            y, feature = self.session.run(None, {"image": x.cpu().numpy().astype(np.float32)})
+            return torch.from_numpy(y), torch.from_numpy(feature)
+    
+    return ONNXRecognizerModule, ONNXDetectorModule
+
+
+def optimize_reader(reader, backend: str, model_dir: str, model_key: str, intra_op_threads: int = 0):
+    """
+    Swap an EasyOCR reader's detector/recognizer for CPU-optimized versions
+    
+    The reader must be loaded with quantize=False: EasyOCR quantizes its
+    CPU models by default, which would leave nothing for 'int8' to do and
+    cannot be exported to ONNX.
+    
+    Args:
+        reader: easyocr.Reader (loaded on CPU with quantize=False)
+        backend: 'onnx' (ONNX Runtime for detector and recognizer) or 'int8'
+            (dynamic quantization of the recognizer, equivalent to stock
+            EasyOCR's own CPU quantization)
+        model_dir: Folder for exported ONNX graphs
+        model_key: Name prefix for exported graphs (e.g. the language list)
+        intra_op_threads: Threads per operator
+    """
+    import torch
+    
+    if is_quantized(reader.recognizer) or is_quantized(reader.detector):
+        raise ValueError("EasyOCR reader is already quantized; load it with quantize=False")
+    
+    set_intra_op_threads(intra_op_threads)
+    
+    if backend == "int8":
+        reader.recognizer = quantize_dynamic_int8(reader.recognizer.eval())
+        logger.info("EasyOCR recognizer quantized to int8")
+        
+    elif backend == "onnx":
+        recognizer_cls, detector_cls = _make_onnx_modules()
+        
+        recognizer_path = export_onnx(
+            reader.recognizer.eval(),
+            (torch.rand(1, 1, reader.imgH, 256), torch.zeros(1, 1, dtype=torch.long)),
+            os.path.join(model_dir, f"{model_key}_recognizer.onnx"),
+            input_names=["image", "text"],
+            output_names=["preds"],
+            dynamic_axes={"image": {0: "batch", 3: "width"}, "preds": {0: "batch", 1: "steps"}}
+        )
+        detector_path = export_onnx(
+            reader.detector.eval(),
+            (torch.rand(1, 3, 640, 640),),
+            os.path.join(model_dir, f"{model_key}_detector.onnx"),
+            input_names=["image"],
+            output_names=["y", "feature"],
+            dynamic_axes={
+                "image": {0: "batch", 2: "height", 3: "width"},
+                "y": {0: "batch", 1: "out_height", 2: "out_width"},
+                "feature": {0: "batch", 2: "out_height", 3: "out_width"},
+            }
+        )
+        
+        reader.recognizer = recognizer_cls(create_onnx_session(recognizer_path, intra_op_threads))
+        reader.detector = detector_cls(create_onnx_session(detector_path, intra_op_threads))
+        logger.info("EasyOCR detector and recognizer running on ONNX Runtime")
+        
+    else:
+        raise ValueError(f"Unknown CPU backend: {backend}. Choose 'int8' or 'onnx'")
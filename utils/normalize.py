@@ -0,0 +1,178 @@
+"""
+Text Normalization Module
+Compiled rule engine for whitespace cleanup and common OCR error fixes
+"""
+import re
+from typing import Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Single characters replaced one-for-one
+DEFAULT_CHAR_MAP = {
+    "~": "-",   # Tilde to hyphen
+    "`": "'",   # Backtick to apostrophe
+}
+
+# Standalone tokens replaced as a whole word
+DEFAULT_WORD_MAP = {
+    "0": "O",  # Zero to letter O in words
+    "l": "I",  # Lowercase l to uppercase I
+}
+
+# Unwanted symbols (keep alphanumeric, punctuation, whitespace)
+DEFAULT_STRIP_PATTERN = r"[^\w\s\.,;:!?\-'\"()\[\]{}/@#$%&*+=]"
+
+# Whitespace runs that actually change
+_REPEATED_SPACES = re.compile(r" {2,}")
+_REPEATED_BLANK_LINES = re.compile(r"\n{3,}")
+
+
+class TextNormalizer:
+    """
+    Normalization rules compiled once and applied in a fixed number of passes
+    
+    - Character map: str.translate() table (ASCII text) or one str.replace()
+      per character present (translate falls back to a slow per-character
+      lookup for non-ASCII text)
+    - Word map: all tokens in one scanner whose alternatives start with a
+      literal, so the regex engine skips straight to candidate characters
+    - Regex rules: all patterns in one combined scanner, dispatched on the
+      matching alternative
+    - Strip pattern: one deletion pass over runs of unwanted characters
+    
+    Whitespace is cleaned first. It only touches whitespace, the other rules
+    never produce or consume it, so the result equals running every rule
+    as a separate re.sub() in the same order.
+    """
+    
+    def __init__(
+        self,
+        char_map: Dict[str, str] = None,
+        word_map: Dict[str, str] = None,
+        regex_rules: List[Tuple[str, str]] = None,
+        strip_pattern: Optional[str] = DEFAULT_STRIP_PATTERN,
+        collapse_whitespace: bool = True
+    ):
+        """
+        Compile the rules
+        
+        Args:
+            char_map: Single character -> replacement
+            word_map: Standalone token -> replacement
+            regex_rules: Extra (pattern, literal replacement) pairs, tried in
+                order at each position; patterns must not use numbered groups
+            strip_pattern: Character class removed from the text (None keeps everything)
+            collapse_whitespace: Collapse repeated spaces and blank lines, and
+                trim lines and the text
+        """
+        self.collapse_whitespace = collapse_whitespace
+        
+        self.char_map = dict(DEFAULT_CHAR_MAP if char_map is None else char_map)
+        self.table = str.maketrans(self.char_map) if self.char_map else None
+        
+        self.word_map = dict(DEFAULT_WORD_MAP if word_map is None else word_map)
+        self.word_scanner = None
+        if self.word_map:
+            # Boundaries are checked after the literal (\b up front would
+            # disable the engine's first-character skip)
+            self.word_scanner = re.compile("|".join(
+                f"{re.escape(word)}(?<!\\w{re.escape(word)})(?!\\w)"
+                for word in sorted(self.word_map, key=len, reverse=True)
+            ))
+        
+        self.regex_rules = list(regex_rules or [])
+        self.rule_scanner = None
+        if self.regex_rules:
+            self.rule_scanner = re.compile("|".join(f"({pattern})" for pattern, _ in self.regex_rules))
+            self._rule_outputs = [None] + [replacement for _, replacement in self.regex_rules]
+        
+        self.strip_scanner = re.compile(f"{strip_pattern}+") if strip_pattern else None
+    
+    @classmethod
+    def from_config(cls, config: dict = None) -> "TextNormalizer":
+        """
+        Create a normalizer from postprocessing configuration
+        
+        Args:
+            config: Postprocessing configuration (remove_extra_spaces and the
+                optional "normalization" overrides char_map, word_map,
+                regex_rules, strip_pattern)
+                
+        Returns:
+            TextNormalizer
+        """
+        config = config or {}
+        rules = config.get("normalization") or {}
+        
+        return cls(
+            char_map=rules.get("char_map"),
+            word_map=rules.get("word_map"),
+            regex_rules=[tuple(rule) for rule in rules.get("regex_rules", [])],
+            strip_pattern=rules.get("strip_pattern", DEFAULT_STRIP_PATTERN),
+            collapse_whitespace=config.get("remove_extra_spaces", True)
+        )
+    
+    def normalize(self, text: str) -> str:
+        """
+        Normalize text
+        
+        Args:
+            text: Raw OCR text
+            
+        Returns:
+            Normalized text
+        """
+        if not text:
+            return ""
+        
+        if self.collapse_whitespace:
+            text = self._collapse_whitespace(text)
+        
+        if self.table is not None:
+            if text.isascii():
+                text = text.translate(self.table)
+            else:
+                for char, replacement in self.char_map.items():
+                    if char in text:
+                        text = text.replace(char, replacement)
+        
+        if self.word_scanner is not None:
+            text = self.word_scanner.sub(lambda match: self.word_map[match.group()], text)
+        
+        if self.rule_scanner is not None:
+            text = self.rule_scanner.sub(lambda match: self._rule_outputs[match.lastindex], text)
+        
+        if self.strip_scanner is not None:
+            text = self.strip_scanner.sub("", text)
+        
+        return text
+    
+    @staticmethod
+    def _collapse_whitespace(text: str) -> str:
+        """Single spaces, trimmed lines, at most one blank line in a row"""
+        text = _REPEATED_SPACES.sub(" ", text.strip())
+        text = "\n".join(line.strip() for line in text.split("\n"))
+        return _REPEATED_BLANK_LINES.sub("\n\n", text)
+
+
+_normalizers: Dict[str, TextNormalizer] = {}
+
+
+def get_normalizer(config: dict = None) -> TextNormalizer:
+    """
+    Get the process-wide normalizer for a configuration (compiled once, then shared)
+    
+    Args:
+        config: Postprocessing configuration
+        
+    Returns:
+        TextNormalizer
+    """
+    config = config or {}
+    key = repr((config.get("remove_extra_spaces", True), config.get("normalization")))
+    
+    if key not in _normalizers:
+        _normalizers[key] = TextNormalizer.from_config(config)
+    
+    return _normalizers[key]
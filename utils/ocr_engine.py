@@ -1,48 +1,206 @@
 """
 OCR Engine Module
-Supports multiple OCR backends: EasyOCR and Google Vision API
+Supports multiple OCR backends: EasyOCR (stock or CPU-optimized), Google Vision API,
+Tesseract for printed text, and an auto-router that picks between them
 """
 from PIL import Image
 import numpy as np
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, Iterator, List, Tuple, Optional
+import asyncio
 import logging
+import os
+import threading
 import time
 
+from utils.lexicon import Lexicon
+from utils.ocr_layout import OCRLayout
+from utils.region_cache import RegionCache
+
 logger = logging.getLogger(__name__)
 
 
 class OCRResult:
     """Container for OCR results"""
     
-    def __init__(self, text: str, confidence: float = 0.0, metadata: dict = None):
+    __slots__ = ("text", "confidence", "metadata", "layout")
+    
+    def __init__(
+        self,
+        text: str,
+        confidence: float = 0.0,
+        metadata: dict = None,
+        layout: Optional[OCRLayout] = None
+    ):
         self.text = text
         self.confidence = confidence
         self.metadata = metadata or {}
+        self.layout = layout
     
     def __str__(self):
         return self.text
 
 
+class EngineCapabilities:
+    """What an OCR engine is good at and how expensive it is"""
+    
+    __slots__ = ("handwriting", "printed", "speed", "local")
+    
+    def __init__(self, handwriting: bool = True, printed: bool = True, speed: str = "medium", local: bool = True):
+        """
+        Initialize capability flags
+        
+        Args:
+            handwriting: Reads handwritten text reliably
+            printed: Reads printed text reliably
+            speed: Relative cost class ('fast', 'medium', 'slow')
+            local: Runs on this host (no network / paid API)
+        """
+        self.handwriting = handwriting
+        self.printed = printed
+        self.speed = speed
+        self.local = local
+    
+    def to_dict(self) -> dict:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+
+# Engine registry: name -> engine class
+ENGINE_REGISTRY: Dict[str, type] = {}
+
+
+def register_engine(name: str):
+    """
+    Class decorator that registers an OCR engine under a name
+    
+    Args:
+        name: Engine name used in config.OCR_ENGINE and the upload form
+    """
+    def decorator(engine_class):
+        ENGINE_REGISTRY[name] = engine_class
+        engine_class.engine_key = name
+        return engine_class
+    return decorator
+
+
+def list_engines() -> Dict[str, dict]:
+    """Registered engines and their capability flags"""
+    return {name: cls.CAPABILITIES.to_dict() for name, cls in ENGINE_REGISTRY.items()}
+
+
 class BaseOCREngine:
     """Base class for OCR engines"""
     
+    CAPABILITIES = EngineCapabilities()
+    engine_key = "base"
+    
     def __init__(self):
         self.name = "Base"
     
+    @classmethod
+    def from_config(cls, **kwargs) -> "BaseOCREngine":
+        """Create the engine from a config dictionary (unknown keys are ignored)"""
+        return cls()
+    
     def recognize(self, image: Image.Image) -> OCRResult:
         """Recognize text in an image"""
         raise NotImplementedError
+    
+    def recognize_batch(self, images: List[Image.Image]) -> List[OCRResult]:
+        """Recognize text in several images (engines may override to batch)"""
+        return [self.recognize(image) for image in images]
+    
+    def close(self):
+        """Release clients, threads and other resources held by the engine"""
+    
+    def iter_regions(self, image: Image.Image) -> Iterator[dict]:
+        """
+        Yield recognized regions as they complete
+        
+        Engines without incremental recognition run the whole page and
+        then yield its words in reading order.
+        
+        Args:
+            image: PIL Image
+            
+        Yields:
+            Dicts with box (x0, y0, x1, y1), text and confidence
+        """
+        result = self.recognize(image)
+        
+        if result.layout is None:
+            if result.text:
+                yield {"box": [0, 0, image.width, image.height], "text": result.text, "confidence": result.confidence}
+            return
+        
+        layout = result.layout
+        for idx in layout.reading_order():
+            yield {
+                "box": [float(v) for v in layout.boxes[idx]],
+                "text": layout.texts[idx],
+                "confidence": float(layout.confidences[idx])
+            }
+    
+    def recognize_regions(self, image: Image.Image, boxes: np.ndarray) -> List[Tuple[str, float]]:
+        """
+        Re-recognize specific regions of an image
+        
+        Args:
+            image: PIL Image
+            boxes: N x 4 array of (x0, y0, x1, y1) pixel boxes
+            
+        Returns:
+            List of (text, confidence) tuples, one per box
+        """
+        regions = []
+        for x0, y0, x1, y1 in np.asarray(boxes, dtype=np.int64):
+            result = self.recognize(image.crop((int(x0), int(y0), int(x1), int(y1))))
+            regions.append((result.text, result.confidence))
+        return regions
 
 
+@register_engine('easyocr')
 class EasyOCREngine(BaseOCREngine):
     """EasyOCR - Easy to use OCR engine"""
     
-    def __init__(self, languages: List[str] = None, gpu: bool = False):
+    CAPABILITIES = EngineCapabilities(handwriting=True, printed=True, speed="medium")
+    
+    # Weight of the newest batch in the per-region recognizer time average
+    REGION_TIME_SMOOTHING = 0.2
+    
+    def __init__(
+        self,
+        languages: List[str] = None,
+        gpu: bool = False,
+        batch_size: int = 1,
+        region_cache: Optional[RegionCache] = None,
+        lexicon: Optional[Lexicon] = None,
+        quantize: bool = True
+    ):
         super().__init__()
         self.name = "EasyOCR"
         self.languages = languages or ['en']
         self.gpu = gpu
+        self.quantize = quantize  # EasyOCR's default: dynamic int8 models on CPU
+        self.batch_size = max(1, batch_size)
+        self.region_cache = region_cache
+        self.lexicon = lexicon
+        self.decoder = 'greedy'
+        self._region_time = None  # Exponential moving average of recognizer time per region
         self._load_model()
+        
+        if self.lexicon is not None:
+            self._apply_lexicon()
+    
+    @classmethod
+    def from_config(cls, **kwargs) -> "EasyOCREngine":
+        return cls(
+            languages=kwargs.get('languages', ['en']),
+            gpu=kwargs.get('gpu', False),
+            batch_size=kwargs.get('batch_size', 1),
+            region_cache=kwargs.get('region_cache'),
+            lexicon=kwargs.get('lexicon'),
+            quantize=kwargs.get('quantize', True)
+        )
     
     def _load_model(self):
         """Load EasyOCR reader"""
@@ -50,13 +208,33 @@ class EasyOCREngine(BaseOCREngine):
             import easyocr
             
             logger.info(f"Loading EasyOCR with languages: {self.languages}")
-            self.reader = easyocr.Reader(self.languages, gpu=self.gpu)
+            self.reader = easyocr.Reader(self.languages, gpu=self.gpu, quantize=self.quantize)
             logger.info("EasyOCR loaded successfully")
             
         except Exception as e:
             logger.error(f"Failed to load EasyOCR: {str(e)}")
             raise
     
+    def _apply_lexicon(self):
+        """
+        Bias decoding towards the subject vocabulary
+        
+        The recognizer switches to word beam search, whose dictionary is
+        the language word list plus the lexicon words, held in a set so
+        that each membership test during the search is a hash lookup.
+        """
+        try:
+            converter = self.reader.converter
+            words = set(getattr(converter, "dict_list", None) or [])
+            words.update(self.lexicon.words())
+            converter.dict_list = words
+            self.decoder = 'wordbeamsearch'
+            logger.info(f"EasyOCR decoding biased with lexicon '{self.lexicon.name}' ({len(self.lexicon)} words)")
+            
+        except Exception as e:
+            logger.warning(f"Lexicon decoding unavailable, using greedy decoding: {str(e)}")
+            self.decoder = 'greedy'
+    
     def recognize(self, image: Image.Image) -> OCRResult:
         """
         Recognize text using EasyOCR
@@ -69,52 +247,388 @@ class EasyOCREngine(BaseOCREngine):
         """
         try:
             logger.debug("Running EasyOCR recognition")
-            start_time = time.time()
             
-            # Convert PIL to numpy array
-            img_array = np.array(image)
+            result = self._recognize_pages([image], self.batch_size)[0]
             
-            # Perform OCR
-            results = self.reader.readtext(img_array)
+            logger.debug(f"EasyOCR recognition completed in {result.metadata['processing_time']:.2f}s")
+            return result
             
-            # Combine all text results
-            texts = []
-            confidences = []
+        except Exception as e:
+            logger.error(f"EasyOCR recognition failed: {str(e)}")
+            return OCRResult(text="", confidence=0.0, metadata={"error": str(e)})
+    
+    def recognize_batch(self, images: List[Image.Image], batch_size: int = None) -> List[OCRResult]:
+        """
+        Recognize text in several images with one batched recognizer pass
+        
+        Text regions are detected page by page, then the cropped regions of
+        all pages are fed through the recognizer together so that each
+        forward pass sees a full batch instead of a handful of crops.
+        
+        Args:
+            images: List of PIL Images
+            batch_size: Recognizer batch size (defaults to the engine setting)
+            
+        Returns:
+            List of OCRResults, one per image, in input order
+        """
+        if not images:
+            return []
+        
+        try:
+            return self._recognize_pages(images, max(1, batch_size or self.batch_size))
+            
+        except Exception as e:
+            logger.warning(f"Batched EasyOCR recognition failed, falling back to per-image: {str(e)}")
+            return [self.recognize(image) for image in images]
+    
+    def _recognize_pages(self, images: List[Image.Image], batch_size: int) -> List[OCRResult]:
+        """Detect regions on every page, then recognize all crops together"""
+        from easyocr.utils import reformat_input, get_image_list
+        
+        start_time = time.time()
+        
+        # Step 1: Detect and crop text regions on every page
+        all_crops = []
+        page_counts = []
+        max_width = 0
+        
+        for image in images:
+            img, img_cv_grey = reformat_input(np.array(image))
+            horizontal_list, free_list = self.reader.detect(img)
+            crops, width = get_image_list(
+                horizontal_list[0],
+                free_list[0],
+                img_cv_grey,
+                model_height=self.reader.imgH
+            )
+            all_crops.extend(crops)
+            page_counts.append(len(crops))
+            max_width = max(max_width, width)
+        
+        logger.debug(f"Detected {len(all_crops)} regions on {len(images)} pages")
+        
+        # Step 2: Recognize all regions in large batches
+        cache_stats = {"hits": 0, "misses": 0, "saved_time": 0.0}
+        recognized = self._recognize_crops(all_crops, max_width, batch_size, cache_stats) if all_crops else []
+        
+        # Step 3: Map recognized regions back to their pages
+        processing_time = (time.time() - start_time) / len(images)
+        
+        results = []
+        offset = 0
+        for count in page_counts:
+            page_result = self._build_result(recognized[offset:offset + count], processing_time)
+            page_result.metadata["batch_size"] = batch_size
+            if self.region_cache is not None:
+                page_result.metadata["region_cache"] = dict(cache_stats)
+            results.append(page_result)
+            offset += count
+        
+        return results
+    
+    def iter_regions(self, image: Image.Image) -> Iterator[dict]:
+        """
+        Yield recognized regions batch by batch while the page is processed
+        
+        The detector runs once, then crops go through the recognizer in
+        chunks of batch_size (top to bottom), so the first lines are
+        available long before the whole page is done.
+        
+        Args:
+            image: PIL Image
             
-            for (bbox, text, conf) in results:
-                texts.append(text)
-                confidences.append(conf)
+        Yields:
+            Dicts with box (x0, y0, x1, y1), text and confidence
+        """
+        from easyocr.utils import reformat_input, get_image_list
+        
+        img, img_cv_grey = reformat_input(np.array(image))
+        horizontal_list, free_list = self.reader.detect(img)
+        crops, max_width = get_image_list(
+            horizontal_list[0],
+            free_list[0],
+            img_cv_grey,
+            model_height=self.reader.imgH
+        )
+        
+        for start in range(0, len(crops), self.batch_size):
+            chunk = crops[start:start + self.batch_size]
+            for bbox, text, conf in self._recognize_crops(chunk, max_width, self.batch_size):
+                xs = [float(point[0]) for point in bbox]
+                ys = [float(point[1]) for point in bbox]
+                yield {"box": [min(xs), min(ys), max(xs), max(ys)], "text": text, "confidence": float(conf)}
+    
+    def recognize_regions(self, image: Image.Image, boxes: np.ndarray) -> List[Tuple[str, float]]:
+        """
+        Re-recognize specific regions without running the detector
+        
+        Args:
+            image: PIL Image
+            boxes: N x 4 array of (x0, y0, x1, y1) pixel boxes
             
-            combined_text = " ".join(texts)
-            avg_confidence = sum(confidences) / len(confidences) if confidences else 0.0
+        Returns:
+            List of (text, confidence) tuples, one per box
+        """
+        if len(boxes) == 0:
+            return []
+        
+        from easyocr.utils import reformat_input, get_image_list
+        
+        _, img_cv_grey = reformat_input(np.array(image))
+        
+        # One box at a time keeps the crops in the same order as the boxes
+        crops = []
+        max_width = 0
+        for x0, y0, x1, y1 in np.asarray(boxes, dtype=np.int64):
+            box_crops, width = get_image_list(
+                [[int(x0), int(x1), int(y0), int(y1)]],
+                [],
+                img_cv_grey,
+                model_height=self.reader.imgH
+            )
+            crops.extend(box_crops)
+            max_width = max(max_width, width)
+        
+        # Escalated regions are always re-read; a cached low-resolution
+        # reading of the same region would defeat the purpose
+        recognized = self._run_recognizer(crops, max_width, self.batch_size)
+        return [(text, conf) for (bbox, text, conf) in recognized]
+    
+    def _cache_namespace(self) -> str:
+        """Key prefix identifying the recognizer configuration"""
+        return f"easyocr:{'+'.join(self.languages)}{self._decoder_key()}"
+    
+    def _decoder_key(self) -> str:
+        """Cache key suffix for lexicon-biased decoding (empty for greedy decoding)"""
+        if self.decoder == 'greedy':
+            return ""
+        return f":{self.decoder}:{self.lexicon.name}"
+    
+    def _recognize_crops(
+        self,
+        image_list: list,
+        max_width: int,
+        batch_size: int,
+        cache_stats: dict = None
+    ) -> list:
+        """
+        Run the EasyOCR recognizer over pre-cropped text regions
+        
+        Regions found in the region cache skip the recognizer; only the
+        misses are batched through the model.
+        
+        Args:
+            image_list: List of (box, crop) tuples from easyocr.utils.get_image_list
+            max_width: Widest crop width after resizing to model height
+            batch_size: Recognizer batch size
+            cache_stats: Optional dict updated with hits, misses and saved_time
             
-            processing_time = time.time() - start_time
-            logger.debug(f"EasyOCR recognition completed in {processing_time:.2f}s")
+        Returns:
+            List of (box, text, confidence) tuples in input order
+        """
+        if self.region_cache is None:
+            return self._run_recognizer(image_list, max_width, batch_size)
+        
+        keys, cached = self.region_cache.lookup(
+            self._cache_namespace(),
+            [crop for (box, crop) in image_list]
+        )
+        
+        missing = [i for i, value in enumerate(cached) if value is None]
+        hits = len(image_list) - len(missing)
+        
+        if missing:
+            start_time = time.time()
+            recognized = self._run_recognizer([image_list[i] for i in missing], max_width, batch_size)
+            elapsed = time.time() - start_time
             
-            return OCRResult(
-                text=combined_text,
-                confidence=avg_confidence,
-                metadata={
-                    "processing_time": processing_time,
-                    "num_detections": len(results),
-                    "languages": self.languages
-                }
+            batch_time = elapsed / len(missing)
+            if self._region_time is None:
+                self._region_time = batch_time
+            else:
+                self._region_time += self.REGION_TIME_SMOOTHING * (batch_time - self._region_time)
+            self.region_cache.store(
+                [keys[i] for i in missing],
+                [(text, conf) for (box, text, conf) in recognized]
+            )
+            for i, (box, text, conf) in zip(missing, recognized):
+                cached[i] = (text, conf)
+        
+        if cache_stats is not None:
+            cache_stats["hits"] += hits
+            cache_stats["misses"] += len(missing)
+            cache_stats["saved_time"] += hits * (self._region_time or 0.0)
+        
+        return [(box, text, conf) for (box, crop), (text, conf) in zip(image_list, cached)]
+    
+    def _run_recognizer(self, image_list: list, max_width: int, batch_size: int) -> list:
+        """Run the EasyOCR recognition model over (box, crop) tuples"""
+        from easyocr.recognition import get_text
+        
+        reader = self.reader
+        ignore_char = ''.join(set(reader.character) - set(reader.lang_char))
+        
+        return get_text(
+            reader.character,
+            reader.imgH,
+            int(max_width),
+            reader.recognizer,
+            reader.converter,
+            image_list,
+            ignore_char=ignore_char,
+            decoder=self.decoder,
+            beamWidth=5,
+            batch_size=batch_size,
+            workers=0,
+            device=reader.device
+        )
+    
+    def _build_result(self, results: list, processing_time: float) -> OCRResult:
+        """Build an OCRResult from EasyOCR (bbox, text, confidence) tuples"""
+        # Keep boxes and per-fragment confidences in a compact layout
+        layout = OCRLayout.from_quads(
+            [bbox for (bbox, text, conf) in results],
+            [text for (bbox, text, conf) in results],
+            [conf for (bbox, text, conf) in results]
+        )
+        
+        return OCRResult(
+            text=layout.to_text(),
+            confidence=layout.mean_confidence(),
+            metadata={
+                "processing_time": processing_time,
+                "num_detections": len(results),
+                "languages": self.languages
+            },
+            layout=layout
+        )
+
+
+@register_engine('easyocr_cpu')
+class EasyOCRCPUEngine(EasyOCREngine):
+    """EasyOCR with CPU-optimized models (dynamic int8 quantization or ONNX Runtime)"""
+    
+    CAPABILITIES = EngineCapabilities(handwriting=True, printed=True, speed="medium")
+    
+    def __init__(
+        self,
+        languages: List[str] = None,
+        batch_size: int = 1,
+        region_cache: Optional[RegionCache] = None,
+        backend: str = "onnx",
+        intra_op_threads: int = 0,
+        model_dir: str = "static/models",
+        lexicon: Optional[Lexicon] = None
+    ):
+        self.backend = backend
+        self.intra_op_threads = intra_op_threads
+        self.model_dir = model_dir
+        # Loaded in fp32: optimize_reader does the quantization itself, and
+        # ONNX export cannot trace EasyOCR's dynamically quantized modules
+        super().__init__(
+            languages=languages,
+            gpu=False,
+            batch_size=batch_size,
+            region_cache=region_cache,
+            lexicon=lexicon,
+            quantize=False
+        )
+        self.name = f"EasyOCR ({backend})"
+    
+    @classmethod
+    def from_config(cls, **kwargs) -> "EasyOCRCPUEngine":
+        return cls(
+            languages=kwargs.get('languages', ['en']),
+            batch_size=kwargs.get('batch_size', 1),
+            region_cache=kwargs.get('region_cache'),
+            backend=kwargs.get('backend', 'onnx'),
+            intra_op_threads=kwargs.get('intra_op_threads', 0),
+            model_dir=kwargs.get('model_dir', 'static/models'),
+            lexicon=kwargs.get('lexicon')
+        )
+    
+    def _load_model(self):
+        """Load EasyOCR reader and swap in optimized models"""
+        super()._load_model()
+        
+        from utils.model_optimization import optimize_reader
+        
+        if self.backend == "onnx":
+            try:
+                import onnxruntime
+            except ImportError:
+                logger.warning("onnxruntime is not installed; EasyOCR CPU engine falls back to int8")
+                self.backend = "int8"
+                self.name = "EasyOCR (int8)"
+        
+        try:
+            optimize_reader(
+                self.reader,
+                backend=self.backend,
+                model_dir=self.model_dir,
+                model_key="easyocr_" + "_".join(self.languages),
+                intra_op_threads=self.intra_op_threads
             )
             
         except Exception as e:
-            logger.error(f"EasyOCR recognition failed: {str(e)}")
-            return OCRResult(text="", confidence=0.0, metadata={"error": str(e)})
+            logger.error(f"Failed to optimize EasyOCR for CPU ({self.backend}): {str(e)}")
+            raise
+    
+    def _cache_namespace(self) -> str:
+        """Optimized models may read regions slightly differently"""
+        return f"easyocr-{self.backend}:{'+'.join(self.languages)}{self._decoder_key()}"
 
 
+@register_engine('google_vision')
 class GoogleVisionEngine(BaseOCREngine):
     """Google Cloud Vision API OCR"""
     
-    def __init__(self, credentials_path: str = None):
+    CAPABILITIES = EngineCapabilities(handwriting=True, printed=True, speed="slow", local=False)
+    
+    def __init__(
+        self,
+        credentials_path: str = None,
+        encoding: str = "png",
+        jpeg_quality: int = 90,
+        pages_per_request: int = 8,
+        concurrency: int = 4,
+        timeout: float = 60.0,
+        api_endpoint: str = "",
+        insecure: bool = False
+    ):
         super().__init__()
         self.name = "Google Vision"
         self.credentials_path = credentials_path
+        self.encoding = encoding.lower()
+        self.jpeg_quality = jpeg_quality
+        self.pages_per_request = max(1, min(pages_per_request, 16))  # API limit per request
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.api_endpoint = api_endpoint
+        self.insecure = insecure
+        
+        # Async client lives on a dedicated event loop so its channel is reused
+        self._async_client = None
+        self._loop = None
+        self._loop_thread = None
+        self._loop_lock = threading.Lock()
+        
         self._load_client()
     
+    @classmethod
+    def from_config(cls, **kwargs) -> "GoogleVisionEngine":
+        return cls(
+            credentials_path=kwargs.get('credentials_path'),
+            encoding=kwargs.get('encoding', 'png'),
+            jpeg_quality=kwargs.get('jpeg_quality', 90),
+            pages_per_request=kwargs.get('pages_per_request', 8),
+            concurrency=kwargs.get('concurrency', 4),
+            timeout=kwargs.get('timeout', 60.0),
+            api_endpoint=kwargs.get('api_endpoint', ''),
+            insecure=kwargs.get('insecure', False)
+        )
+    
     def _load_client(self):
         """Initialize Google Vision client"""
         try:
@@ -125,13 +639,56 @@ class GoogleVisionEngine(BaseOCREngine):
                 os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = self.credentials_path
             
             logger.info("Initializing Google Vision client")
-            self.client = vision.ImageAnnotatorClient()
+            
+            if self.api_endpoint and self.insecure:
+                # Plain-text channel to a local stand-in server
+                import grpc
+                from google.cloud.vision_v1.services.image_annotator.transports import ImageAnnotatorGrpcTransport
+                
+                channel = grpc.insecure_channel(self.api_endpoint)
+                self.client = vision.ImageAnnotatorClient(transport=ImageAnnotatorGrpcTransport(channel=channel))
+            elif self.api_endpoint:
+                self.client = vision.ImageAnnotatorClient(client_options={"api_endpoint": self.api_endpoint})
+            else:
+                self.client = vision.ImageAnnotatorClient()
+            
             logger.info("Google Vision client initialized")
             
         except Exception as e:
             logger.error(f"Failed to initialize Google Vision: {str(e)}")
             raise
     
+    def _create_async_client(self):
+        """Create the asyncio client (must run on the engine's event loop)"""
+        from google.cloud import vision
+        
+        if self.api_endpoint and self.insecure:
+            import grpc
+            from google.cloud.vision_v1.services.image_annotator.transports import ImageAnnotatorGrpcAsyncIOTransport
+            
+            channel = grpc.aio.insecure_channel(self.api_endpoint)
+            return vision.ImageAnnotatorAsyncClient(transport=ImageAnnotatorGrpcAsyncIOTransport(channel=channel))
+        
+        if self.api_endpoint:
+            return vision.ImageAnnotatorAsyncClient(client_options={"api_endpoint": self.api_endpoint})
+        
+        return vision.ImageAnnotatorAsyncClient()
+    
+    def _encode(self, image: Image.Image) -> bytes:
+        """Encode a page as PNG (lossless) or JPEG (smaller uploads)"""
+        import io
+        
+        img_byte_arr = io.BytesIO()
+        
+        if self.encoding in ("jpeg", "jpg"):
+            if image.mode not in ("L", "RGB"):
+                image = image.convert("RGB")
+            image.save(img_byte_arr, format='JPEG', quality=self.jpeg_quality)
+        else:
+            image.save(img_byte_arr, format='PNG')
+        
+        return img_byte_arr.getvalue()
+    
     def recognize(self, image: Image.Image) -> OCRResult:
         """
         Recognize text using Google Vision API
@@ -144,64 +701,423 @@ class GoogleVisionEngine(BaseOCREngine):
         """
         try:
             from google.cloud import vision
-            import io
             
             logger.debug("Running Google Vision recognition")
             start_time = time.time()
             
-            # Convert PIL Image to bytes
-            img_byte_arr = io.BytesIO()
-            image.save(img_byte_arr, format='PNG')
-            img_byte_arr = img_byte_arr.getvalue()
-            
             # Create Vision API image object
-            vision_image = vision.Image(content=img_byte_arr)
+            vision_image = vision.Image(content=self._encode(image))
             
             # Perform document text detection
-            response = self.client.document_text_detection(image=vision_image)
+            response = self.client.document_text_detection(image=vision_image, timeout=self.timeout)
+            
+            processing_time = time.time() - start_time
+            logger.debug(f"Google Vision recognition completed in {processing_time:.2f}s")
+            
+            return self._parse_response(response, processing_time)
+            
+        except Exception as e:
+            logger.error(f"Google Vision recognition failed: {str(e)}")
+            return OCRResult(text="", confidence=0.0, metadata={"error": str(e)})
+    
+    def _parse_response(self, response, processing_time: float) -> OCRResult:
+        """Build an OCRResult from an AnnotateImageResponse"""
+        if response.error.message:
+            raise Exception(response.error.message)
+        
+        # Extract text
+        text = response.full_text_annotation.text if response.full_text_annotation else ""
+        
+        # Calculate average confidence
+        confidences = []
+        for page in response.full_text_annotation.pages:
+            for block in page.blocks:
+                confidences.append(block.confidence)
+        
+        avg_confidence = sum(confidences) / len(confidences) if confidences else 0.0
+        
+        return OCRResult(
+            text=text,
+            confidence=avg_confidence,
+            metadata={"processing_time": processing_time},
+            layout=self._build_layout(response.full_text_annotation)
+        )
+    
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the engine's background event loop on first use"""
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(target=self._loop.run_forever, name="google-vision-loop", daemon=True)
+                self._loop_thread.start()
+        return self._loop
+    
+    def close(self):
+        """Close the gRPC channels and stop the background event loop"""
+        with self._loop_lock:
+            loop, self._loop = self._loop, None
+            thread, self._loop_thread = self._loop_thread, None
+        
+        if loop is not None:
+            if self._async_client is not None:
+                try:
+                    asyncio.run_coroutine_threadsafe(self._async_client.transport.close(), loop).result(self.timeout)
+                except Exception as e:
+                    logger.warning(f"Failed to close Google Vision async channel: {str(e)}")
+                self._async_client = None
+            
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+        
+        self.client.transport.close()
+    
+    def recognize_batch(self, images: List[Image.Image]) -> List[OCRResult]:
+        """
+        Recognize several pages with concurrent batch_annotate_images requests
+        
+        Args:
+            images: List of PIL Images
+            
+        Returns:
+            List of OCRResults in input order
+        """
+        future = asyncio.run_coroutine_threadsafe(self._batch_annotate(images), self._ensure_loop())
+        return future.result()
+    
+    async def _batch_annotate(self, images: List[Image.Image]) -> List[OCRResult]:
+        """Send pages in chunks of pages_per_request, at most `concurrency` requests in flight"""
+        from google.cloud import vision
+        
+        if not images:
+            return []
+        
+        if self._async_client is None:
+            self._async_client = self._create_async_client()
+        
+        semaphore = asyncio.Semaphore(self.concurrency)
+        feature = vision.Feature(type_=vision.Feature.Type.DOCUMENT_TEXT_DETECTION)
+        
+        async def annotate_chunk(chunk: List[Image.Image]) -> List[OCRResult]:
+            async with semaphore:
+                start_time = time.time()
+                try:
+                    requests = [
+                        vision.AnnotateImageRequest(
+                            image=vision.Image(content=self._encode(image)),
+                            features=[feature]
+                        )
+                        for image in chunk
+                    ]
+                    response = await self._async_client.batch_annotate_images(
+                        requests=requests,
+                        timeout=self.timeout
+                    )
+                except Exception as e:
+                    logger.error(f"Google Vision batch request failed: {str(e)}")
+                    return [OCRResult(text="", confidence=0.0, metadata={"error": str(e)}) for _ in chunk]
+                
+                processing_time = (time.time() - start_time) / len(chunk)
+                
+                results = []
+                for page_response in response.responses:
+                    try:
+                        results.append(self._parse_response(page_response, processing_time))
+                    except Exception as e:
+                        logger.error(f"Google Vision recognition failed: {str(e)}")
+                        results.append(OCRResult(text="", confidence=0.0, metadata={"error": str(e)}))
+                return results
+        
+        chunks = [
+            images[i:i + self.pages_per_request]
+            for i in range(0, len(images), self.pages_per_request)
+        ]
+        logger.debug(f"Google Vision: {len(images)} pages in {len(chunks)} batch requests")
+        
+        chunk_results = await asyncio.gather(*(annotate_chunk(chunk) for chunk in chunks))
+        return [result for results in chunk_results for result in results]
+    
+    def _build_layout(self, annotation) -> OCRLayout:
+        """Collect word boxes and confidences from a full text annotation"""
+        boxes = []
+        texts = []
+        confidences = []
+        block_ids = []
+        
+        if not annotation:
+            return OCRLayout.empty()
+        
+        block_index = 0
+        for page in annotation.pages:
+            for block in page.blocks:
+                for paragraph in block.paragraphs:
+                    for word in paragraph.words:
+                        xs = [v.x for v in word.bounding_box.vertices]
+                        ys = [v.y for v in word.bounding_box.vertices]
+                        boxes.append((min(xs), min(ys), max(xs), max(ys)))
+                        texts.append("".join(symbol.text for symbol in word.symbols))
+                        confidences.append(word.confidence)
+                        block_ids.append(block_index)
+                block_index += 1
+        
+        return OCRLayout(boxes, texts, confidences, block_ids=block_ids)
+
+
+@register_engine('tesseract')
+class TesseractEngine(BaseOCREngine):
+    """Tesseract - fast local engine for printed or very clean text"""
+    
+    CAPABILITIES = EngineCapabilities(handwriting=False, printed=True, speed="fast")
+    
+    def __init__(self, lang: str = "eng", psm: int = 3, lexicon: Optional[Lexicon] = None):
+        super().__init__()
+        self.name = "Tesseract"
+        self.lang = lang
+        self.psm = psm
+        self.lexicon = lexicon
+        self.user_words_path = None
+        self._load_engine()
+        
+        if self.lexicon is not None:
+            self._write_user_words()
+    
+    @classmethod
+    def from_config(cls, **kwargs) -> "TesseractEngine":
+        return cls(lang=kwargs.get('lang', 'eng'), psm=kwargs.get('psm', 3), lexicon=kwargs.get('lexicon'))
+    
+    def _write_user_words(self):
+        """Write the lexicon as a Tesseract user-words file (one word per line)"""
+        import tempfile
+        
+        folder = os.path.join(tempfile.gettempdir(), "ocr_user_words")
+        os.makedirs(folder, exist_ok=True)
+        
+        self.user_words_path = os.path.join(folder, f"{self.lexicon.name}.user-words")
+        with open(self.user_words_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(sorted(self.lexicon.words())) + "\n")
+    
+    def _load_engine(self):
+        """Check that pytesseract and the tesseract binary are available"""
+        try:
+            import pytesseract
+            
+            version = pytesseract.get_tesseract_version()
+            logger.info(f"Tesseract {version} available")
             
-            if response.error.message:
-                raise Exception(response.error.message)
+        except Exception as e:
+            logger.error(f"Failed to load Tesseract: {str(e)}")
+            raise
+    
+    def recognize(self, image: Image.Image) -> OCRResult:
+        """
+        Recognize text using Tesseract
+        
+        Args:
+            image: PIL Image
             
-            # Extract text
-            text = response.full_text_annotation.text if response.full_text_annotation else ""
+        Returns:
+            OCRResult with extracted text and confidence
+        """
+        try:
+            import pytesseract
+            
+            logger.debug("Running Tesseract recognition")
+            start_time = time.time()
+            
+            tess_config = f"--oem 1 --psm {self.psm}"
+            if self.user_words_path:
+                tess_config += f" --user-words {self.user_words_path}"
+            
+            data = pytesseract.image_to_data(
+                image,
+                lang=self.lang,
+                config=tess_config,
+                output_type=pytesseract.Output.DICT
+            )
             
-            # Calculate average confidence
+            boxes = []
+            texts = []
             confidences = []
-            for page in response.full_text_annotation.pages:
-                for block in page.blocks:
-                    confidences.append(block.confidence)
+            line_ids = []
+            block_ids = []
+            line_keys = {}
+            block_keys = {}
+            
+            for i, word in enumerate(data["text"]):
+                conf = float(data["conf"][i])
+                if conf < 0 or not word.strip():
+                    continue
+                
+                left, top = data["left"][i], data["top"][i]
+                boxes.append((left, top, left + data["width"][i], top + data["height"][i]))
+                texts.append(word)
+                confidences.append(conf / 100.0)
+                
+                block_key = (data["block_num"][i], data["par_num"][i])
+                line_key = block_key + (data["line_num"][i],)
+                block_ids.append(block_keys.setdefault(block_key, len(block_keys)))
+                line_ids.append(line_keys.setdefault(line_key, len(line_keys)))
             
-            avg_confidence = sum(confidences) / len(confidences) if confidences else 0.0
+            layout = OCRLayout(boxes, texts, confidences, line_ids=line_ids, block_ids=block_ids) \
+                if texts else OCRLayout.empty()
             
             processing_time = time.time() - start_time
-            logger.debug(f"Google Vision recognition completed in {processing_time:.2f}s")
+            logger.debug(f"Tesseract recognition completed in {processing_time:.2f}s")
             
             return OCRResult(
-                text=text,
-                confidence=avg_confidence,
-                metadata={"processing_time": processing_time}
+                text=layout.to_text(),
+                confidence=layout.mean_confidence(),
+                metadata={
+                    "processing_time": processing_time,
+                    "num_detections": len(texts),
+                    "languages": [self.lang]
+                },
+                layout=layout
             )
             
         except Exception as e:
-            logger.error(f"Google Vision recognition failed: {str(e)}")
+            logger.error(f"Tesseract recognition failed: {str(e)}")
             return OCRResult(text="", confidence=0.0, metadata={"error": str(e)})
 
 
+@register_engine('auto')
+class AutoRouteEngine(BaseOCREngine):
+    """Routes each page (or content region) to a printed-text or handwriting engine"""
+    
+    CAPABILITIES = EngineCapabilities(handwriting=True, printed=True, speed="medium")
+    
+    def __init__(
+        self,
+        printed_engine: str = "tesseract",
+        handwriting_engine: str = "easyocr",
+        engine_kwargs: Dict[str, dict] = None,
+        per_region: bool = False,
+        thresholds: dict = None
+    ):
+        super().__init__()
+        self.name = "Auto"
+        self.engine_names = {"printed": printed_engine, "handwriting": handwriting_engine}
+        self.engine_kwargs = engine_kwargs or {}
+        self.per_region = per_region
+        self.thresholds = thresholds or {}
+        self._engines: Dict[str, BaseOCREngine] = {}
+        
+        for name in self.engine_names.values():
+            if name not in ENGINE_REGISTRY or name == self.engine_key:
+                raise ValueError(f"Unknown routed engine: {name}")
+    
+    @classmethod
+    def from_config(cls, **kwargs) -> "AutoRouteEngine":
+        return cls(
+            printed_engine=kwargs.get('printed_engine', 'tesseract'),
+            handwriting_engine=kwargs.get('handwriting_engine', 'easyocr'),
+            engine_kwargs=kwargs.get('engine_kwargs'),
+            per_region=kwargs.get('per_region', False),
+            thresholds={
+                'max_height_cv': kwargs.get('max_height_cv', 0.35),
+                'max_stroke_cv': kwargs.get('max_stroke_cv', 0.45)
+            }
+        )
+    
+    def close(self):
+        """Close the routed engines"""
+        for engine in self._engines.values():
+            engine.close()
+        self._engines.clear()
+    
+    def _engine_for(self, style: str) -> BaseOCREngine:
+        """Get (lazily creating) the engine for a text style"""
+        name = self.engine_names[style]
+        
+        if name not in self._engines:
+            try:
+                self._engines[name] = ENGINE_REGISTRY[name].from_config(**self.engine_kwargs.get(name, {}))
+            except Exception as e:
+                # A missing fast engine should not break handwriting OCR
+                if style == "printed":
+                    logger.warning(f"Printed-text engine '{name}' unavailable, using handwriting engine: {str(e)}")
+                    self.engine_names["printed"] = self.engine_names["handwriting"]
+                    return self._engine_for("handwriting")
+                raise
+        
+        return self._engines[name]
+    
+    def recognize(self, image: Image.Image) -> OCRResult:
+        """
+        Recognize text with the engine suited to the page (or each region)
+        
+        Args:
+            image: PIL Image
+            
+        Returns:
+            OCRResult with routing decisions in metadata
+        """
+        from utils.engine_router import classify_text_style
+        
+        start_time = time.time()
+        
+        if not self.per_region:
+            style, features = classify_text_style(image, self.thresholds)
+            result = self._engine_for(style).recognize(image)
+            result.metadata["routing"] = {
+                "style": style,
+                "engine": self.engine_names[style],
+                "features": features
+            }
+            return result
+        
+        from utils.preprocess import ImagePreprocessor
+        
+        regions = sorted(ImagePreprocessor().find_content_regions(image), key=lambda box: (box[1], box[0]))
+        
+        layouts = []
+        routed = {"printed": 0, "handwriting": 0}
+        
+        for x0, y0, x1, y1 in regions:
+            crop = image.crop((x0, y0, x1, y1))
+            style, _ = classify_text_style(crop, self.thresholds)
+            routed[style] += 1
+            
+            region_result = self._engine_for(style).recognize(crop)
+            if region_result.layout is not None:
+                layouts.append(region_result.layout.translate(x0, y0))
+        
+        layout = OCRLayout.concatenate(layouts)
+        processing_time = time.time() - start_time
+        
+        return OCRResult(
+            text=layout.to_text(),
+            confidence=layout.mean_confidence(),
+            metadata={
+                "processing_time": processing_time,
+                "num_detections": len(layout),
+                "routing": {
+                    "regions": routed,
+                    "engines": dict(self.engine_names)
+                }
+            },
+            layout=layout
+        )
+    
+    def recognize_regions(self, image: Image.Image, boxes: np.ndarray) -> List[Tuple[str, float]]:
+        """Re-read regions with the handwriting engine (the stronger reader)"""
+        return self._engine_for("handwriting").recognize_regions(image, boxes)
+
+
 class OCREngine:
     """Main OCR Engine that manages multiple backends"""
     
-    ENGINES = {
-        'easyocr': EasyOCREngine,
-        'google_vision': GoogleVisionEngine
-    }
+    # Shared with the registry, so engines registered later are available too
+    ENGINES = ENGINE_REGISTRY
     
-    def __init__(self, engine_type: str = 'easyocr', **kwargs):
+    def __init__(self, engine_type: str = 'easyocr', cascade: dict = None, **kwargs):
         """
         Initialize OCR Engine
         
         Args:
-            engine_type: Type of OCR engine ('easyocr', 'google_vision')
+            engine_type: Registered engine name ('easyocr', 'easyocr_cpu', 'google_vision',
+                'tesseract', 'auto')
+            cascade: Optional two-pass cascade settings (see config.OCR_CASCADE_CONFIG)
             **kwargs: Engine-specific parameters
         """
         self.engine_type = engine_type.lower()
@@ -214,18 +1130,25 @@ class OCREngine:
         # Initialize the selected engine
         engine_class = self.ENGINES[self.engine_type]
         self.engine = self._create_engine(engine_class, **kwargs)
+        
+        # Optional low-resolution first pass with escalation of uncertain regions
+        self.cascade = cascade if cascade and cascade.get("enabled", False) else None
+        self.escalation_engine = None
+        
+        if self.cascade:
+            escalate_type = (self.cascade.get("escalate_engine") or "").lower()
+            if escalate_type and escalate_type != self.engine_type:
+                if escalate_type not in self.ENGINES:
+                    raise ValueError(f"Unknown escalation engine: {escalate_type}")
+                logger.info(f"Cascade escalates low-confidence regions to {escalate_type}")
+                self.escalation_engine = self._create_engine(
+                    self.ENGINES[escalate_type],
+                    **self.cascade.get("escalate_kwargs", {})
+                )
     
     def _create_engine(self, engine_class, **kwargs):
         """Create engine instance with appropriate parameters"""
-        if engine_class == EasyOCREngine:
-            return engine_class(
-                languages=kwargs.get('languages', ['en']),
-                gpu=kwargs.get('gpu', False)
-            )
-        elif engine_class == GoogleVisionEngine:
-            return engine_class(
-                credentials_path=kwargs.get('credentials_path')
-            )
+        return engine_class.from_config(**kwargs)
     
     def recognize_text(self, image: Image.Image) -> OCRResult:
         """
@@ -237,25 +1160,150 @@ class OCREngine:
         Returns:
             OCRResult
         """
+        if self.cascade:
+            return self._recognize_cascade(image)
         return self.engine.recognize(image)
     
+    def _recognize_cascade(self, image: Image.Image) -> OCRResult:
+        """
+        Two-pass recognition: fast low-resolution pass, then re-run only
+        low-confidence regions at full resolution (or on the escalation engine)
+        
+        If the first pass finds no regions, or its regions cover less than
+        min_coverage of the image (small or faint writing it missed), the
+        whole image is recognized at full resolution instead.
+        
+        Args:
+            image: PIL Image
+            
+        Returns:
+            OCRResult in full-resolution page coordinates
+        """
+        start_time = time.time()
+        
+        scale = self.cascade.get("low_res_scale", 0.5)
+        threshold = self.cascade.get("confidence_threshold", 0.6)
+        padding = self.cascade.get("region_padding", 4)
+        
+        # Pass 1: low resolution
+        width, height = image.size
+        small = image.resize(
+            (max(1, int(width * scale)), max(1, int(height * scale))),
+            Image.Resampling.BILINEAR
+        )
+        first = self.engine.recognize(small)
+        
+        if first.layout is None or "error" in first.metadata:
+            logger.debug("Cascade first pass unusable, running full resolution")
+            return self.engine.recognize(image)
+        
+        coverage = self._coverage(first.layout, small.size)
+        if coverage < self.cascade.get("min_coverage", 0.1):
+            logger.debug(f"Cascade first pass covers {coverage:.1%} of the image, running full resolution")
+            result = self.engine.recognize(image)
+            result.metadata["cascade"] = {
+                "low_res_scale": scale,
+                "fallback": "full_resolution",
+                "first_pass_regions": len(first.layout),
+                "first_pass_coverage": round(coverage, 4)
+            }
+            return result
+        
+        layout = first.layout
+        boxes = layout.boxes / scale
+        texts = list(layout.texts)
+        confidences = layout.confidences.copy()
+        
+        # Pass 2: escalate uncertain regions
+        low = layout.low_confidence(threshold)
+        improved = 0
+        
+        if len(low):
+            region_boxes = boxes[low].copy()
+            region_boxes[:, :2] -= padding
+            region_boxes[:, 2:] += padding
+            region_boxes[:, [0, 2]] = region_boxes[:, [0, 2]].clip(0, width)
+            region_boxes[:, [1, 3]] = region_boxes[:, [1, 3]].clip(0, height)
+            
+            escalation = self.escalation_engine or self.engine
+            regions = escalation.recognize_regions(image, region_boxes)
+            
+            for idx, (text, conf) in zip(low, regions):
+                if text and conf > confidences[idx]:
+                    texts[idx] = text
+                    confidences[idx] = conf
+                    improved += 1
+        
+        layout = OCRLayout(boxes, texts, confidences, line_ids=layout.line_ids, block_ids=layout.block_ids)
+        
+        processing_time = time.time() - start_time
+        logger.debug(f"Cascade escalated {len(low)}/{len(layout)} regions in {processing_time:.2f}s")
+        
+        metadata = dict(first.metadata)
+        metadata["processing_time"] = processing_time
+        metadata["cascade"] = {
+            "low_res_scale": scale,
+            "confidence_threshold": threshold,
+            "regions": len(layout),
+            "escalated": int(len(low)),
+            "improved": improved,
+            "escalation_engine": (self.escalation_engine or self.engine).name
+        }
+        
+        return OCRResult(
+            text=layout.to_text(),
+            confidence=layout.mean_confidence(),
+            metadata=metadata,
+            layout=layout
+        )
+    
+    @staticmethod
+    def _coverage(layout: OCRLayout, size: Tuple[int, int]) -> float:
+        """Fraction of an image covered by the union of a layout's boxes"""
+        width, height = size
+        if not len(layout) or width * height == 0:
+            return 0.0
+        
+        mask = np.zeros((height, width), dtype=bool)
+        for x0, y0, x1, y1 in layout.boxes.round().astype(np.int64):
+            mask[max(y0, 0):max(y1, 0), max(x0, 0):max(x1, 0)] = True
+        return float(mask.mean())
+    
+    def iter_regions(self, image: Image.Image) -> Iterator[dict]:
+        """
+        Yield recognized regions as they complete (the cascade is not applied)
+        
+        Args:
+            image: PIL Image
+            
+        Yields:
+            Dicts with box (x0, y0, x1, y1), text and confidence
+        """
+        return self.engine.iter_regions(image)
+    
     def recognize_batch(self, images: List[Image.Image]) -> List[OCRResult]:
         """
         Recognize text in multiple images
         
+        Engines that support it (EasyOCR) batch regions across all images
+        through the recognizer; others process the images one by one.
+        
         Args:
             images: List of PIL Images
             
         Returns:
             List of OCRResults
         """
-        results = []
-        for i, image in enumerate(images):
-            logger.info(f"Processing image {i+1}/{len(images)}")
-            result = self.recognize_text(image)
-            results.append(result)
-        
-        return results
+        logger.info(f"Processing batch of {len(images)} images")
+        if self.cascade:
+            return [self._recognize_cascade(image) for image in images]
+        return self.engine.recognize_batch(images)
+    
+    def close(self):
+        """Release the resources of the engine and the cascade's escalation engine"""
+        self.engine.close()
+        if self.escalation_engine is not None:
+            self.escalation_engine.close()
 
 
 def create_ocr_engine(engine_type: str = 'easyocr', **kwargs) -> OCREngine:
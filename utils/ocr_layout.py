@@ -0,0 +1,273 @@
+"""
+OCR Layout Module
+Compact, array-backed storage of recognized words with reading-order reconstruction
+"""
+import numpy as np
+from typing import List, Optional, Sequence, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class OCRLayout:
+    """
+    Word-level OCR layout stored as parallel NumPy arrays
+    
+    Each recognized word (or EasyOCR text fragment) is one row:
+    boxes are (x0, y0, x1, y1) in page pixels, with a confidence, a line id
+    and a block (paragraph) id. Ids are assigned in reading order, so
+    sorting by (block, line, x0) yields the text as a human would read it.
+    """
+    
+    __slots__ = ("boxes", "confidences", "texts", "line_ids", "block_ids")
+    
+    def __init__(
+        self,
+        boxes: Sequence,
+        texts: Sequence[str],
+        confidences: Sequence[float],
+        line_ids: Sequence[int] = None,
+        block_ids: Sequence[int] = None,
+        line_overlap: float = 0.5,
+        block_gap: float = 1.2
+    ):
+        """
+        Initialize layout
+        
+        Args:
+            boxes: N x 4 axis-aligned boxes (x0, y0, x1, y1)
+            texts: N word strings
+            confidences: N confidence scores (0-1)
+            line_ids: Optional precomputed line ids (computed if omitted)
+            block_ids: Optional block ids from the engine (computed if omitted)
+            line_overlap: Minimum vertical overlap ratio for two words to share a line
+            block_gap: Vertical gap, in median word heights, that starts a new block
+        """
+        self.boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        self.texts = list(texts)
+        self.confidences = np.asarray(confidences, dtype=np.float32).reshape(-1)
+        
+        if not (len(self.boxes) == len(self.texts) == len(self.confidences)):
+            raise ValueError("boxes, texts and confidences must have the same length")
+        
+        if line_ids is not None and block_ids is not None:
+            self.line_ids = np.asarray(line_ids, dtype=np.int32).reshape(-1)
+            self.block_ids = np.asarray(block_ids, dtype=np.int32).reshape(-1)
+        else:
+            self._assign_reading_order(block_ids, line_overlap, block_gap)
+    
+    @classmethod
+    def from_quads(
+        cls,
+        quads: Sequence,
+        texts: Sequence[str],
+        confidences: Sequence[float],
+        **kwargs
+    ) -> "OCRLayout":
+        """
+        Build a layout from 4-point polygons (as returned by EasyOCR)
+        
+        Args:
+            quads: N polygons of four (x, y) points
+            texts: N word strings
+            confidences: N confidence scores
+            
+        Returns:
+            OCRLayout with axis-aligned bounding boxes
+        """
+        if len(quads) == 0:
+            return cls.empty()
+        
+        points = np.asarray(quads, dtype=np.float32).reshape(len(quads), -1, 2)
+        boxes = np.concatenate([points.min(axis=1), points.max(axis=1)], axis=1)
+        
+        return cls(boxes, texts, confidences, **kwargs)
+    
+    @classmethod
+    def empty(cls) -> "OCRLayout":
+        """Create a layout with no words"""
+        return cls(np.zeros((0, 4), dtype=np.float32), [], [], line_ids=[], block_ids=[])
+    
+    @classmethod
+    def concatenate(cls, layouts: List["OCRLayout"]) -> "OCRLayout":
+        """
+        Join layouts (e.g. of separate page regions) keeping each one's lines and blocks distinct
+        
+        Args:
+            layouts: Layouts in reading order
+            
+        Returns:
+            Combined OCRLayout
+        """
+        layouts = [layout for layout in layouts if len(layout)]
+        if not layouts:
+            return cls.empty()
+        
+        line_ids = []
+        block_ids = []
+        line_offset = 0
+        block_offset = 0
+        
+        for layout in layouts:
+            line_ids.append(layout.line_ids + line_offset)
+            block_ids.append(layout.block_ids + block_offset)
+            line_offset += int(layout.line_ids.max()) + 1
+            block_offset += int(layout.block_ids.max()) + 1
+        
+        return cls(
+            np.concatenate([layout.boxes for layout in layouts]),
+            [text for layout in layouts for text in layout.texts],
+            np.concatenate([layout.confidences for layout in layouts]),
+            line_ids=np.concatenate(line_ids),
+            block_ids=np.concatenate(block_ids)
+        )
+    
+    def to_dict(self) -> dict:
+        """Plain lists for JSON storage (float32 values round-trip exactly)"""
+        return {
+            "boxes": self.boxes.tolist(),
+            "texts": list(self.texts),
+            "confidences": self.confidences.tolist(),
+            "line_ids": self.line_ids.tolist(),
+            "block_ids": self.block_ids.tolist(),
+        }
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> "OCRLayout":
+        """Rebuild a layout saved with to_dict(), keeping its reading order"""
+        return cls(
+            data["boxes"],
+            data["texts"],
+            data["confidences"],
+            line_ids=data["line_ids"],
+            block_ids=data["block_ids"]
+        )
+    
+    def __len__(self):
+        return len(self.texts)
+    
+    def _assign_reading_order(self, block_ids: Optional[Sequence[int]], line_overlap: float, block_gap: float):
+        """Group words into lines and blocks and number them in reading order"""
+        n = len(self.texts)
+        self.line_ids = np.zeros(n, dtype=np.int32)
+        self.block_ids = np.zeros(n, dtype=np.int32)
+        
+        if n == 0:
+            return
+        
+        heights = np.maximum(self.boxes[:, 3] - self.boxes[:, 1], 1.0)
+        median_height = float(np.median(heights))
+        
+        # Engine-provided blocks are kept; lines are found within each block
+        if block_ids is not None:
+            given = np.asarray(block_ids, dtype=np.int32).reshape(-1)
+            groups = [np.flatnonzero(given == b) for b in dict.fromkeys(given.tolist())]
+        else:
+            groups = [np.arange(n)]
+        
+        next_line = 0
+        next_block = 0
+        
+        for group in groups:
+            lines = self._group_lines(group, heights, line_overlap)
+            
+            for i, line in enumerate(lines):
+                # Split engine-less pages into blocks at large vertical gaps
+                if block_ids is None and i > 0:
+                    prev_bottom = self.boxes[lines[i - 1], 3].max()
+                    top = self.boxes[line, 1].min()
+                    if top - prev_bottom > block_gap * median_height:
+                        next_block += 1
+                
+                self.line_ids[line] = next_line
+                self.block_ids[line] = next_block
+                next_line += 1
+            
+            next_block += 1
+    
+    def _group_lines(self, indices: np.ndarray, heights: np.ndarray, line_overlap: float) -> List[np.ndarray]:
+        """Greedily group word indices into lines by vertical overlap"""
+        centers = (self.boxes[indices, 1] + self.boxes[indices, 3]) / 2
+        ordered = indices[np.argsort(centers, kind="stable")]
+        
+        lines = []
+        current = []
+        line_top = line_bottom = 0.0
+        
+        for idx in ordered:
+            y0, y1 = self.boxes[idx, 1], self.boxes[idx, 3]
+            
+            if current:
+                overlap = min(y1, line_bottom) - max(y0, line_top)
+                if overlap >= line_overlap * min(heights[idx], max(line_bottom - line_top, 1.0)):
+                    current.append(idx)
+                    line_top = min(line_top, y0)
+                    line_bottom = max(line_bottom, y1)
+                    continue
+                lines.append(current)
+            
+            current = [idx]
+            line_top, line_bottom = y0, y1
+        
+        if current:
+            lines.append(current)
+        
+        # Left-to-right within each line
+        return [np.asarray(sorted(line, key=lambda i: self.boxes[i, 0]), dtype=np.int64) for line in lines]
+    
+    def reading_order(self) -> np.ndarray:
+        """Return word indices sorted in reading order"""
+        return np.lexsort((self.boxes[:, 0], self.line_ids, self.block_ids))
+    
+    def lines(self) -> List[str]:
+        """Reconstruct text lines in reading order"""
+        lines = []
+        current_line = None
+        
+        for idx in self.reading_order():
+            if self.line_ids[idx] != current_line:
+                lines.append([])
+                current_line = self.line_ids[idx]
+            lines[-1].append(self.texts[idx])
+        
+        return [" ".join(words) for words in lines]
+    
+    def paragraphs(self) -> List[str]:
+        """Reconstruct paragraphs (blocks) with one text line per row"""
+        paragraphs = []
+        current_block = None
+        current_line = None
+        
+        for idx in self.reading_order():
+            if self.block_ids[idx] != current_block:
+                paragraphs.append([])
+                current_block = self.block_ids[idx]
+                current_line = None
+            if self.line_ids[idx] != current_line:
+                paragraphs[-1].append([])
+                current_line = self.line_ids[idx]
+            paragraphs[-1][-1].append(self.texts[idx])
+        
+        return ["\n".join(" ".join(words) for words in block) for block in paragraphs]
+    
+    def word_confidences(self) -> List[Tuple[str, float]]:
+        """(text, confidence) pairs in reading order"""
+        return [(self.texts[idx], float(self.confidences[idx])) for idx in self.reading_order()]
+    
+    def to_text(self) -> str:
+        """Full text with lines separated by newlines and paragraphs by blank lines"""
+        return "\n\n".join(self.paragraphs())
+    
+    def translate(self, dx: float, dy: float) -> "OCRLayout":
+        """Shift all boxes in place (e.g. from crop to page coordinates)"""
+        self.boxes[:, [0, 2]] += dx
+        self.boxes[:, [1, 3]] += dy
+        return self
+    
+    def low_confidence(self, threshold: float) -> np.ndarray:
+        """Indices of words whose confidence is below threshold"""
+        return np.flatnonzero(self.confidences < threshold)
+    
+    def mean_confidence(self) -> float:
+        """Average word confidence (0.0 for an empty layout)"""
+        return float(self.confidences.mean()) if len(self) else 0.0
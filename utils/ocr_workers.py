@@ -0,0 +1,294 @@
+"""
+OCR Worker Module
+Process-pool OCR workers with per-worker thread limits and optional core pinning
+"""
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image
+from typing import Dict, List, Optional, Tuple
+import logging
+import multiprocessing
+import os
+
+logger = logging.getLogger(__name__)
+
+# Per-process engine created by the pool initializer
+_worker_engine = None
+
+
+def available_cores() -> List[int]:
+    """CPU cores this process may run on"""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def configure_threads(num_threads: int):
+    """
+    Limit intra-op threading of torch, OpenCV and BLAS in this process
+    
+    Without a limit every EasyOCR reader spawns one thread per core, so
+    several readers on one host oversubscribe the CPU.
+    
+    Args:
+        num_threads: Threads per process (0 leaves library defaults)
+    """
+    if num_threads <= 0:
+        return
+    
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(num_threads)
+    
+    try:
+        import cv2
+        cv2.setNumThreads(num_threads)
+    except ImportError:
+        pass
+    
+    try:
+        import torch
+        torch.set_num_threads(num_threads)
+        try:
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            # Only allowed before torch starts parallel work
+            pass
+    except ImportError:
+        pass
+    
+    logger.info(f"Worker threads limited to {num_threads} (pid {os.getpid()})")
+
+
+def pin_to_cores(cores: List[int]):
+    """
+    Pin the current process to a set of CPU cores (Linux only)
+    
+    Args:
+        cores: Core ids
+    """
+    if not cores or not hasattr(os, "sched_setaffinity"):
+        return
+    
+    os.sched_setaffinity(0, cores)
+    logger.info(f"Pinned pid {os.getpid()} to cores {cores}")
+
+
+def parse_layout(layout: str) -> Tuple[int, int]:
+    """
+    Parse a "workers x threads" layout string such as "4x2"
+    
+    Returns:
+        Tuple of (workers, threads_per_worker)
+    """
+    try:
+        workers, threads = (int(part) for part in layout.lower().split("x"))
+    except ValueError:
+        raise ValueError(f"Invalid worker layout '{layout}', expected e.g. '4x2'")
+    
+    if workers < 1 or threads < 0:
+        raise ValueError(f"Invalid worker layout '{layout}'")
+    
+    return workers, threads
+
+
+def resolve_layout(workers: int, threads_per_worker: int) -> Tuple[int, int]:
+    """Fill in threads_per_worker = 0 as an even split of the available cores"""
+    workers = max(1, workers)
+    if threads_per_worker <= 0:
+        threads_per_worker = max(1, len(available_cores()) // workers)
+    return workers, threads_per_worker
+
+
+def plan_core_sets(workers: int, threads_per_worker: int) -> List[List[int]]:
+    """
+    Split the available cores into one contiguous set per worker
+    
+    Sets wrap around when workers x threads exceeds the core count.
+    
+    Returns:
+        List of core id lists, one per worker
+    """
+    cores = available_cores()
+    return [
+        [cores[(w * threads_per_worker + t) % len(cores)] for t in range(threads_per_worker)]
+        for w in range(workers)
+    ]
+
+
+def _init_worker(core_sets, threads_per_worker: int, pin_cores: bool, engine_type: str, engine_kwargs: dict):
+    """Pool initializer: apply threading/affinity and load the OCR engine once"""
+    global _worker_engine
+    
+    if pin_cores:
+        pin_to_cores(core_sets.get())
+    configure_threads(threads_per_worker)
+    
+    from utils.ocr_engine import OCREngine
+    from utils.region_cache import get_region_cache
+    
+    _worker_engine = OCREngine(engine_type, **_attach_region_cache(engine_kwargs, get_region_cache))
+
+
+def _attach_region_cache(engine_kwargs: dict, get_region_cache) -> dict:
+    """Replace use_region_cache=True with this process's region cache, in nested engine kwargs too"""
+    resolved = {}
+    for name, value in engine_kwargs.items():
+        if name == "use_region_cache":
+            if value:
+                resolved["region_cache"] = get_region_cache()
+        elif isinstance(value, dict):
+            resolved[name] = _attach_region_cache(value, get_region_cache)
+        else:
+            resolved[name] = value
+    return resolved
+
+
+def _worker_recognize(image: Image.Image):
+    """Run OCR on one image in a worker process"""
+    return _worker_engine.recognize_text(image)
+
+
+def _worker_recognize_batch(images: List[Image.Image]) -> list:
+    """Run OCR on a chunk of images in a worker process through the engine's batched path"""
+    return _worker_engine.recognize_batch(images)
+
+
+class OCRWorkerPool:
+    """Pool of OCR worker processes laid out as workers x threads"""
+    
+    def __init__(
+        self,
+        engine_type: str = "easyocr",
+        engine_kwargs: dict = None,
+        workers: int = 1,
+        threads_per_worker: int = 0,
+        pin_cores: bool = False
+    ):
+        """
+        Initialize worker pool
+        
+        Args:
+            engine_type: Registered OCR engine name
+            engine_kwargs: Picklable engine parameters; set use_region_cache=True
+                (also inside nested engine kwargs) to give each worker its
+                process-wide region cache
+            workers: Number of worker processes
+            threads_per_worker: Intra-op threads per worker (0 = even split of cores)
+            pin_cores: Pin each worker to its own core set
+        """
+        self.workers, self.threads_per_worker = resolve_layout(workers, threads_per_worker)
+        self.pin_cores = pin_cores
+        
+        context = multiprocessing.get_context("spawn")
+        core_sets = context.Queue()
+        for cores in plan_core_sets(self.workers, self.threads_per_worker):
+            core_sets.put(cores)
+        
+        logger.info(
+            f"Starting OCR worker pool: {self.workers} workers x {self.threads_per_worker} threads"
+            f"{' (pinned)' if pin_cores else ''}"
+        )
+        
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(core_sets, self.threads_per_worker, pin_cores, engine_type, engine_kwargs or {})
+        )
+    
+    @property
+    def layout(self) -> str:
+        """Layout as a "workers x threads" string"""
+        return f"{self.workers}x{self.threads_per_worker}"
+    
+    def recognize_batch(self, images: List[Image.Image]) -> list:
+        """
+        Recognize images across the pool
+        
+        The images are split into one contiguous chunk per worker, and each
+        worker recognizes its chunk with OCREngine.recognize_batch, so
+        engines that batch across pages keep doing so.
+        
+        Args:
+            images: List of PIL Images
+            
+        Returns:
+            List of OCRResults in input order
+        """
+        if not images:
+            return []
+        
+        chunk_size = -(-len(images) // self.workers)
+        chunks = [images[i:i + chunk_size] for i in range(0, len(images), chunk_size)]
+        return [result for results in self._executor.map(_worker_recognize_batch, chunks) for result in results]
+    
+    def recognize_text(self, image: Image.Image):
+        """Recognize a single image on a pool worker"""
+        return self._executor.submit(_worker_recognize, image).result()
+    
+    def close(self):
+        """Shut down the worker processes"""
+        self._executor.shutdown(wait=True)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
+
+_worker_pools: Dict[str, OCRWorkerPool] = {}
+
+
+def configure_process_threads():
+    """
+    Apply config.OCR_WORKER_CONFIG to the current (in-process) OCR worker
+    
+    Called once at application start-up, before any engine is loaded.
+    """
+    import config
+    
+    worker_config = config.OCR_WORKER_CONFIG
+    workers, threads = resolve_layout(1, worker_config.get("threads_per_worker", 0))
+    
+    if worker_config.get("pin_cores", False):
+        pin_to_cores(plan_core_sets(1, threads)[0])
+    configure_threads(threads)
+
+
+def get_worker_pool(engine_type: str, engine_kwargs: dict, key: str = None) -> Optional[OCRWorkerPool]:
+    """
+    Get the process-wide OCR worker pool for an engine
+    
+    Args:
+        engine_type: Registered OCR engine name
+        engine_kwargs: Picklable engine parameters
+        key: Pool identity when one engine runs with different parameters
+            (e.g. per subject lexicon); defaults to engine_type
+        
+    Returns:
+        OCRWorkerPool, or None when config.OCR_WORKER_CONFIG asks for a single worker
+    """
+    import config
+    
+    worker_config = config.OCR_WORKER_CONFIG
+    if worker_config.get("workers", 1) <= 1:
+        return None
+    
+    key = key or engine_type
+    if key not in _worker_pools:
+        _worker_pools[key] = OCRWorkerPool(
+            engine_type=engine_type,
+            engine_kwargs=engine_kwargs,
+            workers=worker_config["workers"],
+            threads_per_worker=worker_config.get("threads_per_worker", 0),
+            pin_cores=worker_config.get("pin_cores", False)
+        )
+    
+    return _worker_pools[key]
+
+
+def shutdown_worker_pools():
+    """Stop all worker pools (application shutdown)"""
+    for pool in _worker_pools.values():
+        pool.close()
+    _worker_pools.clear()
@@ -0,0 +1,563 @@
+"""
+Output Writers Module
+Streaming writers for extracted text (TXT, DOCX) and layout-preserving formats (JSON, hOCR, PDF text overlay)
+"""
+import html
+import json
+import os
+import re
+import textwrap
+import zipfile
+import zlib
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+
+from utils.fileio import replace_file
+from utils.ocr_layout import OCRLayout
+
+logger = logging.getLogger(__name__)
+
+# Resolution assumed for image uploads when sizing PDF overlay pages
+DEFAULT_IMAGE_DPI = 300
+
+# Characters not allowed in XML 1.0 (python-docx rejects them as well)
+_XML_INVALID = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+
+class OutputPage:
+    """One page of a job's output: final text plus the OCR layout it came from"""
+    
+    __slots__ = ("number", "text", "layout", "size", "size_pt", "confidence")
+    
+    def __init__(
+        self,
+        number: int,
+        text: str,
+        layout: Optional[OCRLayout] = None,
+        size: Optional[Tuple[int, int]] = None,
+        size_pt: Optional[Tuple[float, float]] = None,
+        confidence: float = 1.0
+    ):
+        """
+        Initialize page
+        
+        Args:
+            number: Page (or frame) number
+            text: Postprocessed page text
+            layout: Word layout in page pixel coordinates (None for text-layer pages)
+            size: (width, height) of the page image the layout refers to
+            size_pt: Physical page size in points, if known (PDF pages)
+            confidence: Page OCR confidence
+        """
+        self.number = number
+        self.text = text or ""
+        self.layout = layout
+        # Sizes with unknown (None) dimensions count as unknown
+        self.size = tuple(size) if size and all(size) else None
+        self.size_pt = tuple(size_pt) if size_pt and all(size_pt) else None
+        self.confidence = confidence
+    
+    def pixel_size(self) -> Tuple[int, int]:
+        """Image size, or the extent of the words if the size is unknown"""
+        if self.size:
+            return int(self.size[0]), int(self.size[1])
+        if self.layout is not None and len(self.layout):
+            return int(self.layout.boxes[:, 2].max()) + 1, int(self.layout.boxes[:, 3].max()) + 1
+        return 0, 0
+    
+    def words(self) -> List[Tuple[str, List[int], float, int, int]]:
+        """(text, [x0, y0, x1, y1], confidence, line id, block id) in reading order"""
+        if self.layout is None:
+            return []
+        
+        layout = self.layout
+        return [
+            (
+                layout.texts[idx],
+                [int(round(float(value))) for value in layout.boxes[idx]],
+                float(layout.confidences[idx]),
+                int(layout.line_ids[idx]),
+                int(layout.block_ids[idx])
+            )
+            for idx in layout.reading_order()
+        ]
+
+
+# Writer registry: format name -> writer class
+OUTPUT_WRITERS: Dict[str, type] = {}
+
+
+def register_writer(name: str):
+    """
+    Class decorator that registers an output writer under a format name
+    
+    Args:
+        name: Format name used in config.OUTPUT_FORMATS and /download
+    """
+    def decorator(writer_class):
+        OUTPUT_WRITERS[name] = writer_class
+        writer_class.format = name
+        return writer_class
+    return decorator
+
+
+class OutputWriter:
+    """
+    Base class for streaming writers
+    
+    Pages are written one at a time to a temporary file that replaces the
+    final file on finish(), so memory stays bounded by one page and an
+    interrupted run never leaves a truncated output behind.
+    """
+    
+    extension = ""
+    binary = False
+    
+    def __init__(self, output_base: str):
+        """
+        Initialize writer
+        
+        Args:
+            output_base: Output path without extension
+        """
+        self.path = f"{output_base}.{self.extension}"
+        self.tmp_path = f"{self.path}.tmp"
+        self.pages_written = 0
+        self._file = None
+    
+    def begin(self):
+        """Open the temporary file and write any header"""
+        if self.binary:
+            self._file = open(self.tmp_path, "wb")
+        else:
+            self._file = open(self.tmp_path, "w", encoding="utf-8")
+    
+    def write_page(self, page: OutputPage):
+        """Append one page"""
+        raise NotImplementedError
+    
+    def finish(self):
+        """Write any trailer and move the file into place"""
+        self._file.close()
+        replace_file(self.tmp_path, self.path)
+    
+    def abort(self):
+        """Discard the partial output"""
+        try:
+            if self._file is not None:
+                self._file.close()
+        finally:
+            if os.path.exists(self.tmp_path):
+                os.remove(self.tmp_path)
+
+
+@register_writer("txt")
+class TextWriter(OutputWriter):
+    """Plain text, non-empty pages separated by a blank line"""
+    
+    extension = "txt"
+    
+    def write_page(self, page: OutputPage):
+        if not page.text.strip():
+            return
+        
+        if self.pages_written:
+            self._file.write("\n\n")
+        self._file.write(page.text)
+        self.pages_written += 1
+
+
+@register_writer("docx")
+class DocxWriter(OutputWriter):
+    """
+    Word document streamed straight into the ZIP container
+    
+    Blank-line separated blocks become paragraphs (line breaks and tabs
+    inside a block are kept) and each page after the first starts on a new
+    page. The document part is written incrementally, so unlike
+    python-docx the whole document is never held in memory.
+    """
+    
+    extension = "docx"
+    
+    CONTENT_TYPES = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/word/document.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+        '</Types>'
+    )
+    RELATIONSHIPS = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="word/document.xml"/>'
+        '</Relationships>'
+    )
+    DOCUMENT_START = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>'
+    )
+    DOCUMENT_END = '<w:sectPr/></w:body></w:document>'
+    PAGE_BREAK = '<w:p><w:r><w:br w:type="page"/></w:r></w:p>'
+    
+    def begin(self):
+        self._zip = zipfile.ZipFile(self.tmp_path, "w", zipfile.ZIP_DEFLATED)
+        self._zip.writestr("[Content_Types].xml", self.CONTENT_TYPES)
+        self._zip.writestr("_rels/.rels", self.RELATIONSHIPS)
+        self._file = self._zip.open("word/document.xml", "w", force_zip64=True)
+        self._file.write(self.DOCUMENT_START.encode("utf-8"))
+    
+    @staticmethod
+    def _run(text: str) -> str:
+        """A run with line breaks and tabs as Word elements"""
+        parts = []
+        for i, line in enumerate(text.split("\n")):
+            if i:
+                parts.append("<w:br/>")
+            for j, chunk in enumerate(line.split("\t")):
+                if j:
+                    parts.append("<w:tab/>")
+                if chunk:
+                    parts.append(f'<w:t xml:space="preserve">{html.escape(chunk, quote=False)}</w:t>')
+        return f"<w:r>{''.join(parts)}</w:r>"
+    
+    def write_page(self, page: OutputPage):
+        paragraphs = [block.strip() for block in page.text.split("\n\n") if block.strip()]
+        if not paragraphs:
+            return
+        
+        xml = [self.PAGE_BREAK] if self.pages_written else []
+        for paragraph in paragraphs:
+            xml.append(f"<w:p>{self._run(_XML_INVALID.sub('', paragraph))}</w:p>")
+        
+        self._file.write("".join(xml).encode("utf-8"))
+        self.pages_written += 1
+    
+    def finish(self):
+        self._file.write(self.DOCUMENT_END.encode("utf-8"))
+        self._file.close()
+        self._zip.close()
+        replace_file(self.tmp_path, self.path)
+    
+    def abort(self):
+        try:
+            if self._file is not None:
+                self._file.close()
+            self._zip.close()
+        except Exception:
+            pass
+        finally:
+            if os.path.exists(self.tmp_path):
+                os.remove(self.tmp_path)
+
+
+@register_writer("json")
+class JSONWriter(OutputWriter):
+    """Pages with text, size and word boxes/confidences, streamed as one JSON document"""
+    
+    extension = "json"
+    
+    def begin(self):
+        super().begin()
+        self._file.write('{"pages": [')
+    
+    def write_page(self, page: OutputPage):
+        width, height = page.pixel_size()
+        record = {
+            "page": page.number,
+            "text": page.text,
+            "confidence": float(page.confidence),
+            "width": width,
+            "height": height,
+            "words": [
+                {"text": text, "box": box, "confidence": round(confidence, 4), "line": line, "block": block}
+                for text, box, confidence, line, block in page.words()
+            ]
+        }
+        
+        if self.pages_written:
+            self._file.write(",\n")
+        self._file.write(json.dumps(record, ensure_ascii=False))
+        self.pages_written += 1
+    
+    def finish(self):
+        self._file.write("]}\n")
+        super().finish()
+
+
+@register_writer("hocr")
+class HOCRWriter(OutputWriter):
+    """hOCR (XHTML with ocr_page / ocr_carea / ocr_line / ocrx_word elements and bboxes)"""
+    
+    extension = "hocr"
+    
+    HEADER = (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<!DOCTYPE html PUBLIC "-//W3C//DTD XHTML 1.0 Transitional//EN" '
+        '"http://www.w3.org/TR/xhtml1/DTD/xhtml1-transitional.dtd">\n'
+        '<html xmlns="http://www.w3.org/1999/xhtml" xml:lang="en" lang="en">\n<head>\n'
+        '<title></title>\n'
+        '<meta http-equiv="Content-Type" content="text/html;charset=utf-8"/>\n'
+        '<meta name="ocr-system" content="smart-text-extractor"/>\n'
+        '<meta name="ocr-capabilities" content="ocr_page ocr_carea ocr_par ocr_line ocrx_word"/>\n'
+        '</head>\n<body>\n'
+    )
+    
+    @staticmethod
+    def _bbox(boxes: List[List[int]]) -> str:
+        """Union bbox of word boxes as an hOCR title property"""
+        return (
+            f"bbox {min(b[0] for b in boxes)} {min(b[1] for b in boxes)} "
+            f"{max(b[2] for b in boxes)} {max(b[3] for b in boxes)}"
+        )
+    
+    def begin(self):
+        super().begin()
+        self._file.write(self.HEADER)
+    
+    def write_page(self, page: OutputPage):
+        n = page.number
+        width, height = page.pixel_size()
+        out = [f'<div class="ocr_page" id="page_{n}" title="bbox 0 0 {width} {height}; ppageno {n - 1}">\n']
+        
+        words = page.words()
+        if words:
+            # Group words into blocks and lines (already in reading order)
+            blocks = []
+            for word in words:
+                if not blocks or blocks[-1][0] != word[4]:
+                    blocks.append((word[4], []))
+                lines = blocks[-1][1]
+                if not lines or lines[-1][0] != word[3]:
+                    lines.append((word[3], []))
+                lines[-1][1].append(word)
+            
+            for block_id, lines in blocks:
+                block_boxes = [word[1] for _, line in lines for word in line]
+                out.append(f' <div class="ocr_carea" id="block_{n}_{block_id}" title="{self._bbox(block_boxes)}">\n')
+                out.append(f'  <p class="ocr_par" id="par_{n}_{block_id}" title="{self._bbox(block_boxes)}">\n')
+                
+                for line_id, line in lines:
+                    line_boxes = [word[1] for word in line]
+                    out.append(f'   <span class="ocr_line" id="line_{n}_{line_id}" title="{self._bbox(line_boxes)}">')
+                    
+                    for index, (text, box, confidence, _, _) in enumerate(line):
+                        out.append(
+                            f'<span class="ocrx_word" id="word_{n}_{line_id}_{index}" '
+                            f'title="bbox {box[0]} {box[1]} {box[2]} {box[3]}; x_wconf {int(round(confidence * 100))}">'
+                            f'{html.escape(_XML_INVALID.sub("", text), quote=False)}</span> '
+                        )
+                    out.append('</span>\n')
+                
+                out.append('  </p>\n </div>\n')
+                
+        elif page.text.strip():
+            # Text-layer page: no boxes, keep the text as untagged lines
+            for paragraph in page.text.split("\n\n"):
+                if paragraph.strip():
+                    lines = "<br/>".join(html.escape(_XML_INVALID.sub("", line), quote=False) for line in paragraph.split("\n"))
+                    out.append(f' <p class="ocr_par">{lines}</p>\n')
+        
+        out.append('</div>\n')
+        self._file.write("".join(out))
+        self.pages_written += 1
+    
+    def finish(self):
+        self._file.write('</body>\n</html>\n')
+        super().finish()
+
+
+@register_writer("pdf")
+class PDFOverlayWriter(OutputWriter):
+    """
+    Searchable-PDF text overlay: one page per input page holding only
+    invisible text (render mode 3) at the word boxes
+    
+    Overlaid on (or merged under) the scanned pages it makes them
+    searchable and selectable; the page images themselves are not
+    embedded. Pages without word boxes (PDF text-layer pages) get their
+    text as visible, wrapped lines instead, so they are not blank. Page
+    sizes follow the source PDF pages, or the image size at
+    DEFAULT_IMAGE_DPI for image uploads. Objects are written as pages
+    arrive; only byte offsets are kept for the xref table.
+    """
+    
+    extension = "pdf"
+    binary = True
+    
+    # Object 1: catalog, 2: page tree (written last), 3: font
+    CATALOG, PAGES, FONT = 1, 2, 3
+    
+    # Average Helvetica advance width in text space units per font size
+    AVERAGE_CHAR_WIDTH = 0.5
+    
+    # Visible text of pages without word boxes
+    TEXT_FONT_SIZE = 11
+    TEXT_LEADING = 14
+    TEXT_MARGIN = 54
+    
+    def begin(self):
+        super().begin()
+        self._offsets = {}
+        self._page_ids = []
+        self._next_id = 4
+        self._position = 0
+        
+        self._emit(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self._object(self.CATALOG, b"<< /Type /Catalog /Pages 2 0 R >>")
+        self._object(self.FONT, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+    
+    def _emit(self, data: bytes):
+        self._file.write(data)
+        self._position += len(data)
+    
+    def _object(self, object_id: int, body: bytes, stream: bytes = None):
+        """Write one indirect object, recording its offset"""
+        self._offsets[object_id] = self._position
+        self._emit(f"{object_id} 0 obj\n".encode("ascii"))
+        self._emit(body)
+        if stream is not None:
+            self._emit(b"\nstream\n")
+            self._emit(stream)
+            self._emit(b"\nendstream")
+        self._emit(b"\nendobj\n")
+    
+    @staticmethod
+    def _pdf_string(text: str) -> bytes:
+        """Literal PDF string in WinAnsi encoding (unsupported characters become '?')"""
+        data = text.encode("cp1252", errors="replace")
+        return b"(" + data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+    
+    def write_page(self, page: OutputPage):
+        width_px, height_px = page.pixel_size()
+        
+        if page.size_pt:
+            width_pt, height_pt = page.size_pt
+        elif width_px and height_px:
+            width_pt, height_pt = width_px * 72 / DEFAULT_IMAGE_DPI, height_px * 72 / DEFAULT_IMAGE_DPI
+        else:
+            width_pt, height_pt = 612, 792
+        
+        scale_x = width_pt / width_px if width_px else 1.0
+        scale_y = height_pt / height_px if height_px else 1.0
+        
+        words = page.words()
+        if not words and page.text.strip():
+            content = self._visible_text(page.text, width_pt, height_pt)
+        else:
+            content = self._invisible_words(words, height_pt, scale_x, scale_y)
+        
+        stream = zlib.compress(b"".join(content))
+        content_id, page_id = self._next_id, self._next_id + 1
+        self._next_id += 2
+        
+        self._object(content_id, f"<< /Length {len(stream)} /Filter /FlateDecode >>".encode("ascii"), stream)
+        self._object(page_id, (
+            f"<< /Type /Page /Parent {self.PAGES} 0 R /MediaBox [0 0 {width_pt:.2f} {height_pt:.2f}] "
+            f"/Resources << /Font << /F1 {self.FONT} 0 R >> >> /Contents {content_id} 0 R >>"
+        ).encode("ascii"))
+        
+        self._page_ids.append(page_id)
+        self.pages_written += 1
+    
+    def _invisible_words(self, words: list, height_pt: float, scale_x: float, scale_y: float) -> List[bytes]:
+        """Content stream parts placing each word, invisibly, over its box"""
+        content = [b"BT\n3 Tr\n"]
+        for text, (x0, y0, x1, y1), _, _, _ in words:
+            if not text.strip():
+                continue
+            
+            font_size = max((y1 - y0) * scale_y, 1.0)
+            box_width = max((x1 - x0) * scale_x, 1.0)
+            stretch = 100 * box_width / (font_size * self.AVERAGE_CHAR_WIDTH * len(text))
+            
+            content.append(
+                f"/F1 {font_size:.2f} Tf {stretch:.1f} Tz "
+                f"1 0 0 1 {x0 * scale_x:.2f} {height_pt - y1 * scale_y:.2f} Tm ".encode("ascii")
+            )
+            content.append(self._pdf_string(text) + b" Tj\n")
+        content.append(b"ET")
+        return content
+    
+    def _visible_text(self, text: str, width_pt: float, height_pt: float) -> List[bytes]:
+        """Content stream parts drawing text as visible lines wrapped to the page width"""
+        margin = min(self.TEXT_MARGIN, width_pt / 10, height_pt / 10)
+        line_chars = max(int((width_pt - 2 * margin) / (self.TEXT_FONT_SIZE * self.AVERAGE_CHAR_WIDTH)), 1)
+        
+        content = [
+            f"BT\n/F1 {self.TEXT_FONT_SIZE} Tf {self.TEXT_LEADING} TL "
+            f"{margin:.2f} {height_pt - margin - self.TEXT_FONT_SIZE:.2f} Td\n".encode("ascii")
+        ]
+        for line in text.split("\n"):
+            for wrapped in textwrap.wrap(line, line_chars) or [""]:
+                content.append(self._pdf_string(wrapped) + b" Tj T*\n")
+        content.append(b"ET")
+        return content
+    
+    def finish(self):
+        kids = " ".join(f"{page_id} 0 R" for page_id in self._page_ids)
+        self._object(self.PAGES, f"<< /Type /Pages /Kids [{kids}] /Count {len(self._page_ids)} >>".encode("ascii"))
+        
+        xref_position = self._position
+        lines = [f"xref\n0 {self._next_id}\n", "0000000000 65535 f \n"]
+        for object_id in range(1, self._next_id):
+            lines.append(f"{self._offsets[object_id]:010d} 00000 n \n")
+        lines.append(f"trailer\n<< /Size {self._next_id} /Root {self.CATALOG} 0 R >>\nstartxref\n{xref_position}\n%%EOF\n")
+        self._emit("".join(lines).encode("ascii"))
+        
+        super().finish()
+
+
+def write_outputs(pages: Iterable[OutputPage], output_base: str, formats: List[str]) -> Dict[str, str]:
+    """
+    Write every requested format in a single pass over the pages
+    
+    A writer that fails is dropped (its partial file removed) and the
+    others carry on.
+    
+    Args:
+        pages: Pages in order (may be a generator)
+        output_base: Output path without extension
+        formats: Registered format names
+        
+    Returns:
+        Dictionary of format -> file path for the outputs written
+    """
+    writers = []
+    for name in formats:
+        if name not in OUTPUT_WRITERS:
+            raise ValueError(f"Unsupported format: {name}")
+        writers.append(OUTPUT_WRITERS[name](output_base))
+    
+    def drop(writer: OutputWriter, error: Exception):
+        logger.warning(f"Could not create {writer.format.upper()} output: {str(error)}")
+        writer.abort()
+        writers.remove(writer)
+    
+    for writer in list(writers):
+        try:
+            writer.begin()
+        except Exception as e:
+            drop(writer, e)
+    
+    for page in pages:
+        for writer in list(writers):
+            try:
+                writer.write_page(page)
+            except Exception as e:
+                drop(writer, e)
+    
+    for writer in list(writers):
+        try:
+            writer.finish()
+        except Exception as e:
+            drop(writer, e)
+    
+    for writer in writers:
+        logger.info(f"Saved {writer.format.upper()} output to {writer.path}")
+    
+    return {writer.format: writer.path for writer in writers}
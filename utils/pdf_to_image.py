@@ -2,28 +2,111 @@
 PDF to Image Converter
 Converts PDF pages to high-resolution images for OCR processing
 """
-from pdf2image import convert_from_path
 from PIL import Image
 import os
-from typing import List
+import queue
+import threading
+from typing import Iterable, Iterator, List, Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+class PDFPage:
+    """
+    One PDF page, either as an image to OCR or as text from the text layer
+    
+    metadata["source"] records how the page was obtained: 'text_layer',
+    'embedded_image' (the page's single scan at native resolution) or
+    'rendered'.
+    """
+    
+    __slots__ = ("number", "image", "text", "metadata")
+    
+    def __init__(
+        self,
+        number: int,
+        image: Optional[Image.Image],
+        metadata: dict = None,
+        text: Optional[str] = None
+    ):
+        self.number = number  # 1-based page number
+        self.image = image
+        self.text = text      # Text layer content (image is None then)
+        self.metadata = metadata or {}
+    
+    def release(self):
+        """Drop the page image so its memory can be reclaimed"""
+        if self.image is not None:
+            self.image.close()
+        self.image = None
+
+
+def parse_page_range(spec: str, page_count: int) -> List[int]:
+    """
+    Parse a page selection such as "1-3,7,10-" into 1-based page numbers
+    
+    Args:
+        spec: Comma-separated pages and ranges (empty selects all pages)
+        page_count: Number of pages in the document
+        
+    Returns:
+        Sorted list of unique page numbers within the document
+    """
+    if not spec or not spec.strip():
+        return list(range(1, page_count + 1))
+    
+    pages = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        
+        if "-" in part:
+            start, end = part.split("-", 1)
+            start = int(start) if start.strip() else 1
+            end = int(end) if end.strip() else page_count
+        else:
+            start = end = int(part)
+        
+        if start < 1 or end < start:
+            raise ValueError(f"Invalid page range: {part}")
+        
+        pages.update(range(start, min(end, page_count) + 1))
+    
+    return sorted(pages)
+
+
 class PDFToImageConverter:
     """Converts PDF files to high-resolution images"""
     
-    def __init__(self, dpi: int = 300, image_format: str = "PNG"):
+    def __init__(
+        self,
+        dpi: int = 300,
+        image_format: str = "PNG",
+        use_text_layer: bool = False,
+        extract_images: bool = False,
+        min_text_chars: int = 20,
+        min_text_density: float = 4.0
+    ):
         """
         Initialize the PDF to Image converter
         
         Args:
             dpi: Resolution in dots per inch (default: 300 for high quality)
             image_format: Output image format (PNG, JPEG, etc.)
+            use_text_layer: iter_pages returns a usable text layer instead of an image
+            extract_images: iter_pages extracts a page's single embedded scan instead of rendering
+            min_text_chars: Fewest word characters for a text layer to count as usable
+            min_text_density: Fewest word characters per square inch of page for a
+                text layer to count as covering the page (a header alone does not)
         """
         self.dpi = dpi
         self.image_format = image_format
+        self.use_text_layer = use_text_layer
+        self.extract_images = extract_images
+        self.min_text_chars = min_text_chars
+        self.min_text_density = min_text_density
         
     def convert(self, pdf_path: str, output_folder: str = None) -> List[Image.Image]:
         """
@@ -37,6 +120,8 @@ class PDFToImageConverter:
             List of PIL Image objects
         """
         try:
+            from pdf2image import convert_from_path
+            
             logger.info(f"Converting PDF to images with {self.dpi} DPI: {pdf_path}")
             
             # Convert PDF to images
@@ -70,9 +155,201 @@ class PDFToImageConverter:
             logger.error(f"Error converting PDF to images: {str(e)}")
             raise Exception(f"Failed to convert PDF: {str(e)}")
     
+    def render_page(self, pdf_path: str, page_number: int) -> Image.Image:
+        """
+        Render a single page
+        
+        Args:
+            pdf_path: Path to the PDF file
+            page_number: 1-based page number
+            
+        Returns:
+            PIL Image of the page
+        """
+        from pdf2image import convert_from_path
+        
+        images = convert_from_path(
+            pdf_path,
+            dpi=self.dpi,
+            fmt=self.image_format.lower(),
+            first_page=page_number,
+            last_page=page_number
+        )
+        if not images:
+            raise Exception(f"Page {page_number} could not be rendered")
+        
+        return images[0]
+    
+    def iter_pages(
+        self,
+        pdf_path: str,
+        pages: Iterable[int] = None,
+        prefetch: int = 1
+    ) -> Iterator[PDFPage]:
+        """
+        Load pages one at a time, in order
+        
+        A background thread loads up to `prefetch` pages ahead, so page
+        N+1 is rasterized while the caller OCRs page N. At most
+        prefetch + 1 page images exist at any time; call page.release()
+        when done with a page.
+        
+        Args:
+            pdf_path: Path to the PDF file
+            pages: 1-based page numbers to load (default: all pages)
+            prefetch: Pages loaded ahead of the consumer (0 loads on demand)
+            
+        Yields:
+            PDFPage objects
+        """
+        page_numbers = list(pages) if pages is not None else list(range(1, self.get_page_count(pdf_path) + 1))
+        logger.info(f"Streaming {len(page_numbers)} PDF pages at {self.dpi} DPI: {pdf_path}")
+        
+        if prefetch <= 0:
+            reader = self._shortcut_reader(pdf_path)
+            for number in page_numbers:
+                yield self._load_page(pdf_path, reader, number)
+            return
+        
+        rendered = queue.Queue(maxsize=prefetch)
+        stop = threading.Event()
+        
+        def render_ahead():
+            # The reader is only touched from this thread
+            reader = self._shortcut_reader(pdf_path)
+            
+            for number in page_numbers:
+                if stop.is_set():
+                    return
+                try:
+                    item = self._load_page(pdf_path, reader, number)
+                except Exception as e:
+                    item = e
+                
+                # Wait for room in the queue, giving up if the consumer has gone
+                while not stop.is_set():
+                    try:
+                        rendered.put(item, timeout=0.5)
+                        break
+                    except queue.Full:
+                        continue
+                
+                if isinstance(item, Exception):
+                    return
+        
+        worker = threading.Thread(target=render_ahead, name="pdf-render", daemon=True)
+        worker.start()
+        
+        try:
+            for _ in page_numbers:
+                item = rendered.get()
+                if isinstance(item, Exception):
+                    raise Exception(f"Failed to render PDF page: {str(item)}")
+                yield item
+        finally:
+            stop.set()
+            # Free any page rendered ahead that will not be consumed
+            while not rendered.empty():
+                item = rendered.get_nowait()
+                if isinstance(item, PDFPage):
+                    item.release()
+    
+    def _shortcut_reader(self, pdf_path: str):
+        """Open the PDF structure for the text/image shortcuts (None if disabled or unreadable)"""
+        if not (self.use_text_layer or self.extract_images):
+            return None
+        
+        try:
+            return _open_pdf(pdf_path)
+        except Exception as e:
+            logger.warning(f"PDF structure unreadable, rendering all pages: {str(e)}")
+            return None
+    
+    def _load_page(self, pdf_path: str, reader, number: int) -> PDFPage:
+        """Take the cheapest usable path for one page: text layer, embedded scan, or rendering"""
+        if reader is not None:
+            page = reader.pages[number - 1]
+            
+            # A scanned page's text layer (a printed header, a stamp, the
+            # scanner's own OCR) never covers its handwriting, so scans are OCR'd
+            if self.use_text_layer and not self._has_full_page_image(page):
+                text = self._usable_text(page)
+                if text is not None:
+                    return PDFPage(number, None, {"source": "text_layer"}, text=text)
+            
+            if self.extract_images:
+                image = self._single_page_image(page)
+                if image is not None:
+                    return PDFPage(number, image, {"source": "embedded_image", "size": list(image.size)})
+        
+        image = self.render_page(pdf_path, number)
+        return PDFPage(number, image, {"source": "rendered", "size": list(image.size)})
+    
+    def _usable_text(self, page) -> Optional[str]:
+        """Text layer of a page, or None if it is missing, too sparse for the page or looks like garbage"""
+        try:
+            text = page.extract_text() or ""
+        except Exception as e:
+            logger.debug(f"Text layer extraction failed: {str(e)}")
+            return None
+        
+        # Broken font encodings produce replacement characters and symbol soup
+        word_chars = sum(1 for char in text if char.isalnum())
+        visible = sum(1 for char in text if not char.isspace())
+        
+        if word_chars < self.min_text_chars or "\ufffd" in text:
+            return None
+        
+        # A few lines on an otherwise empty page: the rest may be drawn, not typed
+        area_sq_in = float(page.mediabox.width) * float(page.mediabox.height) / (72.0 * 72.0)
+        if word_chars < self.min_text_density * area_sq_in:
+            return None
+        if word_chars / max(visible, 1) < 0.6:
+            return None
+        
+        return text.strip()
+    
+    @staticmethod
+    def _is_full_page(page, size: tuple) -> bool:
+        """Whether an image of this pixel size has the page's aspect ratio (so it is drawn full-page)"""
+        width_px, height_px = size
+        width_pt, height_pt = float(page.mediabox.width), float(page.mediabox.height)
+        
+        if not width_px or not height_px or not width_pt or not height_pt:
+            return False
+        page_aspect = width_pt / height_pt
+        return abs(width_px / height_px - page_aspect) <= 0.05 * page_aspect
+    
+    def _has_full_page_image(self, page) -> bool:
+        """Whether the page draws a full-page image, i.e. is a scan"""
+        return any(self._is_full_page(page, size) for size in _page_images(page))
+    
+    def _single_page_image(self, page) -> Optional[Image.Image]:
+        """The page's only embedded image at native resolution, if it looks like a full-page scan"""
+        sizes = _page_images(page)
+        if len(sizes) != 1 or not self._is_full_page(page, sizes[0]):
+            return None
+        
+        rotation = int(page.get("/Rotate", 0) or 0) % 360
+        
+        try:
+            image = page.images[0].image
+        except Exception as e:
+            logger.debug(f"Embedded image extraction failed, rendering instead: {str(e)}")
+            return None
+        
+        if image.mode not in ("L", "RGB"):
+            image = image.convert("RGB")
+        
+        # Apply the page rotation the renderer would have applied
+        if rotation:
+            image = image.rotate(-rotation, expand=True)
+        
+        return image
+    
     def get_page_count(self, pdf_path: str) -> int:
         """
-        Get the number of pages in a PDF
+        Get the number of pages in a PDF without rendering it
         
         Args:
             pdf_path: Path to the PDF file
@@ -81,13 +358,96 @@ class PDFToImageConverter:
             Number of pages
         """
         try:
-            from PyPDF2 import PdfReader
-            reader = PdfReader(pdf_path)
-            return len(reader.pages)
-        except:
-            # Fallback: convert and count
-            images = self.convert(pdf_path)
-            return len(images)
+            return len(_open_pdf(pdf_path).pages)
+        except Exception as e:
+            logger.debug(f"PDF structure unreadable, asking pdfinfo: {str(e)}")
+            return _pdfinfo_page_count(pdf_path)
+    
+    def get_page_info(self, pdf_path: str) -> List[dict]:
+        """
+        Read per-page metadata from the PDF structure (nothing is rendered)
+        
+        Args:
+            pdf_path: Path to the PDF file
+            
+        Returns:
+            List of dicts (page, width_pt, height_pt, rotation, images,
+            image_dpi, render_pixels) in page order
+        """
+        try:
+            reader = _open_pdf(pdf_path)
+        except Exception as e:
+            # Malformed structure: pdfinfo still knows the page count
+            logger.warning(f"PDF structure unreadable, page details unavailable: {str(e)}")
+            return [
+                {"page": number, "width_pt": None, "height_pt": None, "rotation": 0,
+                 "images": None, "image_dpi": None, "render_pixels": None}
+                for number in range(1, _pdfinfo_page_count(pdf_path) + 1)
+            ]
+        
+        info = []
+        for number, page in enumerate(reader.pages, start=1):
+            width_pt = float(page.mediabox.width)
+            height_pt = float(page.mediabox.height)
+            images = _page_images(page)
+            
+            # A full-page scan spans the page, so its pixel width over the
+            # page width in inches is the scan resolution
+            image_dpi = None
+            if images:
+                width_px, height_px = max(images, key=lambda size: size[0] * size[1])
+                image_dpi = round(width_px / (width_pt / 72.0)) if width_pt else None
+            
+            info.append({
+                "page": number,
+                "width_pt": width_pt,
+                "height_pt": height_pt,
+                "rotation": int(page.get("/Rotate", 0) or 0) % 360,
+                "images": len(images),
+                "image_dpi": image_dpi,
+                "render_pixels": int(width_pt / 72.0 * self.dpi) * int(height_pt / 72.0 * self.dpi)
+            })
+        
+        return info
+
+
+def _open_pdf(pdf_path: str):
+    """Open a PDF with pypdf (or the older PyPDF2 package)"""
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        from PyPDF2 import PdfReader
+    
+    return PdfReader(pdf_path, strict=False)
+
+
+def _pdfinfo_page_count(pdf_path: str) -> int:
+    """Page count from Poppler's pdfinfo (copes with damaged cross-reference tables)"""
+    from pdf2image import pdfinfo_from_path
+    
+    return int(pdfinfo_from_path(pdf_path)["Pages"])
+
+
+def _page_images(page) -> List[tuple]:
+    """(width, height) in pixels of the image XObjects drawn on a page"""
+    try:
+        resources = page.get("/Resources")
+        if resources is None:
+            return []
+        xobjects = resources.get_object().get("/XObject")
+        if xobjects is None:
+            return []
+        
+        images = []
+        for ref in xobjects.get_object().values():
+            xobject = ref.get_object()
+            if xobject.get("/Subtype") == "/Image":
+                images.append((int(xobject.get("/Width", 0)), int(xobject.get("/Height", 0))))
+        return images
+        
+    except Exception as e:
+        logger.debug(f"Could not list page images: {str(e)}")
+        return []
 
 
 def convert_pdf_to_images(
@@ -2,22 +2,105 @@
 Text Postprocessing Module
 Cleans and corrects extracted text
 """
-import re
-from typing import List
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional, Tuple
 import logging
+import multiprocessing
+import threading
+
+from utils.cache import LRUCache, PersistentLRUCache
+from utils.lexicon import Lexicon
+from utils.normalize import get_normalizer
+from utils.spell_index import WORD_PATTERN, match_case
 
 logger = logging.getLogger(__name__)
 
 
+def align_word_confidences(
+    words: List[str],
+    word_confidences: List[Tuple[str, float]],
+    window: int = 5
+) -> List[float]:
+    """
+    Attach OCR confidences to the words of a cleaned text
+    
+    Cleanup can drop or alter a few words, so each word is matched against
+    the next few OCR words only; words that cannot be matched get a
+    confidence of 0.0 and are treated as uncertain.
+    
+    Args:
+        words: Words of the cleaned text, in order
+        word_confidences: (word, confidence) pairs from OCR, in reading order
+        window: OCR words to look ahead for a match
+        
+    Returns:
+        Confidence per word
+    """
+    ocr_words = []
+    for fragment, conf in word_confidences:
+        for word in WORD_PATTERN.findall(fragment):
+            ocr_words.append((word.lower(), float(conf)))
+    
+    confidences = []
+    position = 0
+    for word in words:
+        word = word.lower()
+        for offset in range(position, min(position + window, len(ocr_words))):
+            if ocr_words[offset][0] == word:
+                confidences.append(ocr_words[offset][1])
+                position = offset + 1
+                break
+        else:
+            confidences.append(0.0)
+    
+    return confidences
+
+
+_correction_cache: Optional[PersistentLRUCache] = None
+
+
+def get_correction_cache() -> Optional[PersistentLRUCache]:
+    """
+    Get the process-wide memo of word corrections
+    
+    Returns:
+        PersistentLRUCache, or None if disabled in config.CORRECTION_CACHE_CONFIG
+    """
+    global _correction_cache
+    
+    import config
+    
+    cache_config = getattr(config, "CORRECTION_CACHE_CONFIG", {})
+    if not cache_config.get("enabled", False):
+        return None
+    
+    if _correction_cache is None:
+        _correction_cache = PersistentLRUCache(
+            max_entries=cache_config.get("max_entries", 100000),
+            db_path=cache_config.get("db_path") or None,
+            table="corrections"
+        )
+    
+    return _correction_cache
+
+
 class TextPostprocessor:
     """Postprocesses OCR output text"""
     
-    def __init__(self, config: dict = None):
+    def __init__(
+        self,
+        config: dict = None,
+        correction_cache: Optional[PersistentLRUCache] = None,
+        lexicon: Optional[Lexicon] = None
+    ):
         """
         Initialize postprocessor
         
         Args:
             config: Postprocessing configuration
+            correction_cache: Optional shared memo of word -> correction
+            lexicon: Optional subject vocabulary preferred over general corrections
         """
         self.config = config or {
             "remove_extra_spaces": True,
@@ -25,12 +108,35 @@ class TextPostprocessor:
             "min_confidence": 0.5,
         }
         
+        self.normalizer = get_normalizer(self.config)
+        self.correction_cache = correction_cache
+        self.lexicon = lexicon
+        self._pending_corrections = {}
+        
+        # Counters of the last process() call
+        self.stats = {"tokens": 0, "examined": 0, "changed": 0, "memo_hits": 0}
+        
         # Initialize spell checker if needed
         if self.config.get("spell_check", False):
             self._init_spell_checker()
     
     def _init_spell_checker(self):
-        """Initialize spell checker"""
+        """Initialize spell checker ('symspell' index or TextBlob)"""
+        self.spell_engine = self.config.get("spell_engine", "textblob")
+        
+        if self.spell_engine == "symspell":
+            try:
+                from utils.spell_index import get_spell_index
+                self.spell_checker = get_spell_index(
+                    self.config.get("spell_dictionary", "static/models/spelling_en.txt"),
+                    self.config.get("spell_max_edit_distance", 2)
+                )
+                logger.info("Spell checker initialized (symspell)")
+                return
+            except Exception as e:
+                logger.warning(f"Spell index unavailable, falling back to TextBlob: {str(e)}")
+                self.spell_engine = "textblob"
+        
         try:
             from textblob import TextBlob
             self.spell_checker = TextBlob
@@ -39,17 +145,25 @@ class TextPostprocessor:
             logger.warning("TextBlob not available, spell checking disabled")
             self.spell_checker = None
     
-    def process(self, text: str, confidence: float = 1.0) -> str:
+    def process(self, text: str, confidence: float = 1.0, word_confidences: List[Tuple[str, float]] = None) -> str:
         """
         Process and clean text
         
+        Counts of the last call (tokens, examined, changed) are kept in
+        self.stats.
+        
         Args:
             text: Raw OCR text
             confidence: OCR confidence score
+            word_confidences: Optional (word, confidence) pairs in reading order
+                (OCRLayout.word_confidences()); only words below
+                spell_confidence_threshold are then spell-corrected
             
         Returns:
             Cleaned text
         """
+        self.stats = {"tokens": 0, "examined": 0, "changed": 0, "memo_hits": 0}
+        
         if not text:
             return ""
         
@@ -60,59 +174,23 @@ class TextPostprocessor:
         if confidence < min_confidence:
             logger.warning(f"Low confidence ({confidence:.2f}), results may be unreliable")
         
-        # Clean text
-        cleaned_text = text
-        
-        # Remove extra spaces
-        if self.config.get("remove_extra_spaces", True):
-            cleaned_text = self._remove_extra_spaces(cleaned_text)
-        
-        # Fix common OCR errors
-        cleaned_text = self._fix_common_errors(cleaned_text)
+        # Remove extra spaces and fix common OCR errors (one compiled rule set)
+        cleaned_text = self.normalizer.normalize(text)
         
         # Apply spell checking
         if self.config.get("spell_check", False) and self.spell_checker:
-            cleaned_text = self._spell_check(cleaned_text)
+            cleaned_text = self._spell_check(cleaned_text, word_confidences)
         
         logger.debug("Text postprocessing completed")
         return cleaned_text
     
-    def _remove_extra_spaces(self, text: str) -> str:
-        """Remove extra whitespace"""
-        # Replace multiple spaces with single space
-        text = re.sub(r' +', ' ', text)
-        
-        # Remove spaces at start/end of lines
-        text = '\n'.join(line.strip() for line in text.split('\n'))
-        
-        # Remove multiple blank lines
-        text = re.sub(r'\n\n+', '\n\n', text)
-        
-        return text.strip()
-    
-    def _fix_common_errors(self, text: str) -> str:
-        """Fix common OCR errors"""
-        # Fix common character substitutions
-        replacements = {
-            r'\b0\b': 'O',  # Zero to letter O in words
-            r'\bl\b': 'I',  # Lowercase l to uppercase I
-            r'~': '-',      # Tilde to hyphen
-            r'[''`]': "'",  # Smart quotes to regular apostrophe
-            r'["""]': '"',  # Smart quotes to regular quotes
-        }
-        
-        for pattern, replacement in replacements.items():
-            text = re.sub(pattern, replacement, text)
-        
-        # Remove unwanted symbols (keep alphanumeric, punctuation, whitespace)
-        text = re.sub(r'[^\w\s\.,;:!?\-\'"()\[\]{}/@#$%&*+=]', '', text)
-        
-        return text
-    
-    def _spell_check(self, text: str) -> str:
+    def _spell_check(self, text: str, word_confidences: List[Tuple[str, float]] = None) -> str:
         """
-        Apply spell checking with TextBlob
+        Apply spell checking with the symspell index or TextBlob
         Note: This is conservative and may not correct all errors
+        
+        With word confidences, only words the OCR was unsure about are
+        looked up, so the cost scales with the uncertain part of the text.
         """
         try:
             if not self.spell_checker:
@@ -120,38 +198,239 @@ class TextPostprocessor:
             
             logger.debug("Applying spell checking")
             
-            # Process text with TextBlob
-            blob = self.spell_checker(text)
+            tokens = list(WORD_PATTERN.finditer(text))
+            self.stats["tokens"] = len(tokens)
+            
+            whole_text = (
+                word_confidences is None and self.spell_engine != "symspell" and
+                self.correction_cache is None and self.lexicon is None
+            )
+            if whole_text:
+                # Process text with TextBlob
+                blob = self.spell_checker(text)
+                
+                # Get corrected text
+                corrected = str(blob.correct())
+                
+                self.stats["examined"] = len(tokens)
+                self.stats["changed"] = sum(
+                    a != b for a, b in zip((m.group(0) for m in tokens), WORD_PATTERN.findall(corrected))
+                )
+                return corrected
+            
+            if word_confidences is None:
+                selected = tokens
+            else:
+                threshold = self.config.get("spell_confidence_threshold", 0.8)
+                confidences = align_word_confidences([m.group(0) for m in tokens], word_confidences)
+                selected = [m for m, conf in zip(tokens, confidences) if conf < threshold]
             
-            # Get corrected text
-            corrected = str(blob.correct())
+            # Rebuild the text, replacing only the selected words
+            parts = []
+            position = 0
+            changed = 0
+            for match in selected:
+                word = match.group(0)
+                corrected_word = self._correct_word(word)
+                if corrected_word != word:
+                    parts.append(text[position:match.start()])
+                    parts.append(corrected_word)
+                    position = match.end()
+                    changed += 1
+            parts.append(text[position:])
             
-            return corrected
+            self._flush_corrections()
+            
+            self.stats["examined"] = len(selected)
+            self.stats["changed"] = changed
+            logger.debug(f"Spell check: {changed} of {len(selected)} examined words changed ({len(tokens)} words)")
+            
+            return "".join(parts)
             
         except Exception as e:
             logger.warning(f"Spell checking failed: {str(e)}")
             return text
     
-    def process_batch(self, texts: List[str], confidences: List[float] = None) -> List[str]:
+    def _correct_word(self, word: str) -> str:
+        """Correct a single word, consulting the shared correction memo first"""
+        if self.correction_cache is None:
+            return self._run_correction(word)
+        
+        key = f"{self._memo_namespace()}:{word.lower()}"
+        
+        corrected = self._pending_corrections.get(key)
+        if corrected is None:
+            corrected = self.correction_cache.get(key)
+            if corrected is not None:
+                self.stats["memo_hits"] += 1
+        
+        if corrected is None:
+            corrected = self._run_correction(word).lower()
+            self._pending_corrections[key] = corrected
+        
+        # Unchanged words keep their exact spelling (including mixed case)
+        if corrected == word.lower():
+            return word
+        return match_case(corrected, word)
+    
+    def _run_correction(self, word: str) -> str:
+        """Correct a single word, preferring the subject lexicon over the general engine"""
+        if self.lexicon is not None:
+            # Domain words are never "fixed" into everyday words, and known
+            # everyday words are not pulled towards domain words
+            if word in self.lexicon:
+                return word
+            if self.spell_engine == "symspell" and word in self.spell_checker:
+                return word
+            domain_word = self.lexicon.correct_word(word)
+            if domain_word is not None:
+                return domain_word
+        
+        if self.spell_engine == "symspell":
+            return self.spell_checker.correct_word(word)
+        
+        return str(self.spell_checker(word).correct())
+    
+    def _memo_namespace(self) -> str:
+        """Key prefix identifying the engine, dictionary and lexicon a correction came from"""
+        lexicon = f":{self.lexicon.name}" if self.lexicon is not None else ""
+        
+        if self.spell_engine == "symspell":
+            return (
+                f"symspell:{self.config.get('spell_dictionary', '')}:"
+                f"{self.config.get('spell_max_edit_distance', 2)}{lexicon}"
+            )
+        return f"textblob{lexicon}"
+    
+    def _flush_corrections(self):
+        """Write corrections computed during this call to the shared memo in one batch"""
+        if self.correction_cache is not None and self._pending_corrections:
+            self.correction_cache.put_many(list(self._pending_corrections.items()))
+        self._pending_corrections = {}
+    
+    def process_batch(
+        self,
+        texts: List[str],
+        confidences: List[float] = None,
+        word_confidences: List[Optional[List[Tuple[str, float]]]] = None,
+        workers: int = None
+    ) -> List[str]:
         """
-        Process multiple text strings
+        Process multiple text strings, in parallel across a process pool if configured
+        
+        Results keep the input order. A text that fails is returned as
+        extracted and its error is recorded, so one bad page does not fail
+        the batch. Per-text counters are kept in self.batch_stats, their
+        sum in self.stats and failures (index -> message) in self.batch_errors.
         
         Args:
             texts: List of text strings
             confidences: Optional list of confidence scores
+            word_confidences: Optional (word, confidence) pairs per text
+            workers: Worker processes (default: config "workers"; 0 = one per
+                core, 1 = in-process)
             
         Returns:
             List of processed texts
         """
         if confidences is None:
             confidences = [1.0] * len(texts)
+        if word_confidences is None:
+            word_confidences = [None] * len(texts)
+        
+        self.batch_stats = [{} for _ in texts]
+        self.batch_errors = {}
+        
+        if workers is None:
+            workers = self.config.get("workers", 1)
+        
+        pool = None
+        if len(texts) >= self.config.get("parallel_min_texts", 4):
+            pool = get_postprocess_pool(self.config, workers)
+        
+        if pool is None:
+            outcomes = []
+            for text, conf, words in zip(texts, confidences, word_confidences):
+                outcomes.append(_process_item(self, text, conf, words))
+        else:
+            outcomes = self._process_in_pool(pool, workers, texts, confidences, word_confidences)
         
         processed = []
-        for text, conf in zip(texts, confidences):
-            processed.append(self.process(text, conf))
+        for index, (text, stats, error) in enumerate(outcomes):
+            if error is not None:
+                logger.warning(f"Postprocessing failed for batch item {index}: {error}")
+                self.batch_errors[index] = error
+                text = texts[index] or ""
+            processed.append(text)
+            self.batch_stats[index] = stats
         
+        self.stats = {key: sum(stats.get(key, 0) for stats in self.batch_stats) for key in self.stats}
         return processed
     
+    def _process_in_pool(
+        self,
+        pool: ProcessPoolExecutor,
+        workers: int,
+        texts: List[str],
+        confidences: List[float],
+        word_confidences: list
+    ) -> list:
+        """
+        Process texts on the postprocessing pool
+        
+        This postprocessor's configuration travels with every task, so one
+        pool serves all configurations. If a worker dies the pool is
+        replaced and the unfinished texts are retried once on the new pool;
+        texts that fail again are reported as errors.
+        
+        Returns:
+            (text, stats, error message or None) per text
+        """
+        lexicon_name = self.lexicon.name if self.lexicon is not None else ""
+        use_memo = self.correction_cache is not None
+        
+        outcomes = [None] * len(texts)
+        pending = list(range(len(texts)))
+        
+        for attempt in range(2):
+            try:
+                futures = {
+                    index: pool.submit(
+                        _worker_process, self.config, lexicon_name, use_memo,
+                        texts[index], confidences[index], word_confidences[index]
+                    )
+                    for index in pending
+                }
+            except BrokenProcessPool as e:
+                futures = {}
+                broken = e
+            else:
+                broken = None
+            
+            for index, future in futures.items():
+                try:
+                    outcomes[index] = future.result()
+                except BrokenProcessPool as e:
+                    broken = e
+                except Exception as e:
+                    # The item could not be sent or its result not returned
+                    outcomes[index] = (None, {}, str(e))
+            
+            if broken is None:
+                break
+            
+            logger.warning(f"Postprocessing worker died, restarting the pool: {str(broken)}")
+            discard_postprocess_pool(pool)
+            pending = [index for index in pending if outcomes[index] is None]
+            
+            if attempt == 0:
+                pool = get_postprocess_pool(self.config, workers)
+            else:
+                for index in pending:
+                    outcomes[index] = (None, {}, f"Postprocessing worker died: {str(broken)}")
+        
+        return outcomes
+    
     def combine_texts(self, texts: List[str], separator: str = "\n\n") -> str:
         """
         Combine multiple text segments
@@ -172,6 +451,112 @@ class TextPostprocessor:
         return combined
 
 
+def _process_item(postprocessor: TextPostprocessor, text: str, confidence: float, word_confidences) -> tuple:
+    """Process one batch item, returning (text, stats, error message or None)"""
+    try:
+        return postprocessor.process(text, confidence, word_confidences), dict(postprocessor.stats), None
+    except Exception as e:
+        return None, {}, str(e)
+
+
+# Per-process state of postprocessing pool workers: postprocessors per
+# (configuration, lexicon, memo), bounded since /reprocess accepts overrides
+_worker_postprocessors = LRUCache(max_entries=16)
+
+
+def _init_postprocess_worker(postprocess_config: dict):
+    """Pool initializer: load the spelling dictionary (and memo) once per worker"""
+    _worker_postprocessor(postprocess_config, "", True)
+
+
+def _worker_postprocessor(postprocess_config: dict, lexicon_name: str, use_memo: bool) -> TextPostprocessor:
+    """Postprocessor of this worker for a configuration and lexicon, created on first use"""
+    key = (repr(sorted(postprocess_config.items())), lexicon_name, use_memo)
+    postprocessor = _worker_postprocessors.get(key)
+    
+    if postprocessor is None:
+        from utils.lexicon import get_lexicon
+        
+        postprocessor = TextPostprocessor(
+            postprocess_config,
+            correction_cache=get_correction_cache() if use_memo else None,
+            lexicon=get_lexicon(lexicon_name) if lexicon_name else None
+        )
+        _worker_postprocessors.put(key, postprocessor)
+    
+    return postprocessor
+
+
+def _worker_process(
+    postprocess_config: dict,
+    lexicon_name: str,
+    use_memo: bool,
+    text: str,
+    confidence: float,
+    word_confidences
+) -> tuple:
+    """Process one text in a pool worker"""
+    postprocessor = _worker_postprocessor(postprocess_config, lexicon_name, use_memo)
+    return _process_item(postprocessor, text, confidence, word_confidences)
+
+
+# The single process-wide postprocessing pool; configurations are sent per task
+_postprocess_pool = {"executor": None}
+_postprocess_pool_lock = threading.Lock()
+
+
+def get_postprocess_pool(postprocess_config: dict, workers: int) -> Optional[ProcessPoolExecutor]:
+    """
+    Get the process-wide postprocessing pool
+    
+    The pool is started on first use with the requested number of workers
+    and then shared by every configuration, so its size stays bounded.
+    
+    Args:
+        postprocess_config: Configuration the workers warm up with (picklable)
+        workers: Worker processes (0 = one per available core)
+        
+    Returns:
+        ProcessPoolExecutor, or None when a single worker is asked for
+    """
+    if workers <= 0:
+        from utils.ocr_workers import available_cores
+        workers = len(available_cores())
+    
+    if workers <= 1:
+        return None
+    
+    with _postprocess_pool_lock:
+        if _postprocess_pool["executor"] is None:
+            logger.info(f"Starting postprocessing pool: {workers} workers")
+            _postprocess_pool["executor"] = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_postprocess_worker,
+                initargs=(dict(postprocess_config),)
+            )
+        
+        return _postprocess_pool["executor"]
+
+
+def discard_postprocess_pool(pool: ProcessPoolExecutor):
+    """Forget a broken pool so the next get_postprocess_pool starts a fresh one"""
+    with _postprocess_pool_lock:
+        if _postprocess_pool["executor"] is pool:
+            _postprocess_pool["executor"] = None
+    
+    pool.shutdown(wait=False)
+
+
+def shutdown_postprocess_pools():
+    """Stop the postprocessing pool (application shutdown)"""
+    with _postprocess_pool_lock:
+        pool, _postprocess_pool["executor"] = _postprocess_pool["executor"], None
+    
+    if pool is not None:
+        pool.shutdown(wait=True)
+
+
 def postprocess_text(text: str, config: dict = None) -> str:
     """
     Convenience function to postprocess text
@@ -194,33 +579,9 @@ def create_output_file(text: str, output_path: str, format: str = "txt"):
     Args:
         text: Text to save
         output_path: Output file path (without extension)
-        format: Output format ('txt' or 'docx')
+        format: Output format (any registered in utils.output_writers, e.g. 'txt' or 'docx')
     """
-    if format == "txt":
-        with open(f"{output_path}.txt", "w", encoding="utf-8") as f:
-            f.write(text)
-        logger.info(f"Saved text output to {output_path}.txt")
-        
-    elif format == "docx":
-        try:
-            from docx import Document
-            
-            doc = Document()
-            
-            # Add text paragraphs
-            for paragraph in text.split('\n\n'):
-                if paragraph.strip():
-                    doc.add_paragraph(paragraph.strip())
-            
-            doc.save(f"{output_path}.docx")
-            logger.info(f"Saved DOCX output to {output_path}.docx")
-            
-        except ImportError:
-            logger.error("python-docx not available, falling back to txt")
-            create_output_file(text, output_path, format="txt")
-        except Exception as e:
-            logger.error(f"Failed to create DOCX: {str(e)}")
-            raise
+    from utils.output_writers import OutputPage, write_outputs
     
-    else:
-        raise ValueError(f"Unsupported format: {format}")
+    if not write_outputs([OutputPage(1, text)], output_path, [format]):
+        raise RuntimeError(f"Failed to create {format} output")
@@ -5,7 +5,7 @@ Prepares images for optimal OCR performance through various enhancement techniqu
 import cv2
 import numpy as np
 from PIL import Image
-from typing import Tuple, Optional
+from typing import Iterator, List, Tuple, Optional
 import logging
 
 logger = logging.getLogger(__name__)
@@ -89,7 +89,7 @@ class ImagePreprocessor:
             gray = image.copy()
         
         # Apply threshold to get binary image
-        _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+        binary = self._binarize(gray)
         
         # Detect edges
         edges = cv2.Canny(binary, 50, 150, apertureSize=3)
@@ -129,6 +129,99 @@ class ImagePreprocessor:
         
         return image
     
+    def _binarize(self, gray: np.ndarray) -> np.ndarray:
+        """Otsu threshold into an inverted binary image (ink = 255)"""
+        _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+        return binary
+    
+    def find_content_regions(self, image: Image.Image) -> List[Tuple[int, int, int, int]]:
+        """
+        Fast layout pass that finds ink-bearing regions of a page
+        
+        Ruled lines and margin rules are removed before grouping ink into
+        regions, so a lined but unwritten page is reported as empty.
+        
+        Args:
+            image: PIL Image (typically the preprocessed page)
+            
+        Returns:
+            List of (x0, y0, x1, y1) boxes, empty if the page is blank
+        """
+        img_array = self._convert_to_grayscale(np.array(image))
+        h, w = img_array.shape[:2]
+        
+        ink = self._binarize(img_array)
+        
+        # Otsu always splits the page in two; on a blank (noise-only) page the
+        # "ink" class is barely darker than the paper. Comparing the class means
+        # is independent of how much of the page is written on.
+        ink_mask = ink > 0
+        if not ink_mask.any() or ink_mask.all():
+            return []
+        contrast = float(img_array[~ink_mask].mean()) - float(img_array[ink_mask].mean())
+        if contrast < self.config.get("blank_min_contrast", 40):
+            logger.debug(f"Page is effectively blank (ink contrast {contrast:.1f})")
+            return []
+        
+        # Drop speckle noise
+        ink = cv2.morphologyEx(ink, cv2.MORPH_OPEN, np.ones((2, 2), np.uint8))
+        
+        # Remove long horizontal/vertical rules (ruled lines, margins, boxes)
+        horizontal = cv2.morphologyEx(
+            ink, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_RECT, (max(w // 15, 1), 1))
+        )
+        vertical = cv2.morphologyEx(
+            ink, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_RECT, (1, max(h // 15, 1)))
+        )
+        ink = cv2.subtract(ink, cv2.bitwise_or(horizontal, vertical))
+        
+        ink_ratio = cv2.countNonZero(ink) / float(h * w)
+        if ink_ratio < self.config.get("blank_ink_ratio", 0.0002):
+            logger.debug(f"Page is effectively blank (ink ratio {ink_ratio:.4f})")
+            return []
+        
+        # Merge nearby strokes into text blocks
+        merged = cv2.dilate(ink, cv2.getStructuringElement(cv2.MORPH_RECT, (25, 15)))
+        count, _, stats, _ = cv2.connectedComponentsWithStats(merged, connectivity=8)
+        
+        margin = self.config.get("content_margin", 16)
+        min_area = self.config.get("min_region_area", 150)
+        
+        regions = []
+        for x, y, bw, bh, area in stats[1:count]:
+            if area < min_area:
+                continue
+            regions.append((
+                max(int(x) - margin, 0),
+                max(int(y) - margin, 0),
+                min(int(x + bw) + margin, w),
+                min(int(y + bh) + margin, h)
+            ))
+        
+        logger.debug(f"Found {len(regions)} content regions (ink ratio {ink_ratio:.4f})")
+        return regions
+    
+    def crop_to_content(self, image: Image.Image) -> Tuple[Optional[Image.Image], Tuple[int, int]]:
+        """
+        Crop a page to the bounding box of its content regions
+        
+        Args:
+            image: PIL Image
+            
+        Returns:
+            Tuple of (cropped image or None if the page is blank, (x, y) offset of the crop)
+        """
+        regions = self.find_content_regions(image)
+        
+        if not regions:
+            return None, (0, 0)
+        
+        boxes = np.array(regions)
+        x0, y0 = boxes[:, :2].min(axis=0)
+        x1, y1 = boxes[:, 2:].max(axis=0)
+        
+        return image.crop((int(x0), int(y0), int(x1), int(y1))), (int(x0), int(y0))
+    
     def _denoise(self, image: np.ndarray) -> np.ndarray:
         """
         Remove noise from image using median blur
@@ -209,3 +302,24 @@ def preprocess_image(image: Image.Image, config: dict = None) -> Image.Image:
     """
     preprocessor = ImagePreprocessor(config)
     return preprocessor.preprocess(image)
+
+
+def iter_image_frames(image_path: str) -> Iterator[Tuple[int, Image.Image]]:
+    """
+    Lazily yield the frames of an image file (multi-page TIFF, animated formats)
+    
+    Only the current frame is decoded; each yielded frame is an independent
+    copy, so the caller can release it before the next one is read.
+    
+    Args:
+        image_path: Path to the image file
+        
+    Yields:
+        Tuples of (1-based frame number, PIL Image)
+    """
+    with Image.open(image_path) as image:
+        frame_count = getattr(image, "n_frames", 1)
+        
+        for index in range(frame_count):
+            image.seek(index)
+            yield index + 1, image.copy()
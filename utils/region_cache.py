@@ -0,0 +1,116 @@
+"""
+Region Cache Module
+Caches recognized text regions keyed by a perceptual hash of the cropped region
+"""
+import cv2
+import numpy as np
+from typing import List, Optional, Tuple
+import logging
+
+from utils.cache import PersistentLRUCache
+
+logger = logging.getLogger(__name__)
+
+
+def region_hash(crop: np.ndarray, hash_size: Tuple[int, int] = (32, 8)) -> str:
+    """
+    Perceptual difference hash of a grayscale text crop
+    
+    The crop is shrunk to a small grid and each bit records whether a pixel
+    is brighter than its right neighbour, so recompression noise and small
+    intensity changes map to the same key. The aspect ratio bucket is part
+    of the key so short and long words never share a hash.
+    
+    Args:
+        crop: Grayscale region image
+        hash_size: (width, height) of the hash grid
+        
+    Returns:
+        Hex string key
+    """
+    if len(crop.shape) == 3:
+        crop = cv2.cvtColor(crop, cv2.COLOR_RGB2GRAY)
+    
+    h, w = crop.shape[:2]
+    width, height = hash_size
+    
+    small = cv2.resize(crop, (width + 1, height), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    
+    aspect = int(round(w / max(h, 1) * 2))
+    return f"{aspect:x}-{np.packbits(bits).tobytes().hex()}"
+
+
+class RegionCache:
+    """LRU + on-disk cache of recognizer output per text region"""
+    
+    def __init__(self, config: dict = None):
+        """
+        Initialize region cache
+        
+        Args:
+            config: Cache settings (max_entries, db_path, hash_size)
+        """
+        self.config = config or {
+            "enabled": True,
+            "max_entries": 50000,
+            "db_path": "",
+            "hash_size": (32, 8),
+        }
+        self.hash_size = tuple(self.config.get("hash_size", (32, 8)))
+        self.cache = PersistentLRUCache(
+            max_entries=self.config.get("max_entries", 50000),
+            db_path=self.config.get("db_path") or None,
+            table="regions"
+        )
+    
+    def lookup(self, namespace: str, crops: List[np.ndarray]) -> Tuple[List[str], List[Optional[tuple]]]:
+        """
+        Look up several crops at once
+        
+        Args:
+            namespace: Engine identity (model, languages) the results belong to
+            crops: Grayscale region crops
+            
+        Returns:
+            Tuple of (keys, cached (text, confidence) or None per crop)
+        """
+        keys = [f"{namespace}:{region_hash(crop, self.hash_size)}" for crop in crops]
+        values = []
+        
+        for key in keys:
+            value = self.cache.get(key)
+            values.append(tuple(value) if value is not None else None)
+        
+        return keys, values
+    
+    def store(self, keys: List[str], values: List[Tuple[str, float]]):
+        """Store recognized (text, confidence) pairs for the given keys"""
+        self.cache.put_many([(key, [text, float(conf)]) for key, (text, conf) in zip(keys, values)])
+    
+    def stats(self) -> dict:
+        """Process-wide cache counters"""
+        return self.cache.stats()
+
+
+_region_cache: Optional[RegionCache] = None
+
+
+def get_region_cache() -> Optional[RegionCache]:
+    """
+    Get the process-wide region cache
+    
+    Returns:
+        RegionCache, or None if disabled in config.REGION_CACHE_CONFIG
+    """
+    global _region_cache
+    
+    import config
+    
+    if not config.REGION_CACHE_CONFIG.get("enabled", False):
+        return None
+    
+    if _region_cache is None:
+        _region_cache = RegionCache(config.REGION_CACHE_CONFIG)
+    
+    return _region_cache
@@ -0,0 +1,321 @@
+"""
+Spell Index Module
+Symmetric-delete (SymSpell) spelling correction with frequency ranking
+"""
+import os
+import re
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+WORD_PATTERN = re.compile(r"[A-Za-z]+(?:'[A-Za-z]+)*")
+
+
+def damerau_distance(a: str, b: str, max_distance: int) -> int:
+    """
+    Optimal string alignment distance, giving up early past max_distance
+    
+    Args:
+        a: First string
+        b: Second string
+        max_distance: Largest distance of interest
+        
+    Returns:
+        Edit distance, or max_distance + 1 if it is larger than max_distance
+    """
+    if a == b:
+        return 0
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        row_min = i
+        
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            
+            # Transposition of two adjacent characters
+            if (i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                value = min(value, previous_previous[j - 2] + 1)
+            
+            current[j] = value
+            row_min = min(row_min, value)
+        
+        if row_min > max_distance:
+            return max_distance + 1
+        
+        previous_previous, previous = previous, current
+    
+    return previous[len(b)] if previous[len(b)] <= max_distance else max_distance + 1
+
+
+class SpellIndex:
+    """
+    Precomputed symmetric-delete index over a word frequency dictionary
+    
+    Every dictionary word is stored under all strings reachable by deleting
+    up to max_edit_distance characters (from its first prefix_length
+    characters). A lookup generates the same deletes for the input word, so
+    candidates come from a few dict lookups instead of enumerating every
+    possible edit, and the best candidate is the closest, most frequent word.
+    """
+    
+    def __init__(self, max_edit_distance: int = 2, prefix_length: int = 7):
+        """
+        Initialize an empty index
+        
+        Args:
+            max_edit_distance: Largest correction distance
+            prefix_length: Characters of each word used for the delete index
+        """
+        self.max_edit_distance = max_edit_distance
+        self.prefix_length = prefix_length
+        self.words: Dict[str, int] = {}
+        self.deletes: Dict[str, List[str]] = {}
+    
+    @classmethod
+    def load(cls, path: str, max_edit_distance: int = 2, prefix_length: int = 7) -> "SpellIndex":
+        """
+        Build an index from a dictionary file with one "word count" per line
+        
+        Args:
+            path: Dictionary file
+            max_edit_distance: Largest correction distance
+            prefix_length: Characters of each word used for the delete index
+            
+        Returns:
+            SpellIndex
+        """
+        start_time = time.time()
+        
+        index = cls(max_edit_distance, prefix_length)
+        for word, count in read_dictionary(path):
+            index.add_word(word, count)
+        
+        logger.info(
+            f"Spell index built from {path}: {len(index.words)} words, "
+            f"{len(index.deletes)} deletes in {time.time() - start_time:.2f}s"
+        )
+        return index
+    
+    def add_word(self, word: str, count: int):
+        """Add a word (or increase its count)"""
+        word = word.lower()
+        
+        if word in self.words:
+            self.words[word] += count
+            return
+        
+        self.words[word] = count
+        for delete in self._deletes(word[:self.prefix_length]):
+            self.deletes.setdefault(delete, []).append(word)
+    
+    def _deletes(self, word: str) -> set:
+        """All strings reachable by deleting up to max_edit_distance characters (including word)"""
+        deletes = {word}
+        frontier = [word]
+        
+        for _ in range(self.max_edit_distance):
+            next_frontier = []
+            for candidate in frontier:
+                if len(candidate) <= 1:
+                    continue
+                for i in range(len(candidate)):
+                    delete = candidate[:i] + candidate[i + 1:]
+                    if delete not in deletes:
+                        deletes.add(delete)
+                        next_frontier.append(delete)
+            frontier = next_frontier
+        
+        return deletes
+    
+    def __contains__(self, word: str) -> bool:
+        return word.lower() in self.words
+    
+    def lookup(self, word: str, max_distance: int = None) -> Optional[Tuple[str, int, int]]:
+        """
+        Find the best correction for a single word
+        
+        Args:
+            word: Word to correct
+            max_distance: Largest distance accepted (defaults to the index setting)
+            
+        Returns:
+            Tuple of (suggestion, distance, count), or None if nothing is close enough
+        """
+        word = word.lower()
+        max_distance = self.max_edit_distance if max_distance is None else min(max_distance, self.max_edit_distance)
+        
+        if word in self.words:
+            return word, 0, self.words[word]
+        
+        best = None
+        seen = set()
+        
+        prefix = word[:self.prefix_length]
+        for delete in self._deletes(prefix):
+            for suggestion in self.deletes.get(delete, ()):
+                if suggestion in seen:
+                    continue
+                seen.add(suggestion)
+                
+                limit = best[1] if best is not None else max_distance
+                distance = damerau_distance(word, suggestion, limit)
+                if distance > limit:
+                    continue
+                
+                count = self.words[suggestion]
+                if best is None or distance < best[1] or (distance == best[1] and count > best[2]):
+                    best = (suggestion, distance, count)
+        
+        return best
+    
+    def correct_word(self, word: str) -> str:
+        """
+        Correct a word, keeping its capitalization
+        
+        Args:
+            word: Word as it appears in the text
+            
+        Returns:
+            Corrected word (the input if it is known or nothing is close enough)
+        """
+        if len(word) < 2 or word.lower() in self.words:
+            return word
+        
+        best = self.lookup(word)
+        if best is None:
+            return word
+        
+        return match_case(best[0], word)
+    
+    def correct(self, text: str) -> str:
+        """
+        Correct every word in a text, leaving spacing and punctuation untouched
+        
+        Args:
+            text: Input text
+            
+        Returns:
+            Corrected text
+        """
+        return WORD_PATTERN.sub(lambda match: self.correct_word(match.group(0)), text)
+
+
+def match_case(word: str, template: str) -> str:
+    """Apply the capitalization pattern of template (UPPER, Title or lower) to word"""
+    if template.isupper() and len(template) > 1:
+        return word.upper()
+    if template[0].isupper():
+        return word[0].upper() + word[1:]
+    return word
+
+
+def read_dictionary(path: str) -> Iterator[Tuple[str, int]]:
+    """
+    Read a "word count" dictionary file (lines starting with ';' are comments)
+    
+    Args:
+        path: Dictionary file
+        
+    Yields:
+        Tuples of (word, count)
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip() or line.startswith(";"):
+                continue
+            parts = line.split()
+            if len(parts) < 2:
+                continue
+            try:
+                yield parts[0], int(parts[1])
+            except ValueError:
+                continue
+
+
+def write_dictionary(words: Dict[str, int], path: str):
+    """
+    Write a compact "word count" dictionary, most frequent words first
+    
+    Args:
+        words: Word -> count
+        path: Output file
+    """
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for word, count in sorted(words.items(), key=lambda item: -item[1]):
+            f.write(f"{word} {count}\n")
+    os.replace(tmp_path, path)
+
+
+def textblob_dictionary_path() -> Optional[str]:
+    """Path of the word frequency list bundled with TextBlob, if installed"""
+    try:
+        import textblob
+    except ImportError:
+        return None
+    
+    path = os.path.join(os.path.dirname(textblob.__file__), "en", "en-spelling.txt")
+    return path if os.path.exists(path) else None
+
+
+def ensure_dictionary(path: str) -> str:
+    """
+    Make sure the on-disk dictionary exists, seeding it from TextBlob's word list
+    
+    Args:
+        path: Dictionary file
+        
+    Returns:
+        path
+    """
+    if os.path.exists(path):
+        return path
+    
+    source = textblob_dictionary_path()
+    if source is None:
+        raise FileNotFoundError(f"Spelling dictionary {path} not found and TextBlob word list unavailable")
+    
+    words = {}
+    for word, count in read_dictionary(source):
+        if WORD_PATTERN.fullmatch(word):
+            words[word.lower()] = words.get(word.lower(), 0) + count
+    
+    write_dictionary(words, path)
+    logger.info(f"Spelling dictionary written to {path} ({len(words)} words)")
+    
+    return path
+
+
+_spell_indexes: Dict[tuple, SpellIndex] = {}
+
+
+def get_spell_index(path: str, max_edit_distance: int = 2) -> SpellIndex:
+    """
+    Get the process-wide index for a dictionary (built once, then shared)
+    
+    Args:
+        path: Dictionary file (created from TextBlob's word list if missing)
+        max_edit_distance: Largest correction distance
+        
+    Returns:
+        SpellIndex
+    """
+    key = (path, max_edit_distance)
+    
+    if key not in _spell_indexes:
+        _spell_indexes[key] = SpellIndex.load(ensure_dictionary(path), max_edit_distance)
+    
+    return _spell_indexes[key]